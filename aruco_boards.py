@@ -0,0 +1,189 @@
+"""
+Calibration boards of the ArUco laser marker generator (--board).
+
+GridBoard and ChArUco boards laid out with OpenCV's geometry, placed and
+drawn in bulk. Imported on first use.
+"""
+
+import numpy as np
+
+import generate_aruco_laser as gal
+from generate_aruco_laser import A4, BOARD_TYPES, LABEL_SPACE, LAYOUT_DTYPE, mm
+
+
+def board_marker_count(board, cols, rows):
+    """Markers on a board: one per cell of a GridBoard, one per white square of a ChArUco board."""
+    return cols * rows if board == 'grid' else cols * rows // 2
+
+
+def default_square_mm(marker_size_mm):
+    """ChArUco square size when none is given: the marker covers 75% of the square."""
+    return marker_size_mm / 0.75
+
+
+def fit_board_shape(board, page_size=A4, marker_size_mm=10, spacing_mm=2, square_mm=None,
+                    margin_mm=5, show_labels=True):
+    """
+    Largest board (cols, rows) whose cut outline, and label, fit on the page.
+    
+    Args:
+        (as for compute_board())
+    
+    Returns:
+        tuple: (cols, rows), zero when not even one column or row fits
+    """
+    if board == 'grid':
+        pitch, gap = (marker_size_mm + spacing_mm) * mm, spacing_mm * mm
+    else:
+        pitch, gap = (square_mm or default_square_mm(marker_size_mm)) * mm, 0.0
+    width = page_size[0] - 2 * margin_mm * mm + gap
+    height = page_size[1] - 2 * margin_mm * mm - (LABEL_SPACE if show_labels else 0) + gap
+    return max(int(np.floor(width / pitch + 1e-9)), 0), max(int(np.floor(height / pitch + 1e-9)), 0)
+
+
+def compute_board(board, marker_ids, cols, rows, page_size=A4, marker_size_mm=10, spacing_mm=2,
+                  square_mm=None, margin_mm=5, show_labels=True):
+    """
+    Lay out a GridBoard or ChArUco calibration board centred on one page.
+    
+    Boards follow OpenCV's geometry, so cv2.aruco.GridBoard and
+    cv2.aruco.CharucoBoard built with the same shape, lengths and IDs
+    describe the printed board. Markers take their IDs from marker_ids in
+    row-major order from the top-left and have no white border of their own:
+    the spacing (GridBoard) or the square around them (ChArUco) is the quiet
+    zone. The whole board gets one cut outline, margin_mm outside the pattern.
+    
+    Args:
+        board (str): One of BOARD_TYPES ('grid', 'charuco')
+        marker_ids (list): Marker IDs, at least board_marker_count() of them
+        cols (int): Markers (GridBoard) or squares (ChArUco) per row
+        rows (int): Markers (GridBoard) or squares (ChArUco) per column
+        page_size (tuple): Page or sheet size in PDF points
+        marker_size_mm (float): Marker size in millimeters
+        spacing_mm (float): GridBoard only - gap between markers in millimeters
+        square_mm (float, optional): ChArUco only - chessboard square size in
+            millimeters (default: default_square_mm())
+        margin_mm (float): White margin between the pattern and the cut outline
+        show_labels (bool): Reserve room for the board label below the outline
+    
+    Returns:
+        tuple: (layout, squares, outline) - the markers as a LAYOUT_DTYPE
+            table, the black chessboard squares as an (n x 4) array of
+            (x, y, width, height) in points (empty for a GridBoard), and the
+            cut outline as (x, y, width, height)
+    
+    Raises:
+        ValueError: If the board is malformed, short of IDs or larger than the page
+    """
+    if board not in BOARD_TYPES:
+        raise ValueError(f"Unknown board type '{board}', expected one of {BOARD_TYPES}")
+    if cols < 1 or rows < 1:
+        raise ValueError(f"A board needs at least one column and one row, got {cols}x{rows}")
+    size = marker_size_mm * mm
+    if board == 'charuco':
+        square_mm = square_mm or default_square_mm(marker_size_mm)
+        if not square_mm > marker_size_mm:
+            raise ValueError(f"ChArUco markers ({marker_size_mm:g}mm) must be smaller than the "
+                             f"squares ({square_mm:g}mm)")
+        pitch = square_mm * mm
+        width, height = cols * pitch, rows * pitch
+    else:
+        pitch = size + spacing_mm * mm
+        width, height = cols * pitch - spacing_mm * mm, rows * pitch - spacing_mm * mm
+    
+    count = board_marker_count(board, cols, rows)
+    ids = np.asarray(marker_ids, dtype=np.int32).ravel()
+    if len(ids) < count:
+        raise ValueError(f"A {cols}x{rows} {board} board needs {count} marker IDs, got {len(ids)}")
+    margin = margin_mm * mm
+    label = LABEL_SPACE if show_labels else 0
+    if width + 2 * margin > page_size[0] + 1e-6 or height + 2 * margin + label > page_size[1] + 1e-6:
+        raise ValueError(f"A {width / mm:g} x {height / mm:g} mm board with a {margin_mm:g}mm margin "
+                         f"does not fit on a {page_size[0] / mm:g} x {page_size[1] / mm:g} mm page")
+    
+    # Centre the outline together with the label below it
+    left = (page_size[0] - width) / 2
+    top = (page_size[1] + height + label) / 2
+    r, c = np.divmod(np.arange(rows * cols), cols)
+    if board == 'charuco':
+        white = (r + c) % 2 == 1
+        inset = (pitch - size) / 2
+        x, y = left + c[white] * pitch + inset, top - r[white] * pitch - inset
+        squares = np.column_stack([left + c[~white] * pitch, top - (r[~white] + 1) * pitch,
+                                   np.full((~white).sum(), pitch), np.full((~white).sum(), pitch)])
+    else:
+        x, y = left + c * pitch, top - r * pitch
+        squares = np.empty((0, 4))
+    
+    layout = np.empty(count, dtype=LAYOUT_DTYPE)
+    layout['page'] = 0
+    layout['x'] = x
+    layout['y'] = y
+    layout['id'] = ids[:count]
+    outline = (left - margin, top - height - margin, width + 2 * margin, height + 2 * margin)
+    return layout, squares, outline
+
+
+def render_board(renderer, layout, squares, outline, aruco_dict_name='4X4_50', marker_size_mm=10,
+                 engrave_mode='cells', label=None, optimize_travel=False):
+    """
+    Draw a calibration board from compute_board() as one page.
+    
+    The engrave layer is a single rects() call, or with engrave_mode
+    'polygons' a single even-odd polygon() call, covering every square and
+    marker (see layout_engrave_geometry()). The cut layer is one outline
+    around the whole board.
+    
+    Args:
+        renderer (MarkerRenderer): Renderer receiving the page
+        layout, squares, outline: Board from compute_board()
+        aruco_dict_name (str): ArUco dictionary name
+        marker_size_mm (float): Marker size in millimeters
+        engrave_mode (str): Engrave geometry, one of ENGRAVE_MODES
+        label (str, optional): Text drawn below the cut outline
+        optimize_travel (bool): Reorder the page for short head travel
+    
+    Returns:
+        dict or None: Travel statistics when optimize_travel is set
+    """
+    profiler = gal._PROFILER.get()
+    if profiler is not None and not isinstance(renderer, gal.ProfilingRenderer):
+        renderer = gal.ProfilingRenderer(renderer, profiler)
+    if optimize_travel:
+        renderer = gal.TravelOrderingRenderer(renderer)
+    
+    renderer.begin_page()
+    with gal._phase('draw'):
+        geometry = gal.layout_engrave_geometry(layout, aruco_dict_name, marker_size_mm, 0, engrave_mode,
+                                               squares)
+        renderer.set_layer('engrave')
+        if engrave_mode == 'polygons':
+            renderer.polygon(geometry)
+        else:
+            renderer.rects(geometry)
+    if profiler is not None:
+        profiler.count('markers', len(layout))
+    renderer.set_layer('cut')
+    renderer.rects([outline], fill=False)
+    if label:
+        renderer.set_layer('label')
+        renderer.text(outline[0], outline[1] - 8, label, 6)
+    renderer.end_page()
+    
+    return renderer.stats if optimize_travel else None
+
+
+def format_board_label(board, aruco_dict_name, cols, rows, marker_size_mm, spacing_mm=2,
+                       square_mm=None, marker_ids=None):
+    """One-line description of a board, printed below it so the parameters travel with it."""
+    if board == 'charuco':
+        square_mm = square_mm or default_square_mm(marker_size_mm)
+        text = f"ChArUco {cols}x{rows} {aruco_dict_name}, square {square_mm:g}mm, marker {marker_size_mm:g}mm"
+    else:
+        text = (f"GridBoard {cols}x{rows} {aruco_dict_name}, marker {marker_size_mm:g}mm, "
+                f"spacing {spacing_mm:g}mm")
+    if marker_ids is not None and len(marker_ids):
+        ids = np.asarray(marker_ids)
+        consecutive = np.array_equal(ids, np.arange(ids[0], ids[0] + len(ids)))
+        text += f", IDs {ids[0]}-{ids[-1]}" if consecutive else ", custom IDs"
+    return text
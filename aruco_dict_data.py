@@ -0,0 +1,299 @@
+"""
+Predefined ArUco dictionaries, bit-packed.
+
+Generated by scripts/build_dictionary_data.py from OpenCV 5.0.0; do not edit.
+
+DICTIONARIES maps the marker size n to (marker count, base64 data). The data
+holds the inner bits of every marker of the nXn_1000 dictionary, row by row
+with 1 = white, packed MSB first into one continuous bit stream. Smaller
+dictionaries of the same marker size are prefixes of it.
+"""
+
+DICTIONARIES = {
+    4: (1000, (
+        'tTIPmjMtmUZUnnnNni7E8v7az1b5kRGnDrcqDySxJj5GZWYAbF52r4aLsCvM1d2C/keUcazkpVQh'
+        'IzRvRBVXsp7P8MsIrgkpGHUE/w32HFoXGCooMow4siToLustP0tkUC5QE1GUVWhdQV+XaAFoZ2Ek'
+        'YelrEm/lZ99+G4Cgg0SLopN6hGyFKoWcnImfobt8vAS2W7/It6vKH8li2VjT1cyYx6DFN+ld+SX7'
+        'u+4q9001dYqtdhcKzwZLLcFJ2EP0TzZP02nkcMd6brTq7U/85/6mACUAQwqICoYCbwAcAJcINwox'
+        'CcYLAQn7C1gQghgtEHgQcxJ0ErEa+RMGDA4M8QQzDJ8O8g79B0wPpAcvBbUPkQfbHuQUOR2AFcgf'
+        'ixW6HbEggCjpIqIoUyrwIvcpQCFGKbkrnCuyOMo4LjAHOOc6STplMl07iDkdO9MmRyeAL6otFCXe'
+        'JVMvdzRIPKg8QTQNNPs2mj3gNWo9CT3tP8Q/bDfOPVw9djewPxc//0jlQmhKLUFgSVFB3UvfWE9a'
+        'SFgWUF1a+lq1USNbilkZUTVMaUbBTgtEX05ZTYNNfUfYR3NchV5EVitcu1XDX25f610SVV5icGIV'
+        'YcJrIGNFa1xrW3gMes94f3mAceVxdHm2cdN7M2RqZqhup26RZSJty2eNbTF+gH7ifo100nwyfjV1'
+        'q3cFfyt92n+SgHWA84Gmie2B/JimmiCRQ5n5kZOb1IQJhGuGxI5khhqFTo3LhWeFr4XXh7Oc4Zzy'
+        'lBeVAJWinSOfYp1SldqgxarNotiiV6k9qVerUqM2o1mw9LgSsL+ynbvtuXK5lqTDrNKusaWCr2Wl'
+        'e6/6tGS8YrSBtqC+7r4NvNm++LUotwm30sDqwBnA/cjTylrBTcm0wVfDmMMd2IDY79or0B7RBdOt'
+        '26fEycx4zUXFC8/P3KzUAtxj1CfU9dZ43rjd5tVd3b3fHeLK6mvgtOI44tTjIuHY8APyzPj28Unz'
+        '6vGc+fXxO+yN7snmD+T352Dv6O2y5RXv0fSG/AH2w/R8/JP1Qv2Y9T0CvQDhAuICrgh4AHQIngjR'
+        'CH0KMgreAlEBogOAC4MLSwsnC+8JtglZCZML+APZA/EQxBirGqAaBBpsGq4SiRAXGvMZQBECESsR'
+        'zxsiEy4RFRO7DCAMyQzcDDYGFAZyDWEFDQ2PD+APSQeFBZANMw+WD3YUYByNFNoccx6UHroW2R49'
+        'Fvsd6R3+H58oiyCvIg4iqSqNKqMq7yiQKDsqWCIzIaAhAiGlIccrAyNnKTAp0isZK5srlzgoOKU6'
+        'hjIBOJ8y0jqZOtU56DvBM0M75zGaM5A7niTELEosrSzPLGcm6i7lLHAuEi7RLjklZCXnL8wtvC1x'
+        'JdUlmycQL3wn8ic6L7Yn0y+zJx88SzbANu4+6TS4PBQ8UjRyNH40vz5xPlM9jDWiNS41LTesNXA3'
+        '+j/xP9tIxEjpSsJKQULrSBNK2EL9ShdJY0NuQTpJsUE9S5JLm0M/WCJQqlgnUshShFIKWg9YmFhc'
+        'UNtQ91r0UexRQlENWwNT61F2WXFRk1P5W7NTl0xMREtMI0aMTidGkE7URc5F5UUnT8FHBUU0RXJc'
+        'yFwOVOtWiVZDXudccFSyXnlW812jXfJVHV2dV/xX0l9zaC1ow2iHakpiaWC5aP9q3Graaj5qUWox'
+        'YtdhzGuCa+NpOmGeYZVhdWlfaTdj2nACeGNwT3LKeq1we3oUevl603q7eeJxKXtncdB5OXMwc7lz'
+        'U3P/bIhkCWxDZgZmg2SwZNpun2fIb+5tO2/SdIB8q35ofgJ8nHQ2fBF+3n62dtt9xH2KdW13iHcg'
+        'd0F1OHW+fZt3V4gogKyIDYhngk6KoYIrgBiI+YCdipyCMYp1gpeBCYHrgQeLKIusgy6D5YFQiTKL'
+        'eouWg32Qh5r8kvWRqpNBkyWb65k0kfeb2pNWhEKMgYxPhkiGpo4DhuOGb46vhF6Ed4b6jh6ON4cK'
+        'j4qPJochhw2Fcoc+nEOeYZRYlPicMpR2lLGU3ZSbnNuenJ7SlhmesZVpn22XK5W2lbmdPZ1XqOyo'
+        'JaKsogKqZqqPqueoMKh6qPaok6IUqjSicqryovGhQKkKoSapxanPoTSpEqH6q5ij97AGsEW4jbKE'
+        'uPC4VbJ2upGycbnAuUK5KrOMs8q7ZrMPsdq7FLv2sxOkaKwsrKGs66zHpGemwK7gpiOt6KXMp+yt'
+        'fKUapZGtGaWXtG2+y7w6vPW+vb7ztSW1j7dov+S9/r2dtfW187+wt1q/Prc5v9W3Hb81t3/IAcCl'
+        'woLIvcL8ypHCW8lEwSrDwMl6wbnJdcH3y7HQbNiH0K/axNIM2gnQMNiU0DrQttB10nbaXdo10hfZ'
+        'AtPo0+XRmtH20VHbFNM+09PEYMynxkLGR87nxFzMHcw1xrzNqMUMxeTFws0tzVnNlcWTx1/Uxd6I'
+        '1iTe7Nbi3sbeI9zc3BrUEd5U1pTend2B1aXXrNdm36nV3N0f3/DiSOLo4gfgXer16ybr7eFS4X7p'
+        '2/gG8O74ofoA+sLwm/r0+jzy/PK98pPxYPns8Ub54fNI867zwfOL86fxc/GX8/T7MuQH5k3sVe3A'
+        '7YXvoudO5dXvUPQi9In0KfZq/gv+b/SV9DX0H/aw9ej1xf0j/8D3zPfp9bz99vXZ/Zf9P/+c/1r3'
+        '/v8R978='
+    )),
+    5: (1000, (
+        'otleBwG5teHbsDlffXWpJ1Agtaev2OIUa4awmUxP6WedwHotrA8xWIl5xZv5+VBR439L06wvqJve'
+        'ybiQYd6JbtOtQ5EC1hlCuhLezmgR6WZcuHnRYiQkYdyzkJCI7E5u3DaIcyBoZxKqsgjId0em/qTM'
+        'VWILRAU1WjqGPHJWlBKpS+ebCT7sMJ2W0/GLpYnp03Mu+UgGesiSva3142scka0nmPHAXFpRFl/2'
+        'lVjLjazD+FCL9+nCRPVt8iue342TJPL5dw2ICofIo+7hOuKxsLW7LNqd1eufp1DLzspQ9XQK2I0p'
+        'hjOZRVZDKY6YFUAw5QaFYwpimZbRLP1p0QJIrUM3nAC1R8AWO3hMiiQlpU4MS0MDPeKD6oND4+qD'
+        'joeRkdkYsNkcW0o2Lp2NE+KxD799SkPcBEjv0qF8CVfbJI/AEE+b+CNqrBe9l40kMQYBOtNF4QnK'
+        'l0DIAcRtzjpEigSidn9RR9yoqVKkYTvqdBhJHcpmnwT7XDeNrH67lG3+CydfZamZkpgPhU8xnqbc'
+        'Alslr6/q5llZkKy49eZjdRM4Zi3CWXb4xwF5q6k5HqMc+WywhNGInxAUNXdOKI/nKGrjnEUbSo/S'
+        'ZaNkEuTW6bN2dN43BoJpu0ilDaiwhdbNoSv8FjYFzHsA8YXnVZb7ETNnBfSzWDzfovcv1Yz4h14M'
+        'zpg2KZgHNImPjBEVxpQ/ZXdCc+nEuWw8XQAuluW6M2YuE7OdZNKZQOloi7eWm7tI6F2zwQbcfkug'
+        'Y4/KON7hrjj23L36eAyda6GO/5nXwIgL4B9N7ARB9htf/1r2vozOP0lYP3L3D79X5/xiU/dGvGi4'
+        'L0yHheZ2CbyL4dHRBulWCYTRBY5vgOk/NcurUCYVzg5s0xcHOlFz+WfuLR+lS4cuqanrWozbrLam'
+        'eJg+jKuR5sN9H342OcrNH+1HGvgzw0EKe6AEaPAKL7AmRnADS4YYFB4Ii8YGQy2BYH9ALiPAHCFY'
+        'DzuIJKb8GiA3DQUYBvaXw1m3gT5OwC0IKBMWSBvOpA3eRg4+EgVNbsKYW2Ff6iB+Zyhc0Ag/Qjge'
+        'kyYP93sITzBEFHtCj1vRyFPo4RtAYxzQK/cFEU6TjNB1RIYTAlR1werDwPZLYHumjjTtsBO2B4uj'
+        'XgfFXkNkb6G7+SD8tNRtI6xAGfogF1YUAMzLDI3ksZzCEejBa+tIpwEkTWJAJoAckVoNCYqRJNVr'
+        'ImyYQVGDFLjKtEZ+AyODUBOyF0n1LCX3RZKya6mAXGjQmkphBDIweyyeXB3PCYPnHTuDzA9xx7qk'
+        'xBbSa3H9NbLTnM3nTltLh7wQc59NAc/5AOceImweSDIe1Rtf6M2RusdFtQOpO7G8rWjcEkxnQbE3'
+        'Q6cZ/S4P4NuH7WwEDhzSZIdRImmmmX3uSOuKpGmD0xamKCSCdNC/gkrd7Ro1lIVq10ZcgyN6M5Ge'
+        'bslUc7TkFOpyXhEOJ06PVZFDOxMjpTTTxbrp6LQFCRbKoIXZQWk2oOWoVOrxrATh1xZeSw1jZRNP'
+        'aq1LtVZe3qqQh1HLHCyztNZV5srUFXUkxYKyuiV4BOC0A/5aNROvDuvXpJGrTZRFc5BSvc9xTGyy'
+        'rwwQV7Mfq9e+lPw6y2PdhfBqavlyvW1nALe6+1tOLy+3xNbY9owEBJZKcesCoqWimZzZ13lpRs22'
+        '+dTbV4fMxAxmbbU7FriFqpVS3FxTZzaSM+JlGNTIrWd4lvFlC1rBLb2PVuGB8XTX0DiVt1xeRu4o'
+        'WkcWP9Ov89X2YjD7c+59E5O8o7Ofd/DPPepXIAtjsiTF2ekI/Bdrczrhu8Wd3dd6j+mAF7deC/8V'
+        '0gLBDwF4eoAyWEAuDWE+yRAP/riC3FxEzwYgZlUKO4+Bu4dA8LBhX4hwPlJIk9bMSyWWN1B7Er2j'
+        'igSsR2QLI7y/MGFxKHK21Dopig2x4w/cGouxK8XI7CLWWZH8qqj/Nlyg0KpDhp0gj/6cvNVMSXon'
+        'FOozGG1phyP8iJ6qVv/tKootle7YTusCJ1icEtX5yWuhjLbJ7niEuTVzCJqBT80dm2ewyVJypQlz'
+        'Iuy+nMJudo8+OeCfM1LN/WUn/qUUB5l6SoaVBZ+qkar9QLbxqGiY1mabazcedCkkahQ9lW2GiqZs'
+        'c1MVr61Uatb1qOmHY5TLjNrrwkVVWYK7M2FV23au483TmwRo+zlUeDN6f6OlfStOvyL3X99Iq2f2'
+        'Wg4pLQ/RNp4ZS4GC1eX8RuI4E3jwUbjIQ955nm1EwxYn7UsWV72OX2rHCZ9iteW17h/cyDhuaNA3'
+        'LwtLn3y1sCgOy/8JZPYqsm5a31r57qnoV05BWzMEBb2ppt2lMW+LgrNX3l2qfa7ymzd/fDv/aG4h'
+        'a+MgcNGYh8vFNa7gyWAxSP3YM//MFUYWCrwTBxzfkxnfzfBvZK+z8l38WbxSvGvwfjX9wxtvJ5Rj'
+        'EM7eLeO8FnLq0vnod+0K5W6DmZtgUmG4wT/VdVho8Gu1fuxau06d08dO7LtrZGzFssVM0qt86WL2'
+        'NLKamk16zemzRvSU82mDY65zZddfJm+AoPfeQ/t+7o4ENP8GNxuw4vfYo/rljSRygrz4U74cqvue'
+        'H38vFCpriGBpxFeW5uwCczFAuomQHVwYjqcpTxiJ/5wvm8bJ4+f64vHt+bvh2J3rrg62YOd6UePC'
+        'yIfhXp70nzz4eoI8PJ4fBoxvzbj35/Jv9sEX+mfW+cTZ+RHI/bS+/936fzsDr7xSb84+d+/kTv+9'
+        'hf+TYv74GF/7g0Gfhj1K6PwC4SIB2cIIYWYEekGDPidBGAfQE5wACUBQBvrOGwCqDa9jg1r2AKZN'
+        'oNbR4GfUCBOTRBsvthweeg7VywG+k8D6Y8D/U/C0wQCFyrxAWKQgxRcYnbYMNoBHHYqDC/yRxCFg'
+        'ieVIRmDmKnTGFRJ1iu9RBVqGI7olAdcZSJHMXEgWYCwFMRo0f49ud8ecHMNIcqGn4bi9bhBMZ3o3'
+        'UScbk0mN6A2H0LbkFzVCTEuhRWgosI2SWB01LFEDkuLnyXI05C79EijdqRBXcLoYsFVsXyc8LRPO'
+        'pQnmweRq8II05Dl9XczCwLpgUPQ0/aCea0SOH62GIA2jEX25jTu89gAqe8U6Nmp3m2PfT67KR80T'
+        'Q+XwKdK2dPl/8GdzWDNUrh+M0A7rWGduBfO+s6oCmtEGYFiDH2JF2SGi9YCSZ1SIRwn0qmo6VilV'
+        'KyHMj2mNQ5NdIbw6k86r6fDolPh98n4m9VB9HKA/KFyRQyxe99c3QeuMyxXNsyqqLqFFEPijz8xZ'
+        'C6cu3RxXaY3rPzKl3/7ClOnRWOpcpMZEUssxrUXmVMhaiv6iJf3CEwRg4YKLVsG8C2xMbjQpBhlO'
+        '6cw1XUZXFusr4s2mDLrbiBht0hSxS1LYnUmsTJrWJb3LcZgVuWokx6OoY0uBtZxI2t6KjocGZwBi'
+        'w6VUbdEyPPlvTngDFr5j411tgS4/zKcU+avJA7n15zT6hrh9fzs7KoQepjHPwngH5eWbmSQhzLie'
+        '5xaphAQiQHQXIDtMEYasCMePDEYUBgRpkwJNRoWajMSJi+CCSVBW+Tjrm/xU/2I7k4kOQdCHzWDD'
+        'o9ZiwpbRa5fY/VtEW7FKUM69IKqRnD4nTEvPphYkMrbD6RQDdO2cAmUGJyVaTJJl5Mk3xuWXplNB'
+        'aamt0RSftOZ80vc+oBKgmRvSB/UoA9T1AE06wbzdZDpqsdshSolOofRcVM7UqmH/1SjsWmgXLTfN'
+        'ZosQmVRqy6qoZlVkR6nbpTXghJsEEsWGhxrDtgdpz9i4oOzcXh5sWbg3piFb0/utzfbiyOvDbZ9S'
+        'uiPi25JV7cp+1nXBC3Vsrf1Hov5QS370gcSFyGAHBPAcP5mOgiwQha4JfBcEjeGMabfGpPThcgyw'
+        'x0jYflicdf32Wy3rLxw/n+1y1FTvan3uNzoVGrYyzRnwforr92aSG7oSYdm0Oe7VtPZy0JpEIa1k'
+        'kEaWxtto/Re0+7Ta0+Zpmd61+Ht7eK9OCAO/BntPkRzD0Dqt6PNI9H9Xuznn3CeanlzGr01804wD'
+        'tc9iHOPAfnXGUbrn233oIW78LDeFQQPQZ03pC3/wasx4PbX9PuqfmMXvhvEH4/vHxq9l6qMf8fim'
+        '+KsMP2ExHzGuX9D1X5Tjf9ogY+wPivJB13t4jby5sv9apB/kPpef3HP+72n3kh0='
+    )),
+    6: (1000, (
+        'Hj3YKmDvujiRFZB+rNyRswae1gfW4V2Ojg5oQmi0H1iKUPKaMH1ST9PC80s8Rd/HTjSNhbJXcQVY'
+        '/Ghtz60HjXKpP2oridzeCf0enEFU29GPMAoxDiSAfvr9Vt8R22ZogydMdujLeBmlPZzzqcuEAkxn'
+        'VJSQwdKIlB50gIUr6i/KhI6WO3ex+jZlKvBlv/e9BUHXLWDPckaiEzijnrFaiT50OkF+6eTxHibA'
+        'Uw220gWJv640ZAnooLYFN6iRYVkGm6a/9417cK2WpPdYRvcaepUZL8hgl2Cqii1Ew/k+t4sUmI2o'
+        'TUnt4rPIpSnge4tZO4Vft/jkJvvCBSJewESHdlxMMkJZxakb2NznPmsszQymJyyUNdRNz76A805X'
+        '0Vh378aFjp937zdyLOQ/JUK9z/SzN8fdvaoaJU4PqYLBu12BtJsIA1gp+GB8QJX8D+JmF7FEg2RB'
+        'EK1f+3EoKVU/FuExhMGHpJawGuiGESGROuChG2e1oXJdyV8LKIlh92M1QUaqMcFsH3M8sYxmPs/k'
+        'kPRkUYo/RLpwtnQZxiPoSNGRShVPSZ9tV1qcgTVYNVssV7d2EPXDQ2/kXEj8d+Xm7vQCXyM7b/W3'
+        'QqYyZQ+jOuZdMXXMapwkWuacXzBCadJITqdHni3mcs8j6rd7HcQUfgwHIXemlwZHeLLYcHecWFeU'
+        'hm9Z/GgvZyf1hU4vQUmhGFk0nHFgyXndGU/Yoh4S44rnAcgsrQEhnBsDUfnutkrYDUtTcxS0vqrH'
+        '47u2g9vPxnL3LBwedNury1XuWdy6BTck0AkPzx0Gw61U0/EgV05uM7Gn41M+pK6AaOsU7AfAWX6v'
+        'OAPa9jsn2I8weYN5/ku6m5q6V9hrwNFiWrE857rnToH9YXVuB2MganCKVAcqiYoYgV1C+Az0zD1f'
+        '1rtlhk7NMTox9SH1IH+R+l33ACT0enAAhNiCBDzC8pBHtQIRBnrkwdAKqWijBNE46UBRCoDaAUCw'
+        'AHAZ2c7hCBBX47CGuXtmDui4YKC2x2ubD9y5jLD8rPOgFCSf2YFAcgH9FQkQ1XE1zXMHEUeau2HL'
+        'mpI4HN0HdmHy58JLGWZCR3GVfUyEH6j08EG4JG7YG67hD+IqS2PKIr+QEvIywVtAJVqpZsJ6WvqX'
+        'JfQOQlKGZVzeLEJ+DgKrl8vQKUbh0jLaYoQQK/sgmmNozWa8NId3fHNN3rhAN5H3bxOiKOF1PhO9'
+        'QIPJhDyiOVidF5OXTa7rP228cxPWvAUMOasnSXRgJOJeRoK6C8QunNWuRMm3s/QMfUHpRtK0zOQx'
+        'lTVrQSLm3ZR1OlmrTh7x4ITkrAlgTl+qBvSo0ylDSRWUs5TU3bYhS6dh6BSdSD2OVikO9sU37V/8'
+        'VfWnr6VdXqZPWBurHaXr6SbdXxD5m1XR7fpcX3GN8CXeEeRoYDO7JHZFga/hY8jdp2Ydo9j9bjoi'
+        'r6bmEFtxaomp6MapciT1axLDgBa2hLIqb5TBV5bab+oNb+rKRXcD04pgdmw154cEoN/2dXipyAcU'
+        'pwE4dX+Mu5fCNoMxfLWn0xfPgs7efyTiNPf0cpjYhtgD0Zg4sboTh6J5xZikNkjOiJM7TIjyHfTj'
+        'jYQ1cpjYjXH9iZ94/NkmsWeclI4i8SkOXmMXltiFKhlTk7pGlTz7TdkT6qEml29ar5kbIp/akdP6'
+        'dhmnCGyImI7NAxmMcQl6ncvrRmpCj1tuozfxeTo0RA9aoX+thYp9KWI9qEVwK7rkh/oJrE+21oqK'
+        'jThTqYsKy4rf6M3itO8uLut5mJxwvgyiDsvHAiepvrwvkauOkKmDvQow7IwgLg8xwmsy43xspCao'
+        'xx7uaOx30ukTzjwgdCzEq5xXzvdj3NzUMiyiz7fMHQyc7INaz/NLcT1i57cN1BdLO01436l+0dj1'
+        'VR1c/h052haozJ2ExEhZ3Nlyjt32cRfo25l95n3auOMe4BkITN5jbaUh4qzHmw5I0hYg4v7QxR4T'
+        'p9Aq59Bbjl7DCca17KpJ0g7rN6xG6OBnLi6uXVJM7WscLC68ivHW8gVi1F9hm8+y9qNcbb9PG9Dw'
+        '8WqbQ18bKRKe+lRb81/m6GfG+Q25Qy+WlmK9+0HLSE/Ve/mF+5iQfm/+ohxjo6VvRQoZhoMCDzeD'
+        'KwJuxIJyQZi4qPTrVDikY8Xje6blnd5sgNRZ8ImAiIn9owZnpvAhmmFHAhXKTiAGjMOZAKET/oAr'
+        'lWdVAsa7UyAvMfHZByrBfjBzeNlyAW8f51AXcwFVB5VyQaB8ijhuBf7795DBXzEBCkRi4uCF437p'
+        'CFLeEtDGaIA5CIy6R/DKwnHlCLM4C/DKKl2UCONSwBDv9E9eDv9d6rCzRtyeDQn+uzDxCqkmDR9l'
+        'p+D7FfoADaIFIzDa8j27C/Cl7kDciZ++D/0wJ3C8ddViEi+jAdEnVIclEE+uYnEIyK6LEPP0LuEz'
+        'fucCFwsj6wFQJvG7EaGryyE6ZKyNF441zTFYvlncF6b5fUFdyktEEd8FQ8FdIBk1GB+t+qHEAOq9'
+        'HkxdPSGG/2f5GFc0uPHlaJ40GpXRhFGKf/AqGJ6xyeHLIKYKHJI1iBHJO31tGsq8WBHOKstYG3nt'
+        'BkH2o5EyHZg4dQIA3BA/JjXU6AJnUsL4IFOFj2IogfejJyz65VIWtMQ7JbxnC6IaPpsOIZbykfJ6'
+        'IrjKJ59IMoI+K8yXIcJX9BJ8+6+LKi+95LKlQ6jMKtG7l/KP86YxK1TFuYLWGvGqK7zbPmLZ+aDS'
+        'L7tyajK9nM/3KcbfjsNAw/w1MAMbKOMHEd7DNEzeoqMnqKi8Nldj1yNI0yqmNoH6sRNplvFdMsxs'
+        'MeNuAHTUM0CNnFM32utqMV7/PRNaT5KLM4ahxkNegansN9hYujOBUzWcOBtiasOjZQ26OIjR8pOs'
+        'yNyCPPz5B7PPaJOcOw+ux5PQtf9WOUmDqmPVyv5WO2/R/iPXLlznO6UYMEO9fXdOQhUHhhRCozzF'
+        'QGk+IMRExU8cQE7PBVQN9KxGRtpnGuQyDvstQWN58nR3+pLKQ6gkc6Ra4CphSB19a2SEQpDkTF2w'
+        '8mSE+mTASIHyLbSIxpmrTOYnxSTz2jzXSUn9uITVlvGXT0/VJ7S5Rk5LTaBqqeS5LR+yT+2AvrSf'
+        'purzVCCsp3VBmkjoVnTaH4UkZF1LUJlwwDUqLEalUOiqQkUvKtWYUtrr9qVS744iUUFgtiVWgGFY'
+        'U0p+S9U2vT4LV3KC0nV4HVWCV6TDSoUZevlIV48Xc7VcLgzwV/ak5RXAVeAlXjjMTQXmVmH1WqXr'
+        'e1Xq1R4NWLOF/BWsX4bgWPFrYAWzCxIIXzTv57WUBzZpXWkTrRWVK547XUb0rCX4CdLoX+D7UOX+'
+        'vT1wZGmGc1YLzozYZJ7jBWYtSlJdYvaPjjZWBIJHY7QMkYY5/pmdZe3lnHZ+vncEagHInUaD3yCw'
+        'aBhmfdbFRhUPaEsY9daE8VgQbm70WQbpiAJlbpBjMzbvHkCnbMMk/AaQBRW/a0AO+sa3y1RHaaz1'
+        'yiaadm98besyjLdBf8bscGGquUdEMRUhcLm7ipdpQ+5UdrxgEpcJsHpUdIu/ATcvhdT7dtPap/dS'
+        'TQ+ZdTy8MGdwPJ1fcUU7Klc2wZ3xcUjuLKc28ifAc5FjrudYOejpd79ke2c+W9Eqc89ogDcfdKCg'
+        'eC3PJ2fAI6nXelzOOkenIQB3frIk0LeP3F1Sfuh1npexwrROfwSg+ieydO6zfSZ/ehfzKpXqebSq'
+        'qnfbDXJTf5NPDCffwQQifdXY0/gDggZ7hBG51jgAP8ZKgjsPu6hiqndahBtZS3gkQxyKglnYdThE'
+        'gf3OgrXla0gLcKtwhrJQGagMwve4hv22ZIgXk8PphWCEhbg2IWklg4Dl3fh6BMyyh7iKtNjgIGOE'
+        'jDZ9rHjEHpLCjJg7r8iPRrT7jyzFzEjTd+czi0VPP3jVYllgi78YOSjaZDCUjdDKpoi/aYT0kBKZ'
+        'pUli4Eh1klyj1AkoWPd6lKk9RakSDzMykSdtTzlzP96al0jzgTl5+gBpk9A/18lfzQbgk8OyCxkc'
+        'NCAengrU0Jnj4YRommF63JmMiHZdmMHfMJnvko+snvCrFhmPt1CdnyABNUmRJ4B8m4P1frmfnIrV'
+        'neQu7Cm9uQ0jn/6EmfokKM15pM0ZNXptWiGQoN/AsGozG0kEpyCGOvpzgtKNoz/M3OpT6zhLoXAa'
+        'vXp2dlN5pXtmrkodUdkyo/jpm+pdOD2jpdbrvGqibjl5rh7JP8rHe47SqqnuTfqoB5qmrsJgyhqT'
+        'qYYrqxJRyMrWbb2NrVLdShqbZxEIrbriNQrZdB38q/O2LHtiJscctB4lentjfDijsEzUNwsn+LBT'
+        'sK3YIltJuCK7sNNOwjsT1+w+sQakY+syt0P+tx/WRvsW7x9FsX5Tiut2LfN3san4lJs7fZ0ks+67'
+        'TGuCylUkuBQN6/vBncx3vFQmuWvmc3xFuPro01vsIaN4uxjPpLvQF+9tvSIv0nvQJVhVuXJOYFvX'
+        'dcFvuYisLhv6AmZ1uYKWqGvYcXGKv77vLXvfqfAHwnA1u4xGwFrNxHlU3DwmpRDYxqSfaEwJ4s60'
+        'xpIhSdxLqDz4xueFQ7xtevRkxTZVTbw5P/DXwfVwpazDlxxQyAKJSSyHxkSlymfhDXyJnnQiyKqy'
+        'EFzKbVnzyuWG++ytl8MfzuTKDmyy2kMsy1fWgiyZAhsQyYJfsKy57UJHzYarndycmwd1yfofYyy/'
+        'dABpzdoNHP0AuCU/1DvP1v1mKr0b1GbIOv0SAceK0zlBw50Qeg/U0ZU6Di171CHd18CmUN1+WN9c'
+        '18VT9n1f5wuI2Ay5vm3jS6JW3A7Gi+3gP3pL2l0Lii2HH5f/3L2C5y3LBa5V2pPeUA2rfxv43p8C'
+        'Mu2sQNVQ3MWrgO2sKyOq2tpY/Q2SWOqB3QV2O+3S6ZCM2VVox121BtTD32iqOI20KHp124Eos92a'
+        'PC+t3bM4042cp7mx2/aesH4ghsr44Burlk4Ehz8w5HWpW+5oDsdJ4q92SH4KLIEd4stxUM4NJJxf'
+        '4QzCgp4X9END561Fse4bZan55/wgQc7jNBOB7nw2M07HB7+K6Hs75u6JXoOR7qwJfV7KHJN06Je9'
+        'xV6MwSHQ7sEdaY7Qf/267WnzNr7XYUtc74Qh0X6/XaeC6fnl1t69MPkZ6dvxIJ9CmLbY9go0Il9F'
+        'hVmx8nY3YT9EsK4G9m6BS89kMdTG9Fci7h9JlT5b8PwvG19wkeCc9yZXwg8YUbxt84hi6B96m36m'
+        '94qKXC8+3CFS9fWU8k+A8+D0/L5jfe+O0hSb+tjCgO/uUFnG/sT9G4+tLhH0/MPmcy+T+ibr+1bC'
+        'Xj/06Mov/09w4k+bEqNJ/4eSeB+cO8Ca/8oZ0c/+8Xpa/f7ajBBkLpCXAyQkRtB15ch8B4hC+mCg'
+        'eyG7EJTc8eFqJasPEP3LbeETSsosEaY+EBHlgs4iGGM6iwGmMBL9GvFHzvGWyxixHZXPXMGZ44ki'
+        'H/xWI6JBspszJueIhQIQc2vBKE1GVqLuzjRYLU/hTULYooPHNPg+NxOGNdfYP6IcxMQt2XruRN8S'
+        '1rQTrN7IQcDbSUTLQAyNSSNIlSUje5XGUlE43aXnGSQTXLJx69W+43NmYAWEFSZAiAM4biiHjDbF'
+        'VUtXaLr+RhaLNVyndZybZpfAvICgflloxJeG89NFeMG//6etq5RagDx7nAhxRY+XgxsFpdiDu0Z0'
+        'jKmInAjrEDGrjye/NkjxazyglBjeSgk0UkxQnP2c2FmyI3eNmfqj0Wop8cVDrE9bGrrL9tNmqblM'
+        'QItijpAstG3a3gsm72ChsyWZaes1AoEVvhwbO2vH9VY+vK/mjVvSWSjExBvWtxxmO+/OxlaCE9xo'
+        'tJJKwT3OvixRltbRx00977wVor3JyiNyIcz8f01Z0DEn4m1HdUDg0YYxWi20xker24SHkI394GcA'
+        '4im6YA4UDgjW4ZqQpS5/LA+p7q2+g48BzyfB92WoJk9+zDpN+C1UcU/oWPzb+ONbC2/tY+H/'
+    )),
+    7: (1000, (
+        '3VxspcoK8g34nyBVp6qK6xdJ9Mzgtv0pjGvHsTMlYsQAoRrPc02u+b1RIHlC2xEXtokHH1aWnl2y'
+        '2Ma3H71ANGC9JCBEzhcKg0VPNrl0jwzxJEIxHM73/MmvJy+cIgtgtS/T8GFyH4sA8M9nZHbJsvMK'
+        'nB4nD6muyCJjqQSunh6aNqQj2ebpIkqfeniuvO2HyTFQdKLe+i+Iyi7xFAmspsSlWTto9DqShbBf'
+        'C7eOYxbNDl2u7l7Yw0+Xut4MzeUoRn+jOf3W0Z875p0jEndCd1iGH4kOw8FZqG3zuGDkDUw44CCk'
+        '/s0DESBmi4Rpl7RWoQT8NmgpaTiSn6MWe6pt+itNek/njZ8H7pV7B750TQKfT/QCQgckIVepfGRN'
+        'oNAIvWTkgHq7b5skHxXCOVV8kFRx3mIdTuGNr3zidc8qOFakbJWeBHH/d5bKjrTjNIXNn2JuSmFy'
+        'f7rDgNJR22C6tq6MU3OYdN+5RFpLkwbbq30GqR6e/OpPJxxtStVLRnygfswEMV4w50EFwEs4UXcH'
+        'rFSQxM+D86lREQaCvdpuYpsRbx4vxFno8vJiCduYfwlJmyHaTkIt7GM/J5t6iRvcFwYYJbU2C+p4'
+        'nnmKxZn6YFJicxUwMCEuaYPDmtfpTN+JDLKegpgWnxX+qE7auMpJIaZtborMNxWe1W7JWCqS7r4l'
+        'OWVJiMzQSiLzdSVDvUmMEUXdjsjTxHTw6cltF+JKUBy4H0BxZdid1BaixQrwTJwlZJL4P9p9HxxU'
+        'netaawPuU2KXCeu3Ke96NB6fmPGqPpT4VMVvxiuULEONt9BP1z1DjJxNa8Jkrw8rfen8ltP1UwDU'
+        'uSspXYRtuEgtAdNP9ayIduuDaXgPyzYMvXJVgVsbKCCQdU4NNkbE3R8PQSnkxmuV2T4vonfQofU/'
+        '9JTrgOrwglz3tjjXIuR99lA7bEMf2sUeK4eRTH4dx8A5F2J9B/8Kkhkgi5+pZ1k5AQwZ68X3agxE'
+        'ABIOaOP6ABBVTzk7AE7wsOtmEB2uibAuMCFAKNN8+B5EAS1OrBSzM6XHrwmy8/n4sYaY5r+ubUOb'
+        'p9PdCWLuUB5ercFv9hP7ruDJluqcnWx43WqGKHI95zaGXFAjmNpCZk0R27ETpNNJ+hZ9x4HFOeSd'
+        'Jx6ivK4ejxR5caU55ESIsgjaCFPGaO5ORPkAPmpO788kHt6AXUP2EFZRhH4miFQYCh9idC1ztQEd'
+        'qjis/2FCzSEhKnHmNpcb3nDwJkjFT3cq/6Tmyu99ExK+BOaKPomE5aXoNKTD/KozxqpjTLdPgtlM'
+        '7ZNLGoiijJrRaGtRVlZiccmoOZrGOO/VErnLgKeqm2Ldy8jlbw8B6MZK21AeILvdb+e9SGWyuOny'
+        'Bfd8Xp0LL096saHq3OTBGBdpPUWm7JEF8OkF5oapGUZkA2G+j3ZjLbVn1hysqOY+DzxQGHImFpLI'
+        'x7nB9+fjrtx9vS1qg07CAF41R2dlT/VCYhPXHkDxMbH4gWxttZj44sz/Zpd+iPmBRxo/3tt5zCMg'
+        '7o/QpxnQdnR3k+q4a4OO7DW8V9uhcLlaOBYb8gypHpB4PEHOjlO1/BzgRs6RwSSwI25kHWSnMgJ8'
+        '3DRWCTmzd7GpDLhxj2+VRlzReO5mqSr1+lj6qpfdDgYUUM1NAnHeombvq2tDfjOs8gTDC6n4HJ9q'
+        '9/T/viNsqw6cDPia6elMntsgPN6mVIibZwNSfVWaC8UqSOlT9v/14ssm7oHa48AmAR4tdTIw6jQy'
+        'uqbzO/kBY1XSU6V8s+zH9z0oWfl86IKwbdTsl+Ek1oxuao1by2YVkhwIhdXGgvol1usAofBAD3gS'
+        'JpsOzr48D0T5DGCT/IxWAjCNmev+GPhZXRyLRkxhIWIOQcY/Ku6CDLMpZzGb47GR9hp0+O/MI78E'
+        '9OZmXI7vCKa1kc1y91R6igGqUZ59Z+MgGIdWt3s5hjovZCsH/CEhtIkha4Eq2o7wih9O8V0kTSP6'
+        'eL7jsWYGXKfA1/BiHmh7BptHBy0JHv8+k5OdKNrADdYylWu3xuto1taHvHemToyueTwjEGyoU/6l'
+        'XGzSK293/P7lmnfG0XhL/1vwZ7KsJ5MmlsMQYCrIrWYlgBWObQq30FBI5P0k6UeF6xJXvJGUOh95'
+        'Zo3ySoN9m6Z1SYF4OmH8pSIxx/lCZd+FUio/uKQGa5XQI4GYH2gJUtVEIGqOGhJa6JXWTedSsFF3'
+        'PwtJGpItEbXFKxaLYOw/Y9Ud2H+0lp41h4AHE+nRpKBDHou5UsA9GjSOtYAg3B/pTNQmNjouU14R'
+        'R7w0sxYLvAwIIBgEWjsWPmOCPy1yFUvhwsbKn8RBIssZ8HIokizlWLdATk371rkOLFPoJGEYFXxn'
+        'WHpCCuZYrMHrRfjL6HduQ2jLUd3hUbaU5Js7yN4mXtyEVHyxtjXcRj6ufh4R1RxtZLDYfo/rGfST'
+        'p0f7V4AaauQDMKV39MIj0zeAfPEDGQjjWYiJuV0h22JA6eNl8YUhrD1d7W4Q4YuOyB9Jy/ixENUE'
+        '8+ZcHRCia+IXKaCZUBnPvPPsrGJPvSOsUinQyFQQKWimVHi5FWDAkvwbijUIL5m3ZT9g5RJoAtTx'
+        'vRRKsWJp0uvuiLsmjc1BOl/lOnFMTjMO8h12ThmXUNXMggxKcjz4NyagH964gQNyRuPiQ/Gqi84s'
+        'kuTa4vVtRPBtu3mUWO433fn6dIwchCBPIjDOwFdDrHJnQdscKwAThuKArx85yw+dRjrE5rwXdiqu'
+        'c1n7GEFNONfjGb3Onw7Y103vz85NhCDOp6iVjOkvM+2Hig1Pehlq43hUYQjQDkZxSoB21wUT3kNt'
+        'kUlGdCHLwrX0llHHZ+x0QCjFf3TK7yRlxJ+AA6ort7kBgTUaoKEWa/CJQNa8AhRFuU5xNSUluOvQ'
+        'fuLTzx5UmzRp9koEKMxE/vsfds7qklqX1e5hTyPTde8irgrHGwxgVUvhVeMAKsUX19uxFSZMR+gU'
+        'ywG/70i2FaEhHQ9zSviIwLDFIXT1Xs+MvLqVN+lFTF6JTrMQWS/bAjpHD1f/KIHCi+xChpR4xXYE'
+        'X5n0vVMC915Qul2FvZSv0TzA38/bXmpi4zYnp9UymQbJeQMZa50slH2NRL0pI+BWmaFourTjRP3N'
+        '0NKBorBv44hu15m4N8CqbkZEriobty3uzirI25yZw4+bTfDSZGW1ZsifRA2nK3zild2Wnb5R/Wlq'
+        'vt1QLG942W6ximwXUTfkR2R70RzUVC+I+84RaP4Dd6cJUl+xpuuU9/uTGtHCr43yW0Ll6y6lZxx2'
+        'BaTm4t06CIMmNNKdiQRPPT2ujLgrF2y3d9Wzq84TvbB949nZ2tIUAPai6912lhzFdvrQ2LK4PCWw'
+        'wW0EXq7+y80H7+TguuqMh947Qf+Jg/9sbD/effvZSNxHFQI/4Zdy0YAu6gaVNEEk/53FZeByNQx2'
+        'yVCFYesUD0hSt/s9gOQxBT9nXgYZZw0ted8OwAzqrhKE25Qa98hFC1qFHL6ij9OEbcIRKNDRTFfI'
+        't6gaN/20TDbiTXayJmTRGcLLF5uVwKoTi97xdlJoxwkxDWMo40ulLXMqEYl3IWpESNmcnQ2KvICM'
+        'Cknlzki2oVF5UyCc8UJx9ZCXWhB/8UhZnt2yFSTwONPE/FLpJEohhMl0pXpAbDSzm0E3tLZWK39p'
+        'gA8tXlxGdFqbB0Tl3i9MJaxKZ1omXrKNwt3zgBIaEKg511BEXj8tAheg+KROgmiApiWFQy6Dagwo'
+        'osez7drbUfa5gdXOKQOmXvFGFMXadrVd6mSFNRYVvTLBd427xp30+ywNpUtuUBjJOqTPW07U9FWK'
+        '6eaYQqrL2ce0AjUFdiyKAjqEM6ecf61C/I+tSoqh+e4SAXtRCPOGwHGro0TPgnBV8xj72bsrBYQF'
+        'kmXVxPsCXWSa875gK6n9cjDXVEo+tQnHad5/WrAvnFeDrJfS0LNNVt9ioQXlK/6UFV4ZVgP5w0GS'
+        'WxcIa+j4lb7xselIEtOUO6ll+XR2Wda3FLt7UvPRFF06WyOsq26i0lhGW/dzHTkDiyvB6xUZyj3h'
+        'UaCI2ib1RZRse1V84OtaZ2m9/6ShRsbggkvPzeAwR4hJP4m4HakIDVSsDquKYE5WMr/RSmqXIbz/'
+        'BzmhkMatmBgJydcVYZer5fG7CQ15cwXvMo3pOZv0xPI3zM6+tDJF1oms2pAru0VvUcDxqa406oVG'
+        'n9fmez/q1+2BXXco3vYft9GpbvsQcKjwhN2r0WwM/nbfEmwHY+dn0mu0sRW8MXdknZ3dGeIfsqLv'
+        'FiDaypW3EuPlg1hbspWxwk593RmLJp+PCIQOk+47iHfQ85kXxlUcNOoi5n8iveQ/82T6GRfX+lBX'
+        'wZgc3RRbqpJuLo2JLzuav1cHkGjJc7beHeN30dvmUgeUT/IJF6qyUXkr35ixc3woTty2MJ5ZgVIg'
+        'f28MVQf6mg+OLPo67M/D0ZZO2sPoAEomSpD0b2y+39j7tDlvp3C+4zTLs8XfMik9BfYPvMkMIQ5H'
+        'x+NS5VOP+D6sWKL/+IQdDaG4/HxxeCwff8/by3HDXB/AEdvbkH3YiIb8gBILQFtF+AHb4KItOA0+'
+        '6vqMMAKsSgIrHAGP5qghKgBXs4DpQwA2RD3N/kB+AT/3RwBVzNazmxgzbJEkBPQSmJve5QoJiUF2'
+        'C2AJBPBmnaYEH9EL/eZCmukOz9HhMmiUGh+AjSXgRyYocTlcPkpcPKv6W2uMGrzkcTAGDldwp2Nj'
+        'hrVU7g2fg12moBx0Ic+YpHxZkPi2oU9hUG1cNr5wjD8vHYTyWh3YfmdcIxEPmKVHUgi76UHxTIRl'
+        '7W+UaEJTcwdNLfE+lBvfXaCwap6lSrhY9FW/nSQpBMgAvy8VgqGPKjiKzJEapX0F5xZGdYuCtKr1'
+        '4z6Ra5gZOX8wpqVw+p4wW3rymsS6K6/OZRDqGwWJuA7HjCYGiIhsRtQEwPek406obrzHQZiyxtZc'
+        '4MTvbNX4GGqO9FRZKjF/u7MQoRq7xYD4poxlZDnXBka+1Xgw5mM/lZ9PfWHyFNMyuBDrQwsKgWx1'
+        'xEWmfzY45mi6dHsepwcWPRaQC3ii94hISVPkDFNEZa59e4fSNIPitkuJGrHST8L0iirgRa8IQU6R'
+        'LISlIqT49ecnkPfxmu4NyH/qpTw/hKYIluktQmN47KOcgToaCN8VKJ3e0JQzlEkYwlmmCie1hjry'
+        'bpLgF9TVdMlwfTzGKyTb9os1GxJOW1/oaMEn1JtRiqSkheEBi35UX7RkjZMoPj8qZwQV5ty7AN0K'
+        'Orazd5+libGeXOdS5YAOQ+zhbA3bon8cskUOB7R0W2gRruljLOAXPVkDmASLq3ZoTNGDQ9+lhk4n'
+        'jpSLIwp++zNOeYW/okr+UM+wQOJpSGrVCzKCtjZ9x/kQiZrI9geaAs6H3pHuY0dKybo02XOWljnz'
+        'mwnbAziPH5jnM1kHWzZ4ZivhAc48M8VLA3OesV0lseQPXUJom1fn8xZhh8Zz7Nr73UKx/q2im788'
+        '86bUwabQgAa7/IRRQ2qrCM1uobjy1OcPUGo6b80kSDlYtNxiZC9zy9AjQiE47Z223REwbQBhhoyV'
+        'MV+TuEaDBvnH4KJGZW65fVGnjo7dEGkj8fi33GSUsiy/0jpK2EN4nlUqxREYKIaXhjGqOZJMdPRN'
+        'JxenTrwBfURT6iDJFhIJuYfIReWE3Nti9pwKZ+KPsRgRN+L21TrMnf2diqIFUy30lL4LqZuYWPam'
+        'VGKc0xOGijWlKn9GZQ9Iu1Vxep+WxUvp+Vy4zXEHlqrDFTPmV1RysN1CkKu8XlZZaVVsm9V/+6r6'
+        '+DAB4ZVfMln/c1LQBU9ulPFknPWhZTqyk2emPJ5bXB4lufGsqMLIxfyW5xcc8r4rUpo9JFMViqm2'
+        'sbNC1lUYt9K9Y2L4D8Tktfo2wbH4XSgM9FOqrxprjEitl6M54EzZy54GlUQApjLwjGAeMwkXhBzW'
+        '8YUAGHEJbsbR+fA+IGKjUKAFzrBnhETnw1kH2aTJvozqhIhTeFZ15t9aGnMjhAH7gQmVxjz6RtrP'
+        'M4HZhdFmtb8BT9Yz6Jytw9wZda5U3QSNZqi119bmpVH3ScD7TreBGAmhr1s6mVOi2Kb9UIPWbmOk'
+        'FEAktjxmC0IsWzO4nozLzfxMQQjzZxAg/hxvM4gKFv7ZYcgq6zoJgOSZ/huvMnCUyKev5DntriwP'
+        'ktx3PDiP9W5+GzvOJHdRCyajxtOr70SQMfnSfmYUR/T0HbYxNdp5Fo86SKW83kCDOBqfU3Co4+Bv'
+        'kONMdqnH+ie9YCkr7V753u4t9u0GtVXzBgiFFdOOgysq2NprwJUpSXI/oE4FqSV8kCybt/ON2Be1'
+        '38u/3BWXCiKCcgPe8YRkVQ5o1Ur7kISMF9KV78JLW11VFiHnLny27RCYjsn+Arh8SOge4SwvD6lq'
+        'As4kOI0LSwcUcbWL2w2KlZiobhVGjpeKFz3jW9jKQ6qx1lGKdg+Y7e6yvbHsb6g3nPfSQF5UvmI9'
+        'IkYON/3QkCVVsc4CyBReISb0JA50IogNsmnyunBLSSpNLq4kpI2jgExS5k94Z2ynbyPLLK7suJLs'
+        'kNo/h0l+OFRk2CVGaqIap7KKRTboL+lFc7XEQmy6kC/NQKJac+z2PoMvRt40iyGXquXl7GJL8tUd'
+        'uKxmiAxgmmSzKKcJZ6a5qx7I/Qb81qy9kftmZ+RNPeeZPDHQAX7Vn0hdox0oz6oKx0TGJ1qm1I5T'
+        's83zgVPuygCWQFW1tRHm3+G1ko1v3dvePUU65iUIdqDOCql0V1BuVhMV2ei9XZ0aivTF+t3T8dpT'
+        'h0+GBz0i8jxvOlKddV3wwdNM5SpEiwylg2hSFFpSTapJ4QGpr0qg9UOVIOsgv2+qkV2Zol69WRST'
+        'gZASpN+SmIfXVOV6opT2qInHa/AJVWrVt0HqajTyLW+r1cKCZtT0itZIf5cNzXvKZs9WjrZqduAD'
+        '+185EeuqpK3P7k9sI1b70fOdHuyQfzXH7tZoWw8bPjsmFR4o1jWbHW4R4FbN6j05vvdhYhu1lhOw'
+        'u+uFT7dY4ZdYJ4EscqiesbOWjuXpJX6rWuTSdZg9vpZsdnba265xdaJdaejP5pyuuA/U3jEH3By/'
+        'IMABLg4g7bpvlw2A1YUdC5iLeafsDcTlLbnmcus+Dp+Uc3HOIyaxWb1ydGQNzt4+wxyl3XDHkmvA'
+        'angFy33lK+wU7yDyJ54MCkNk0jcGZse3Nv+DJWJMJ7/Dt9U40jPg64zedcDwfZDTrro4hxIg5G2c'
+        'ZNSuPNt2Op1nsvpfFfkpxAktjOmzARWPxYiYL+bK4tcThBqvce8Z/i7IeJfRlJ5sbLDyRyUjVkpC'
+        'y3t5PyFUPQKGBZa1F76tUshzGK/WEGTPzy+cHDKvzMsMfBk9NqD7qoy/AeO5KBZgEkQOyFM4sTnw'
+        'tA+bB2aDM5nOgKud2xHmW6N1JYdz+QjccB75vsdyl5V9MXlbpF3ugdETSoWbTNpbbAiTpK3BuyI2'
+        '0ryq5AOBaeJ3KHzTNPkB/wF4un+DlPfgTXRKeorN9rT/oiLKm1K+T5sFEbIkzRYfpdhRWC3gvuwx'
+        'sznA8rbbFhwhM7ssc2ef+m2Ipi5Uf0bMzpMeq/dmiKJHg0W36GU0g5rcHWtgve1vDWyz4ra3XKh1'
+        'tbM7rpqrfbkd2GGqEEE+/XjYLa3vesO3WzBbv8wUhLvi3ftYUfOPcYsiIsZQOIaq2P4FfEtVEgIb'
+        'vgfsbganbwuuY180k4N3nPrlqc40snpWiOY9uk4hF3OoNzX4t7lU9RIO7NyPATYh9N5XqhubpK87'
+        '5aSSxXeak9fCEQvLqlTtHDPn18rS5Hvyd6zp9576xvk747NdJkEgirA+s0/tmsOvUnCfqnDzpsGc'
+        'gBv51atioNt+7wqhhjaudpt3h5P3e1Kgh0h1XYwXrbGAzvgspk/Ed3UL/ey647tGYiVLl+ISq9IJ'
+        'FfMqirIMaPmjykCyAPziE8lhCn4UQ+DPyb86oL/6XNeFe+PMdyPDZENTKH/ql2dkq+v2UWApGur7'
+        'OqlI7Nz9XLGrcBBe75pKvGjPaETh+rHHwexBzSgP7NsPf3Nf8JlYBpgp+6DQudNL/WHCZj6bfnnP'
+        'TweYfx/rDKDO/9C9tVZDj+i1dycp9/kmjeMI0fsJxYzXUfyVT5Tmz39SkawYUn+qNn/sHZ/4cP/0'
+        'X5X3J88RH4Q6if0h7fcaTTTUfvXPzS3EDT8='
+    )),
+}
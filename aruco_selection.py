@@ -0,0 +1,148 @@
+"""
+Distinct marker subset selection of the ArUco laser marker generator.
+
+Picks markers that are far apart in rotation-aware Hamming distance, for
+--select N. Imported on first use.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+import generate_aruco_laser as gal
+
+
+def _popcount64(values):
+    """Number of set bits of every element of a uint64 array."""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(values)
+    table = np.array([bin(k).count('1') for k in range(256)], dtype=np.uint8)
+    return table[values.view(np.uint8).reshape(values.shape + (8,))].sum(axis=-1, dtype=np.uint8)
+
+
+@lru_cache(maxsize=None)
+def marker_distance_matrix(aruco_dict_name):
+    """
+    Rotation-aware Hamming distances between all markers of a dictionary.
+    
+    Every marker and its four rotations are packed into one 64-bit word
+    (a 7x7 marker has 49 bits), so each pair costs four XORs and popcounts,
+    evaluated for the whole dictionary at once. The diagonal holds each
+    marker's distance to its own 90/180/270 degree rotations, which bounds
+    how well its orientation can be told apart.
+    
+    Args:
+        aruco_dict_name (str): ArUco dictionary name (e.g., '6X6_1000')
+    
+    Returns:
+        np.ndarray: Read-only uint8 matrix (N x N); entry (i, j) is the
+            fewest bit flips turning marker i into any rotation of marker j
+    """
+    bits = np.asarray(gal.load_dictionary_bits(aruco_dict_name))
+    count, n = bits.shape[0], bits.shape[1]
+    weights = np.uint64(1) << np.arange(n * n, dtype=np.uint64)
+    codes = [(np.rot90(bits, k, axes=(1, 2)).reshape(count, -1).astype(np.uint64) * weights).sum(axis=1)
+             for k in range(4)]
+    distances = np.full((count, count), 255, dtype=np.uint8)
+    for rotated in codes:
+        np.minimum(distances, _popcount64(codes[0][:, None] ^ rotated[None, :]), out=distances)
+    # A marker is trivially equal to itself; keep its distance to its own rotations
+    own = np.min([_popcount64(codes[0] ^ rotated) for rotated in codes[1:]], axis=0)
+    distances[np.arange(count), np.arange(count)] = own
+    distances.flags.writeable = False
+    return distances
+
+
+def select_distinct_markers(aruco_dict_name, count, refine=True):
+    """
+    Choose count markers of a dictionary with the largest minimum distance.
+    
+    Greedy farthest-point selection: start from the marker that is most
+    distinct from its own rotations, then repeatedly add the marker whose
+    nearest selected marker is farthest away (ties go to the marker with the
+    larger self-rotation distance, then the lower ID). With refine, closest
+    pairs are then improved by swapping one member for an unselected marker
+    while that raises the minimum distance or reduces how many pairs sit at it.
+    
+    Args:
+        aruco_dict_name (str): ArUco dictionary name (e.g., '6X6_1000')
+        count (int): Number of markers to select
+        refine (bool): Run the swap refinement after the greedy pass
+    
+    Returns:
+        list: Selected marker IDs in ascending order
+    
+    Raises:
+        ValueError: If count is not between 1 and the dictionary size
+    """
+    distances = marker_distance_matrix(aruco_dict_name).astype(np.int32)
+    total = len(distances)
+    if not 1 <= count <= total:
+        raise ValueError(f"Can select between 1 and {total} markers from {aruco_dict_name}, not {count}")
+    own = np.diagonal(distances).copy()
+    pairwise = distances.copy()
+    np.fill_diagonal(pairwise, np.iinfo(np.int32).max)
+    
+    # Lexicographic score: distance to the selection, then self-rotation distance
+    tie_break = own * total + (total - 1 - np.arange(total))
+    selected = [int(np.argmax(tie_break))]
+    nearest = pairwise[selected[0]].copy()
+    chosen = np.zeros(total, dtype=bool)
+    chosen[selected[0]] = True
+    for _ in range(count - 1):
+        score = np.where(chosen, -1, nearest.astype(np.int64) * total * total + tie_break)
+        pick = int(np.argmax(score))
+        selected.append(pick)
+        chosen[pick] = True
+        np.minimum(nearest, pairwise[pick], out=nearest)
+    
+    if refine and 2 < count < total:
+        selected = _refine_selection(pairwise, np.array(selected))
+    return sorted(int(i) for i in selected)
+
+
+def min_marker_distance(aruco_dict_name, marker_ids):
+    """
+    Smallest rotation-aware Hamming distance between any two of the given markers.
+    
+    Returns:
+        int or None: Bits, or None for fewer than two distinct markers
+    """
+    ids = np.unique(np.asarray(marker_ids, dtype=np.intp))
+    if len(ids) < 2:
+        return None
+    sub = marker_distance_matrix(aruco_dict_name)[np.ix_(ids, ids)].astype(np.int32)
+    np.fill_diagonal(sub, np.iinfo(np.int32).max)
+    return int(sub.min())
+
+
+def _refine_selection(pairwise, selected, max_rounds=None):
+    """Swap members of the closest pairs for better markers until no swap helps."""
+    def quality(ids):
+        sub = pairwise[np.ix_(ids, ids)]
+        worst = sub.min()
+        return worst, -int(np.count_nonzero(sub == worst))
+    
+    total = len(pairwise)
+    best = quality(selected)
+    for _ in range(max_rounds or 2 * len(selected)):
+        sub = pairwise[np.ix_(selected, selected)]
+        i, j = np.unravel_index(np.argmin(sub), sub.shape)
+        outside = np.setdiff1d(np.arange(total), selected)
+        improved = False
+        for slot in (i, j):
+            rest = np.delete(selected, slot)
+            # Distance of every outside marker to the markers that stay
+            candidates = outside[np.argsort(-pairwise[np.ix_(outside, rest)].min(axis=1), kind='stable')[:16]]
+            for candidate in candidates.tolist():
+                trial = selected.copy()
+                trial[slot] = candidate
+                score = quality(trial)
+                if score > best:
+                    selected, best, improved = trial, score, True
+                    break
+            if improved:
+                break
+        if not improved:
+            break
+    return selected
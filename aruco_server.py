@@ -0,0 +1,314 @@
+"""
+Local HTTP render service of the ArUco laser marker generator.
+
+Run with `generate_aruco_laser.py serve`. POST /render takes a JSON job and
+returns the rendered file; jobs are rendered in a pool of worker processes
+that keep the dictionaries decoded. Imported only by the 'serve' command.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import signal
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import generate_aruco_laser as gal
+
+
+# MIME types of the files a render job can produce (zip = several pages)
+CONTENT_TYPES = {
+    'pdf': 'application/pdf',
+    'svg': 'image/svg+xml',
+    'dxf': 'application/dxf',
+    'png': 'image/png',
+    'tiff': 'image/tiff',
+    'zip': 'application/zip',
+}
+
+_HTTP_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                 413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+def parse_service_job(job):
+    """
+    Validate a JSON render request and return its command-line arguments.
+    
+    The request is a job table as in batch manifests (see generate_aruco_laser.manifest_job_argv)
+    or {'args': [...]}. Options that read or write local files (--markers,
+    --cache, --cache-dir, --metrics-json) are refused and -o only names the
+    returned file.
+    
+    Args:
+        job (dict): Decoded JSON request
+    
+    Returns:
+        tuple: (argv, resolved job dict from generate_aruco_laser.resolve_job())
+    
+    Raises:
+        ValueError: If the request is not a valid job
+    """
+    if not isinstance(job, dict):
+        raise ValueError("request body must be a JSON object")
+    argv = gal.manifest_job_argv(job)
+    parser = gal.build_parser()
+    try:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stderr(devnull):
+            args = parser.parse_args(argv)
+    except SystemExit:
+        raise ValueError(f"invalid arguments: {' '.join(argv)}")
+    if args.markers or args.cache or args.cache_dir or args.metrics_json or args.profile or args.verify:
+        raise ValueError("--markers, --cache, --cache-dir, --metrics-json, --profile and --verify are not "
+                         "available through the service")
+    return argv, gal.resolve_job(args, parser)
+
+
+def render_job_bytes(job):
+    """
+    Render one job into memory.
+    
+    Runs the job in a temporary directory and returns the output file, or a
+    zip archive when the job writes several files (multi-page SVG/DXF/PNG/TIFF,
+    split PDFs).
+    
+    Args:
+        job (dict): Resolved job, as parse_service_job() returns it
+    
+    Returns:
+        tuple: (file name, format key of CONTENT_TYPES, bytes)
+    """
+    name = os.path.basename(job['output_file'])
+    with tempfile.TemporaryDirectory(prefix='aruco-laser-') as tmp_dir:
+        job = dict(job, output_file=os.path.join(tmp_dir, name), jobs=1, cache=None)
+        gal.generate_aruco_laser_pdf(verbose=False, **job)
+        files = sorted(os.listdir(tmp_dir))
+        if files == [name]:
+            with open(job['output_file'], 'rb') as f:
+                return name, job['output_format'], f.read()
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for file_name in files:
+                archive.write(os.path.join(tmp_dir, file_name), file_name)
+        return os.path.splitext(name)[0] + '.zip', 'zip', buffer.getvalue()
+
+
+def _warm_dictionaries(names):
+    """Worker initializer: decode dictionaries before the first job arrives."""
+    for name in names:
+        gal.load_marker_images(name)
+
+
+class RenderServer:
+    """
+    Local HTTP render service on asyncio.
+    
+    POST /render with a JSON job (see parse_service_job) returns the rendered
+    file; GET /health and GET /stats report status and counters. Requests are
+    validated and rendered in a process pool whose workers keep the
+    dictionaries loaded, so the event loop only moves bytes. Identical
+    requests that arrive while one is rendering share its result instead of
+    rendering again.
+    
+    Args:
+        host (str): Address to listen on (default: localhost only)
+        port (int): Port (0 picks a free one)
+        workers (int): Render processes (0 = one per CPU)
+        max_body (int): Largest accepted request body in bytes
+    """
+    
+    def __init__(self, host='127.0.0.1', port=8765, workers=0, max_body=1_000_000):
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.max_body = max_body
+        self.stats = dict(requests=0, rendered=0, coalesced=0, errors=0, render_seconds=0.0)
+        self._inflight = {}
+        self._pool = None
+        self._server = None
+    
+    async def start(self):
+        """Warm the dictionaries, start the worker pool and begin listening."""
+        names = list(gal.ARUCO_DICTS)
+        _warm_dictionaries(names)
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_dictionaries,
+                                         initargs=(names,))
+        try:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        except OSError:
+            self._pool.shutdown()
+            raise
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+    
+    async def close(self):
+        """Stop listening and shut the worker pool down."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+    
+    async def render(self, job):
+        """
+        Render a job, sharing the result with identical requests in flight.
+        
+        Returns:
+            tuple: (file name, format key, bytes, coalesced flag)
+        """
+        loop = asyncio.get_running_loop()
+        # Resolving can search the dictionary (--select): not on the event loop
+        argv, resolved = await loop.run_in_executor(self._pool, parse_service_job, job)
+        key = json.dumps({k: v for k, v in resolved.items() if k not in ('cache', 'jobs')},
+                         sort_keys=True, default=str)
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats['coalesced'] += 1
+            return (*await asyncio.shield(task), True)
+        
+        async def run():
+            start = time.perf_counter()
+            try:
+                result = await loop.run_in_executor(self._pool, render_job_bytes, resolved)
+            finally:
+                self._inflight.pop(key, None)
+                self.stats['render_seconds'] += time.perf_counter() - start
+            self.stats['rendered'] += 1
+            return result
+        
+        task = self._inflight[key] = asyncio.ensure_future(run())
+        return (*await asyncio.shield(task), False)
+    
+    async def _handle(self, reader, writer):
+        """Serve the requests of one connection (HTTP/1.1 keep-alive)."""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+                lines = head.decode('latin-1').split("\r\n")
+                method, path, version = (lines[0].split(' ') + ['', ''])[:3]
+                headers = {}
+                for line in lines[1:]:
+                    if ':' in line:
+                        field, value = line.split(':', 1)
+                        headers[field.strip().lower()] = value.strip()
+                keep_alive = (headers.get('connection', '').lower() != 'close'
+                              and version == 'HTTP/1.1')
+                try:
+                    length = int(headers.get('content-length') or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    # The body cannot be found, so the connection cannot be reused
+                    await self._respond(writer, 400, {'error': "invalid Content-Length"}, False)
+                    return
+                if length > self.max_body:
+                    await self._respond(writer, 413, {'error': f"body larger than {self.max_body} bytes"}, False)
+                    return
+                body = await reader.readexactly(length) if length else b""
+                self.stats['requests'] += 1
+                status, payload, extra = await self._dispatch(method, path.split('?')[0], body)
+                await self._respond(writer, status, payload, keep_alive, extra)
+                if not keep_alive:
+                    return
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+    
+    async def _dispatch(self, method, path, body):
+        """Route one request; returns (status, JSON object or (name, format, bytes), headers)."""
+        if path == '/health':
+            if method != 'GET':
+                return 405, {'error': 'use GET'}, {}
+            return 200, {'status': 'ok', 'version': gal.__version__, 'workers': self.workers}, {}
+        if path == '/stats':
+            if method != 'GET':
+                return 405, {'error': 'use GET'}, {}
+            return 200, dict(self.stats, inflight=len(self._inflight)), {}
+        if path != '/render':
+            return 404, {'error': f"no such endpoint: {path}"}, {}
+        if method != 'POST':
+            return 405, {'error': 'use POST with a JSON job'}, {}
+        start = time.perf_counter()
+        try:
+            job = json.loads(body or b"{}")
+        except ValueError as e:
+            self.stats['errors'] += 1
+            return 400, {'error': f"invalid JSON: {e}"}, {}
+        try:
+            name, file_format, data, coalesced = await self.render(job)
+        except ValueError as e:
+            self.stats['errors'] += 1
+            return 400, {'error': str(e)}, {}
+        except Exception as e:
+            self.stats['errors'] += 1
+            return 500, {'error': f"{type(e).__name__}: {e}"}, {}
+        return 200, (name, file_format, data), {
+            'X-Render-Ms': f"{(time.perf_counter() - start) * 1000:.1f}",
+            'X-Coalesced': 'yes' if coalesced else 'no',
+        }
+    
+    async def _respond(self, writer, status, payload, keep_alive, extra=None):
+        
+        if isinstance(payload, dict):
+            content_type, data = 'application/json', json.dumps(payload).encode('utf-8')
+            headers = {}
+        else:
+            name, file_format, data = payload
+            content_type = CONTENT_TYPES[file_format]
+            headers = {'Content-Disposition': f'attachment; filename="{name}"'}
+        headers.update(extra or {})
+        head = [f"HTTP/1.1 {status} {_HTTP_REASONS[status]}",
+                f"Content-Type: {content_type}",
+                f"Content-Length: {len(data)}",
+                f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        head += [f"{field}: {value}" for field, value in headers.items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1') + data)
+        await writer.drain()
+
+
+def serve_main(argv):
+    """Command-line entry point for 'serve': run the local HTTP render service."""
+    parser = argparse.ArgumentParser(
+        prog='aruco-laser serve',
+        description='Serve marker sheets over local HTTP: POST a JSON job to /render')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='Port, 0 for any free port (default: 8765)')
+    parser.add_argument('-j', '--workers',
+                        type=int,
+                        default=0,
+                        help='Render worker processes (default: 0 = one per CPU)')
+    args = parser.parse_args(argv)
+    
+    async def run():
+        server = await RenderServer(args.host, args.port, args.workers).start()
+        print(f"Listening on http://{args.host}:{server.port} ({server.workers} workers)", flush=True)
+        # Stop cleanly on Ctrl-C or SIGTERM so the worker processes exit too
+        # (Windows event loops have no signal handlers; Ctrl-C still ends asyncio.run())
+        stop = asyncio.Event()
+        if sys.platform != 'win32' and threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                asyncio.get_running_loop().add_signal_handler(signum, stop.set)
+        try:
+            await stop.wait()
+        finally:
+            await server.close()
+    
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"Error: {e}")
+        return 1
+    print("Stopped")
+    return 0
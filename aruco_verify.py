@@ -0,0 +1,339 @@
+"""
+Round-trip verification of the ArUco laser marker generator (--verify).
+
+Reads each page of a written output back (PNG/TIFF, or PDF with PyMuPDF) or
+draws it with the drawing code, and detects its markers with OpenCV.
+Imported on first use.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import aruco_boards
+import generate_aruco_laser as gal
+from generate_aruco_laser import A4, ARUCO_DICTS, RASTER_FORMATS, inch, mm
+
+
+class EngraveRasterRenderer(gal.MarkerRenderer):
+    """
+    Renderer that rasterizes the engrave layer of every page it is given.
+    
+    Drawing code run through it produces the bitmap of exactly the geometry
+    it emits for the chosen engrave, label, cut and travel options, which is
+    what verify_layout() checks when an output cannot be read back. Filled
+    rectangles and even-odd polygons are sampled at pixel centres (edges
+    snapped as in iter_raster_strips()); the cut and label layers are ignored.
+    
+    Args:
+        page_size (tuple): Default page size in PDF points
+        dpi (float): Resolution in dots per inch
+    
+    Attributes:
+        pages (list): Greyscale image of each finished page (uint8, 0 = engraved)
+    """
+    
+    def __init__(self, page_size=A4, dpi=300):
+        super().__init__(page_size)
+        self.dpi = dpi
+        self.pages = []
+        self._layer = None
+    
+    def begin_page(self, page_size=None):
+        self._size = page_size or self.page_size
+        width, height = gal.raster_page_size(self._size, self.dpi)
+        self._image = np.zeros((height, width), dtype=bool)
+        # Rectangles go into a 2-D difference array, summed once at the end
+        self._cover = np.zeros((height + 1, width + 1), dtype=np.int32)
+    
+    def end_page(self):
+        self._image |= self._cover.cumsum(axis=0).cumsum(axis=1)[:-1, :-1] > 0
+        self.pages.append(np.where(self._image, np.uint8(0), np.uint8(255)))
+        self._image = self._cover = None
+    
+    def set_layer(self, layer):
+        self._layer = layer
+    
+    def rects(self, rects, fill=True):
+        rects = np.asarray(rects, dtype=np.float64).reshape(-1, 4)
+        if self._layer != 'engrave' or not fill or not len(rects):
+            return
+        height, width = self._image.shape
+        scale = self.dpi / inch
+        c0 = np.clip(np.rint(rects[:, 0] * scale), 0, width).astype(np.int64)
+        c1 = np.clip(np.rint((rects[:, 0] + rects[:, 2]) * scale), 0, width).astype(np.int64)
+        r0 = np.clip(np.rint((self._size[1] - rects[:, 1] - rects[:, 3]) * scale), 0, height).astype(np.int64)
+        r1 = np.clip(np.rint((self._size[1] - rects[:, 1]) * scale), 0, height).astype(np.int64)
+        for rows, cols, step in ((r0, c0, 1), (r0, c1, -1), (r1, c0, -1), (r1, c1, 1)):
+            np.add.at(self._cover, (rows, cols), step)
+    
+    def polygon(self, loops):
+        loops = [np.asarray(loop, dtype=np.float64).reshape(-1, 2) for loop in loops]
+        if self._layer != 'engrave' or not loops:
+            return
+        height, width = self._image.shape
+        scale = self.dpi / inch
+        start = np.concatenate(loops)
+        end = np.concatenate([np.roll(loop, -1, axis=0) for loop in loops])
+        x0, x1 = start[:, 0] * scale, end[:, 0] * scale
+        y0, y1 = (self._size[1] - start[:, 1]) * scale, (self._size[1] - end[:, 1]) * scale
+        # Every pixel row whose centre an edge crosses, and the pixel column
+        # from which that crossing flips the even-odd parity
+        first = np.ceil(np.minimum(y0, y1) - 0.5).astype(np.int64)
+        counts = np.maximum(np.ceil(np.maximum(y0, y1) - 0.5).astype(np.int64) - first, 0)
+        edge = np.repeat(np.arange(len(start)), counts)
+        rows = np.arange(len(edge)) - np.repeat(np.cumsum(counts) - counts, counts) + first[edge]
+        xs = x0[edge] + (rows + 0.5 - y0[edge]) * (x1[edge] - x0[edge]) / (y1[edge] - y0[edge])
+        cols = np.clip(np.ceil(xs - 0.5), 0, width).astype(np.int64)
+        keep = (rows >= 0) & (rows < height)
+        rows, cols = rows[keep], cols[keep]
+        if not len(rows):
+            return
+        # Parity flips in the shape's bounding box, accumulated along each row
+        r0, c0, c1 = rows.min(), cols.min(), cols.max()
+        flips = np.zeros((rows.max() + 1 - r0, c1 + 1 - c0), dtype=np.uint8)
+        np.add.at(flips, (rows - r0, cols - c0), 1)
+        inside = np.bitwise_xor.accumulate(flips & 1, axis=1)[:, :-1].astype(bool)
+        self._image[r0:r0 + len(inside), c0:c1] |= inside
+    
+    def polylines(self, paths):
+        pass
+    
+    def text(self, x, y, text, size):
+        pass
+    
+    def string_width(self, text, size):
+        return gal.helvetica_width(text, size)
+    
+    def close(self):
+        pass
+
+
+def _expected_corners(page_layout, marker_size_mm, border_mm, page_size, dpi):
+    """Corners of every marker in OpenCV pixel coordinates (n x 4 x 2, clockwise from top-left)."""
+    if 'size' in page_layout.dtype.names:
+        size, border = page_layout['size'], page_layout['border']
+    else:
+        size = np.full(len(page_layout), marker_size_mm * mm)
+        border = np.full(len(page_layout), border_mm * mm)
+    scale = dpi / inch
+    # Pixel edges snapped as in iter_raster_strips; OpenCV puts pixel centres on integers
+    left = np.rint((page_layout['x'] + border) * scale) - 0.5
+    right = np.rint((page_layout['x'] + border + size) * scale) - 0.5
+    top = np.rint((page_size[1] - page_layout['y'] + border) * scale) - 0.5
+    bottom = np.rint((page_size[1] - page_layout['y'] + border + size) * scale) - 0.5
+    return np.stack([np.column_stack([left, top]), np.column_stack([right, top]),
+                     np.column_stack([right, bottom]), np.column_stack([left, bottom])], axis=1)
+
+
+def _import_pymupdf():
+    """PyMuPDF's module (imported as pymupdf, or fitz in older releases), or None."""
+    try:
+        import pymupdf
+    except ImportError:
+        try:
+            import fitz as pymupdf
+        except ImportError:
+            return None
+    return pymupdf if hasattr(pymupdf, 'open') else None
+
+
+def output_page_sources(output_file, output_format='pdf', n_pages=1, split=False):
+    """
+    Where each page of a written output can be read back for verify_layout().
+    
+    PNG/TIFF pages are read as images. PDF pages are rasterized with PyMuPDF
+    when it is installed, across every file of a split output (split=True,
+    see RolloverPDFRenderer).
+    
+    Returns:
+        list or None: One ('image', path) or ('pdf', path, page index) per
+            page, or None when the output cannot be read back (SVG, DXF, or
+            PDF without PyMuPDF)
+    """
+    if output_format in RASTER_FORMATS:
+        return [('image', gal.paged_output_path(output_file, page, n_pages > 1)) for page in range(n_pages)]
+    pymupdf = _import_pymupdf() if output_format == 'pdf' else None
+    if pymupdf is None:
+        return None
+    sources, k = [], 0
+    while len(sources) < n_pages and (split or not k):
+        path = gal.rollover_output_path(output_file, k) if split else output_file
+        if not os.path.exists(path):
+            break
+        with pymupdf.open(path) as document:
+            sources.extend(('pdf', path, index) for index in range(len(document)))
+        k += 1
+    return sources if len(sources) == n_pages else None
+
+
+def _page_image(page_layout, aruco_dict_name, page_size, dpi, source):
+    """Greyscale engrave image of one page (0 = engraved): read back from source, or drawn."""
+    if source[0] == 'image':
+        import cv2
+        image = cv2.imread(source[1], cv2.IMREAD_GRAYSCALE)
+        if image is None:
+            raise RuntimeError(f"Cannot read {source[1]} for verification")
+        return image
+    if source[0] == 'pdf':
+        pymupdf = _import_pymupdf()
+        with pymupdf.open(source[1]) as document:
+            pixmap = document[source[2]].get_pixmap(matrix=pymupdf.Matrix(dpi / inch, dpi / inch),
+                                                   alpha=False)
+        rgb = np.frombuffer(pixmap.samples, dtype=np.uint8).reshape(pixmap.height, pixmap.width, -1)
+        # Engrave is blue; the red cut lines and black labels are not engraved
+        engraved = (rgb[:, :, 2] > 127) & (rgb[:, :, 0] < 128)
+        return np.where(engraved, np.uint8(0), np.uint8(255))
+    
+    kind, options = source[1]
+    renderer = EngraveRasterRenderer(page_size, dpi)
+    if kind == 'board':
+        aruco_boards.render_board(renderer, page_layout, aruco_dict_name=aruco_dict_name, **options)
+    elif kind == 'bed':
+        gal.render_bed(renderer, [page_layout], aruco_dict_name, **options)
+    else:
+        gal.render_layout(renderer, page_layout, aruco_dict_name, **options)
+    return renderer.pages[0]
+
+
+def _verify_page(task):
+    """
+    Detect the markers of one page image and compare them with the layout.
+    
+    Returns:
+        tuple: (markers found, largest corner error in pixels, list of (id, problem))
+    """
+    import cv2
+    
+    page_layout, aruco_dict_name, marker_size_mm, border_mm, page_size, dpi, tolerance, source = task
+    image = _page_image(page_layout, aruco_dict_name, page_size, dpi, source)
+    expected = _expected_corners(page_layout, marker_size_mm, border_mm, page_size, dpi)
+    
+    # Detect only within the markers' bounding box (plus a quiet margin)
+    x0, y0 = 0, 0
+    if len(page_layout):
+        margin = 16
+        x0 = max(int(expected[:, :, 0].min()) - margin, 0)
+        y0 = max(int(expected[:, :, 1].min()) - margin, 0)
+        x1 = int(expected[:, :, 0].max()) + margin
+        y1 = int(expected[:, :, 1].max()) + margin
+        image = image[y0:y1, x0:x1]
+    # The page is perfectly black and white, so one adaptive threshold pass
+    # finds the same candidates as the default three window sizes
+    parameters = cv2.aruco.DetectorParameters()
+    parameters.adaptiveThreshWinSizeMin = parameters.adaptiveThreshWinSizeMax = 3
+    # The smallest accepted marker is relative to the image size; on a large
+    # sheet it must still admit the smallest marker placed
+    if len(page_layout):
+        smallest = 4 * (expected[:, 1, 0] - expected[:, 0, 0]).min()
+        parameters.minMarkerPerimeterRate = min(parameters.minMarkerPerimeterRate,
+                                                0.5 * smallest / max(image.shape))
+    detector = cv2.aruco.ArucoDetector(cv2.aruco.getPredefinedDictionary(ARUCO_DICTS[aruco_dict_name][0]),
+                                       parameters)
+    corners, ids, _ = detector.detectMarkers(image)
+    found_corners = np.array(corners, dtype=np.float64).reshape(-1, 4, 2) + (x0, y0)
+    found_ids = ids.ravel() if ids is not None else np.empty(0, dtype=np.int64)
+    
+    problems = []
+    matched = np.zeros(len(found_ids), dtype=bool)
+    found, worst = 0, 0.0
+    for k, marker_id in enumerate(page_layout['id'].tolist()):
+        candidates = np.flatnonzero((found_ids == marker_id) & ~matched)
+        if not len(candidates):
+            problems.append((marker_id, "not detected"))
+            continue
+        # The detection of this ID closest to where the marker was placed
+        errors = np.hypot(*(found_corners[candidates] - expected[k]).transpose(2, 0, 1)).max(axis=1)
+        best = int(np.argmin(errors))
+        matched[candidates[best]] = True
+        error = float(errors[best])
+        side = expected[k][1, 0] - expected[k][0, 0]
+        if error > max(tolerance, 0.05 * side):
+            problems.append((marker_id, f"corners off by {error:.1f} px"))
+        else:
+            found += 1
+            worst = max(worst, error)
+    for marker_id in found_ids[~matched].tolist():
+        problems.append((marker_id, "unexpected extra detection"))
+    return found, worst, problems
+
+
+def verify_layout(layout, aruco_dict_name='4X4_50', marker_size_mm=3, border_mm=0.5, page_size=A4,
+                  dpi=300, workers=0, tolerance=2.0, drawing=None, sources=None):
+    """
+    Round-trip check: rasterize every page and detect its markers with OpenCV.
+    
+    Each page's engrave layer is read back from the written output when
+    sources are given (see output_page_sources()), or else drawn by the
+    drawing code into an EngraveRasterRenderer, and run through
+    cv2.aruco.ArucoDetector. Every placed marker must be found exactly once,
+    with all four corners within tolerance pixels (or 5% of the marker side)
+    of where it was placed, in the right orientation. Pages are spread over
+    a process pool.
+    
+    Args:
+        layout (np.ndarray): Layout table the output was drawn from
+        dpi (float): Resolution of the pages (PNG/TIFF sources: the file's)
+        workers (int): Processes (0 = one per CPU, 1 = this process only)
+        tolerance (float): Allowed corner error in pixels
+        drawing (tuple, optional): How the pages were drawn when there are
+            no sources: ('layout', render_layout() options), ('board',
+            render_board() options) or ('bed', render_bed() options)
+            (default: render_layout() with its defaults)
+        sources (list, optional): Per page, where to read it back from
+        (remaining arguments as for render_layout())
+    
+    Returns:
+        dict: pages, markers, found, max_corner_error_px, seconds, dpi,
+            source ('output' or 'drawing') and problems, a list of
+            (page, id, description)
+    
+    Raises:
+        RuntimeError: If OpenCV is not installed
+    """
+    try:
+        import cv2  # noqa: F401
+    except ImportError:
+        raise RuntimeError("Verification needs OpenCV: pip install opencv-python")
+    
+    start = time.perf_counter()
+    page_starts = np.flatnonzero(np.diff(layout['page'], prepend=-1)).tolist() + [len(layout)]
+    drawn = ('drawing', drawing or ('layout', dict(marker_size_mm=marker_size_mm, border_mm=border_mm)))
+    tasks = [(layout[a:b], aruco_dict_name, marker_size_mm, border_mm, page_size, dpi, tolerance,
+              sources[k] if sources else drawn)
+             for k, (a, b) in enumerate(zip(page_starts[:-1], page_starts[1:]))]
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    with gal._phase('verify'):
+        if workers > 1:
+            gal.load_marker_images(aruco_dict_name)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_verify_page, tasks))
+        else:
+            results = [_verify_page(task) for task in tasks]
+    
+    problems = [(int(task[0]['page'][0]), marker_id, problem)
+                for task, (_, _, page_problems) in zip(tasks, results)
+                for marker_id, problem in page_problems]
+    return dict(pages=len(tasks), markers=len(layout), found=sum(r[0] for r in results),
+                max_corner_error_px=max((r[1] for r in results), default=0.0),
+                seconds=time.perf_counter() - start, dpi=dpi, source='output' if sources else 'drawing',
+                problems=problems)
+
+
+def format_verify_report(report, limit=20):
+    """Summary of verify_layout(): one line when everything decodes, else the problems."""
+    where = "of the written output" if report.get('source') == 'output' else "as drawn"
+    if not report['problems']:
+        pages = f"{report['pages']} page" + ("" if report['pages'] == 1 else "s")
+        return (f"✓ Verified {report['found']} of {report['markers']} markers on {pages} "
+                f"{where} at {report['dpi']:g} dpi (max corner error {report['max_corner_error_px']:.1f} px, "
+                f"{report['seconds']:.1f}s)")
+    lines = [f"✗ Verification failed: {report['found']} of {report['markers']} markers decoded correctly "
+             f"at {report['dpi']:g} dpi, {len(report['problems'])} problems"]
+    for page, marker_id, problem in report['problems'][:limit]:
+        lines.append(f"  page {page + 1}, ID {marker_id}: {problem}")
+    if len(report['problems']) > limit:
+        lines.append(f"  ... and {len(report['problems']) - limit} more")
+    return "\n".join(lines)
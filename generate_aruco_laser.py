@@ -2,7 +2,6 @@
 # /// script
 # requires-python = ">=3.8"
 # dependencies = [
-#     "opencv-python>=4.8.0",
 #     "numpy>=1.24.0",
 #     "reportlab>=4.0.0",
 # ]
@@ -43,134 +42,3608 @@ Examples:
     
     # Explicit grid layout: 5 rows × 4 columns
     uv run generate_aruco_laser.py --dict 4X4_50 --nrows 5 --ncols 4
+    
+    # Engrave each marker as merged polygons instead of one square per cell
+    uv run generate_aruco_laser.py --dict 7X7_1000 --engrave-mode polygons
 
 Author: Pavan Kumar Kaushik
 License: MIT
 """
 
-import cv2
-import numpy as np
-import argparse
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import mm
+import abc
+import argparse
+import contextlib
+import contextvars
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zlib
+from functools import lru_cache
+
+# NumPy, OpenCV and ReportLab are imported only when rendering starts, so
+# --help, argument validation and ID-range errors stay fast.
+
+
+class _LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access.
+    
+    On first use the real module replaces the stand-in in this module's
+    globals, so later lookups cost nothing extra.
+    """
+    
+    def __init__(self, name, alias):
+        self._name = name
+        self._alias = alias
+    
+    def __getattr__(self, attr):
+        import importlib
+        module = importlib.import_module(self._name)
+        globals()[self._alias] = module
+        return getattr(module, attr)
+
+
+np = _LazyModule('numpy', 'np')
+
+# Parts of the tool that only some runs need live in their own modules, also
+# imported on first use. Their public names can still be imported from here.
+_boards = _LazyModule('aruco_boards', '_boards')
+_selection = _LazyModule('aruco_selection', '_selection')
+_server = _LazyModule('aruco_server', '_server')
+_verify = _LazyModule('aruco_verify', '_verify')
+
+_MODULE_EXPORTS = {
+    'aruco_boards': ('board_marker_count', 'default_square_mm', 'fit_board_shape', 'compute_board',
+                     'render_board', 'format_board_label'),
+    'aruco_selection': ('marker_distance_matrix', 'select_distinct_markers', 'min_marker_distance'),
+    'aruco_verify': ('EngraveRasterRenderer', 'output_page_sources', 'verify_layout', 'format_verify_report'),
+    'aruco_server': ('CONTENT_TYPES', 'RenderServer', 'parse_service_job', 'render_job_bytes', 'serve_main'),
+}
+_EXPORTED_FROM = {name: module for module, names in _MODULE_EXPORTS.items() for name in names}
+
+
+def __getattr__(name):
+    # Module attribute fallback (PEP 562): public names of the split-off modules
+    if name not in _EXPORTED_FROM:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    return getattr(importlib.import_module(_EXPORTED_FROM[name]), name)
+
+__version__ = '1.0.0'
+
+# Units and page sizes in PDF points (same values as reportlab.lib)
+inch = 72.0
+mm = inch / 2.54 * 0.1
+A4 = (210 * mm, 297 * mm)
+letter = (8.5 * inch, 11 * inch)
+
+# Available ArUco dictionaries with their OpenCV ids (cv2.aruco.DICT_*) and marker counts
+ARUCO_DICTS = {
+    '4X4_50': (0, 50),
+    '4X4_100': (1, 100),
+    '4X4_250': (2, 250),
+    '4X4_1000': (3, 1000),
+    '5X5_50': (4, 50),
+    '5X5_100': (5, 100),
+    '5X5_250': (6, 250),
+    '5X5_1000': (7, 1000),
+    '6X6_50': (8, 50),
+    '6X6_100': (9, 100),
+    '6X6_250': (10, 250),
+    '6X6_1000': (11, 1000),
+    '7X7_50': (12, 50),
+    '7X7_100': (13, 100),
+    '7X7_250': (14, 250),
+    '7X7_1000': (15, 1000),
+}
+
+# How the black cells of a marker are turned into engrave geometry:
+# - cells:    one filled square per black cell (original behaviour)
+# - rects:    black cells merged into maximal rectangles
+# - polygons: black cells merged into closed outlines (even-odd fill for holes)
+ENGRAVE_MODES = ('cells', 'rects', 'polygons')
+
+# How cut outlines are drawn:
+# - outlines: one closed square per marker (original behaviour)
+# - merged:   all outline edges of a page merged into one line per grid line,
+#             so edges shared by touching markers are cut only once
+CUT_MODES = ('outlines', 'merged')
+
+# Calibration boards, laid out as OpenCV builds them:
+# - grid:    cv2.aruco.GridBoard, markers in rows and columns spacing_mm apart
+# - charuco: cv2.aruco.CharucoBoard, a chessboard (top-left square black) with
+#            a marker centred in every white square
+BOARD_TYPES = ('grid', 'charuco')
+
+# Bed mode (one sheet-sized page): markers placed and drawn per tile, and
+# buffered PDF operators above this many bytes compressed into the file
+BED_TILE_MARKERS = 2048
+BED_STREAM_BYTES = 4_000_000
+
+# How marker ID labels are drawn:
+# - text:  Helvetica text on the label layer (original behaviour)
+# - paths: digits as filled outlines on the engrave layer, for laser software
+#          that ignores text or converts thousands of labels slowly
+LABEL_MODES = ('text', 'paths')
+
+# PDF writers: the built-in native writer, or ReportLab's general-purpose canvas
+PDF_WRITERS = ('native', 'reportlab')
+
+# Output file formats. SVG, DXF and the bitmaps have no pages, so multi-page
+# jobs write one file per page (name_p001.svg, name_p002.svg, ...)
+OUTPUT_FORMATS = ('pdf', 'svg', 'dxf', 'png', 'tiff')
+
+# Bitmap formats: 1-bit images of the engrave layer for galvo/bitmap workflows
+RASTER_FORMATS = ('png', 'tiff')
+
+# Laser layers and their colours (RGB 0-1): blue = engrave, red = cut, black = labels
+LAYER_COLORS = {
+    'engrave': (0, 0, 1),
+    'cut': (1, 0, 0),
+    'label': (0, 0, 0),
+}
+
+# Head speeds in mm/s used for the job-time estimate of --optimize-travel.
+# Rough defaults for a CO2/diode machine; only the travel share changes.
+JOB_TIME_SPEEDS = {
+    'travel': 200.0,
+    'engrave': 100.0,
+    'cut': 20.0,
+    'label': 100.0,
+}
+
+
+def dictionary_cache_dir():
+    """
+    Directory used for the on-disk dictionary bit cache.
+    
+    Honours ARUCO_LASER_CACHE_DIR, then XDG_CACHE_HOME, then ~/.cache.
+    """
+    cache_dir = os.environ.get('ARUCO_LASER_CACHE_DIR')
+    if not cache_dir:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        cache_dir = os.path.join(base, 'aruco-laser')
+    return cache_dir
+
+
+def load_dictionary_bits(aruco_dict_name, packed=False, use_cache=True, source='auto'):
+    """
+    Decode every marker of a dictionary into a bit tensor in one pass.
+    
+    By default the bits come from the tables vendored in aruco_dict_data.py,
+    decoded with NumPy alone, so OpenCV is not needed. With source='opencv'
+    (or when the tables are missing) they are unpacked from OpenCV's byte
+    list instead, cached on disk as .npy keyed by dictionary name and OpenCV
+    version, and memory-mapped on later runs.
+    
+    Args:
+        aruco_dict_name (str): ArUco dictionary name (e.g., '4X4_50', '5X5_100')
+        packed (bool): Return the bits packed along each marker (N x ceil(n*n/8))
+        use_cache (bool): Read and write the on-disk cache (OpenCV source only)
+        source (str): 'auto', 'vendored' or 'opencv'
+    
+    Returns:
+        np.ndarray: uint8 array (N x n x n) of inner bits, 1 = white, 0 = black
+    """
+    if source not in ('auto', 'vendored', 'opencv'):
+        raise ValueError(f"Unknown dictionary source '{source}'")
+    
+    bits = None
+    if source != 'opencv':
+        try:
+            bits = _vendored_dictionary_bits(aruco_dict_name)
+        except ImportError:
+            if source == 'vendored':
+                raise
+    if bits is None:
+        bits = _opencv_dictionary_bits(aruco_dict_name, use_cache)
+    
+    if packed:
+        return np.packbits(bits.reshape(len(bits), -1), axis=1)
+    return bits
+
+
+@lru_cache(maxsize=None)
+def _vendored_marker_table(marker_size):
+    """Unpack the vendored nXn_1000 table into an (N x n x n) array."""
+    import base64
+    import aruco_dict_data
+    
+    count, encoded = aruco_dict_data.DICTIONARIES[marker_size]
+    raw = np.frombuffer(base64.b64decode(''.join(encoded)), dtype=np.uint8)
+    bits = np.unpackbits(raw)[:count * marker_size * marker_size]
+    bits = bits.reshape(count, marker_size, marker_size)
+    bits.flags.writeable = False
+    return bits
+
+
+def _vendored_dictionary_bits(aruco_dict_name):
+    """Bits of a predefined dictionary from the vendored tables."""
+    marker_size = int(aruco_dict_name.split('X')[0])
+    dict_id, max_markers = ARUCO_DICTS[aruco_dict_name]
+    # Every predefined dictionary is a prefix of the 1000-marker one
+    return _vendored_marker_table(marker_size)[:max_markers]
+
+
+def _opencv_dictionary_bits(aruco_dict_name, use_cache=True):
+    """Bits of a predefined dictionary decoded from OpenCV, with the on-disk cache."""
+    import cv2
+    
+    dict_id, max_markers = ARUCO_DICTS[aruco_dict_name]
+    cache_file = os.path.join(dictionary_cache_dir(),
+                              f"{aruco_dict_name}-opencv-{cv2.__version__}.npy")
+    
+    if use_cache and os.path.exists(cache_file):
+        try:
+            return np.load(cache_file, mmap_mode='r')
+        except (OSError, ValueError):
+            pass
+    
+    aruco_dict = cv2.aruco.getPredefinedDictionary(dict_id)
+    n = aruco_dict.markerSize
+    # Each row of the byte list holds the four rotations back to back;
+    # the first n_bytes are the unrotated marker, MSB first
+    byte_list = np.asarray(aruco_dict.bytesList)[:max_markers]
+    n_bytes = byte_list.shape[1]
+    raw = byte_list.reshape(len(byte_list), -1)[:, :n_bytes]
+    unpacked = np.unpackbits(raw, axis=1)
+    # OpenCV right-aligns the bits of a trailing partial byte
+    tail = (n * n) % 8
+    if tail:
+        unpacked = np.concatenate([unpacked[:, :-8], unpacked[:, -tail:]], axis=1)
+    bits = np.ascontiguousarray(unpacked.reshape(-1, n, n))
+    if use_cache:
+        _save_array_atomic(cache_file, bits)
+    return bits
+
+
+def _save_array_atomic(path, array):
+    """Write an .npy file via a temporary file so readers never see it half written."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, array)
+        os.replace(tmp_path, path)
+    except OSError:
+        # The cache is only an optimisation; read-only homes just skip it
+        pass
+
+
+@lru_cache(maxsize=None)
+def load_marker_images(aruco_dict_name):
+    """
+    All markers of a dictionary as grid-resolution images.
+    
+    Slicing the result gives the same array as
+    cv2.aruco.generateImageMarker(aruco_dict, marker_id, grid_size).
+    
+    Args:
+        aruco_dict_name (str): ArUco dictionary name (e.g., '4X4_50', '5X5_100')
+    
+    Returns:
+        np.ndarray: Read-only uint8 array (N x grid_size x grid_size), 0 = black, 255 = white
+    """
+    bits = load_dictionary_bits(aruco_dict_name)
+    images = np.zeros((bits.shape[0], bits.shape[1] + 2, bits.shape[2] + 2), dtype=np.uint8)
+    images[:, 1:-1, 1:-1] = bits * np.uint8(255)
+    images.flags.writeable = False
+    return images
+
+
+# Structured dtype of a layout table: one row per marker, position is the
+# top-left corner of the marker (including border) in PDF points
+LAYOUT_DTYPE = [('page', '<i4'), ('x', '<f8'), ('y', '<f8'), ('id', '<i4')]
+
+# Layout of markers with individual sizes (pack_layout): adds the marker size
+# and border of every row, also in PDF points
+PACKED_LAYOUT_DTYPE = LAYOUT_DTYPE + [('size', '<f8'), ('border', '<f8')]
+
+# Room reserved below a marker for its ID label when packing (baseline 8pt below)
+LABEL_SPACE = 8
+
+
+def resolve_grid(markers_per_page=20, nrows=None, ncols=None):
+    """
+    Work out the per-page grid from markers_per_page and optional nrows/ncols.
+    
+    Args:
+        markers_per_page (int): How many markers per page (used if nrows/ncols not specified)
+        nrows (int, optional): Explicit number of rows per page (overrides markers_per_page)
+        ncols (int, optional): Explicit number of columns per page (overrides markers_per_page)
+    
+    Returns:
+        tuple: (rows, cols) per page
+    """
+    if nrows is not None and ncols is not None:
+        # Both explicitly specified
+        return nrows, ncols
+    if nrows is not None:
+        # Only nrows specified, calculate ncols from markers_per_page
+        return nrows, markers_per_page // nrows
+    if ncols is not None:
+        # Only ncols specified, calculate nrows from markers_per_page
+        return markers_per_page // ncols, ncols
+    # Neither specified, calculate square grid from markers_per_page
+    cols = int(np.sqrt(markers_per_page))
+    return markers_per_page // cols, cols
+
+
+def compute_layout(marker_ids, page_size=A4, marker_size_mm=3, border_mm=0.5, spacing_mm=20,
+                   markers_per_page=20, nrows=None, ncols=None):
+    """
+    Place every marker on its page in one vectorized pass.
+    
+    Markers fill each page row by row, and the grid is centred on the page.
+    
+    Args:
+        marker_ids (list): List of marker IDs to place
+        page_size (tuple): Page size in PDF points (A4 or letter)
+        marker_size_mm (float): Size of the marker in millimeters
+        border_mm (float): White border around marker in millimeters
+        spacing_mm (float): Space between markers in millimeters
+        markers_per_page (int): How many markers per page (used if nrows/ncols not specified)
+        nrows (int, optional): Explicit number of rows per page (overrides markers_per_page)
+        ncols (int, optional): Explicit number of columns per page (overrides markers_per_page)
+    
+    Returns:
+        np.ndarray: Structured array of LAYOUT_DTYPE (page, x, y, id), one row per marker
+    """
+    rows, cols = resolve_grid(markers_per_page, nrows, ncols)
+    page_width, page_height = page_size
+    
+    pitch = marker_size_mm * mm + border_mm * 2 * mm + spacing_mm * mm
+    total_width = cols * (marker_size_mm * mm + border_mm * 2 * mm) + (cols - 1) * spacing_mm * mm
+    total_height = rows * (marker_size_mm * mm + border_mm * 2 * mm) + (rows - 1) * spacing_mm * mm
+    start_x = (page_width - total_width) / 2
+    start_y = (page_height - total_height) / 2
+    
+    ids = np.asarray(marker_ids, dtype=np.int32).ravel()
+    index = np.arange(len(ids))
+    slot = index % (rows * cols)
+    
+    layout = np.empty(len(ids), dtype=LAYOUT_DTYPE)
+    layout['page'] = index // (rows * cols)
+    layout['x'] = start_x + (slot % cols) * pitch
+    layout['y'] = page_height - (start_y + (slot // cols) * pitch)
+    layout['id'] = ids
+    return layout
+
+
+def iter_layout_pages(marker_ids, page_size=A4, marker_size_mm=3, border_mm=0.5, spacing_mm=20,
+                      markers_per_page=20, nrows=None, ncols=None):
+    """
+    Lay out markers from any iterable one page at a time.
+    
+    IDs are consumed lazily, so generators of any length can be laid out
+    without holding more than one page of them.
+    
+    Args:
+        marker_ids (iterable): Marker IDs to place
+        (remaining arguments as for compute_layout())
+    
+    Yields:
+        np.ndarray: Layout table (LAYOUT_DTYPE) of one page, pages numbered from 0
+    """
+    from itertools import islice
+    
+    rows, cols = resolve_grid(markers_per_page, nrows, ncols)
+    ids = iter(marker_ids)
+    page = 0
+    while True:
+        chunk = list(islice(ids, rows * cols))
+        if not chunk:
+            return
+        layout = compute_layout(chunk, page_size=page_size, marker_size_mm=marker_size_mm,
+                                border_mm=border_mm, spacing_mm=spacing_mm, nrows=rows, ncols=cols)
+        layout['page'] = page
+        yield layout
+        page += 1
+
+
+def bed_grid(page_size, marker_size_mm=3, border_mm=0.5, spacing_mm=2, margin_mm=5, show_labels=True):
+    """
+    Grid of a bed-sized sheet: how many markers fit across and down, and their pitch.
+    
+    Rows keep room for the ID labels below the markers when labels are shown.
+    
+    Returns:
+        tuple: (cols, rows, pitch_x, pitch_y), pitches in PDF points
+    """
+    total, gap = (marker_size_mm + 2 * border_mm) * mm, spacing_mm * mm
+    pitch_x = total + gap
+    pitch_y = total + gap + (LABEL_SPACE if show_labels else 0)
+    cols = int(np.floor((page_size[0] - 2 * margin_mm * mm + gap) / pitch_x + 1e-9))
+    rows = int(np.floor((page_size[1] - 2 * margin_mm * mm + gap) / pitch_y + 1e-9))
+    return max(cols, 0), max(rows, 0), pitch_x, pitch_y
+
+
+def _bed_full_error(page_size, cols, rows):
+    """The error raised when more markers are given than a bed sheet holds."""
+    return ValueError(f"The {page_size[0] / mm:g} x {page_size[1] / mm:g} mm sheet holds "
+                      f"{cols * rows} markers ({cols} x {rows}) at this size and spacing")
+
+
+def iter_bed_tiles(marker_ids, page_size=A4, marker_size_mm=3, border_mm=0.5, spacing_mm=2,
+                   margin_mm=5, show_labels=True, tile_markers=None):
+    """
+    Place markers from any iterable on one bed-sized sheet, one tile at a time.
+    
+    Markers fill the sheet row by row from the top-left margin (see
+    bed_grid()). Each tile is a band of whole rows holding about
+    tile_markers markers; IDs are consumed lazily and placed with array
+    arithmetic, so only one tile exists at a time, whatever the total.
+    
+    Args:
+        marker_ids (iterable): Marker IDs, e.g. a generator
+        margin_mm (float): Unused margin along the sheet edges in millimeters
+        show_labels (bool): Keep room for the ID labels below each row
+        tile_markers (int, optional): Markers per tile (default: BED_TILE_MARKERS)
+        (remaining arguments as for compute_layout())
+    
+    Yields:
+        np.ndarray: Layout table (LAYOUT_DTYPE, page 0) of one band, top band first
+    
+    Raises:
+        ValueError: If the markers do not fit on the sheet
+    """
+    from itertools import islice
+    
+    cols, rows, pitch_x, pitch_y = bed_grid(page_size, marker_size_mm, border_mm, spacing_mm,
+                                            margin_mm, show_labels)
+    band = max(1, (tile_markers or BED_TILE_MARKERS) // max(cols, 1)) * max(cols, 1)
+    ids = iter(marker_ids)
+    placed = 0
+    while True:
+        chunk = np.fromiter(islice(ids, band), dtype=np.int32)
+        if not len(chunk):
+            return
+        if placed + len(chunk) > cols * rows:
+            raise _bed_full_error(page_size, cols, rows)
+        slot = placed + np.arange(len(chunk))
+        layout = np.empty(len(chunk), dtype=LAYOUT_DTYPE)
+        layout['page'] = 0
+        layout['x'] = margin_mm * mm + (slot % cols) * pitch_x
+        layout['y'] = page_size[1] - margin_mm * mm - (slot // cols) * pitch_y
+        layout['id'] = chunk
+        yield layout
+        placed += len(chunk)
+
+
+def pack_rectangles(widths, heights, bin_width, bin_height):
+    """
+    Pack rectangles onto as few bins as possible with a skyline packer.
+    
+    Rectangles are placed largest first. Each bin keeps a skyline (the filled
+    depth along its width) and every rectangle goes to the first bin where it
+    fits, at the position that keeps it highest, then leftmost. A bin that
+    rejected a rectangle is skipped for all rectangles at least that large.
+    
+    Args:
+        widths (array-like): Rectangle widths
+        heights (array-like): Rectangle heights
+        bin_width (float): Usable bin width
+        bin_height (float): Usable bin height
+    
+    Returns:
+        tuple: (bin, x, y) arrays, the top-left corner of each rectangle
+            measured from the top-left of its bin
+    
+    Raises:
+        ValueError: If a rectangle is larger than a bin
+    """
+    widths = np.asarray(widths, dtype=np.float64).ravel()
+    heights = np.asarray(heights, dtype=np.float64).ravel()
+    if np.any(widths > bin_width + 1e-9) or np.any(heights > bin_height + 1e-9):
+        raise ValueError("A marker does not fit on the sheet")
+    
+    bins = np.zeros(len(widths), dtype=np.int32)
+    xs = np.zeros(len(widths))
+    ys = np.zeros(len(widths))
+    # Per bin: skyline as parallel lists of segment start x and depth, plus
+    # the smallest rectangle it has rejected
+    skylines = []
+    rejected = []
+    
+    for k in np.lexsort((-widths, -heights)).tolist():
+        w, h = widths[k], heights[k]
+        for b, (starts, depths) in enumerate(skylines):
+            if w >= rejected[b][0] and h >= rejected[b][1]:
+                continue
+            spot = _skyline_fit(starts, depths, w, h, bin_width, bin_height)
+            if spot is not None:
+                break
+            rejected[b] = (min(w, rejected[b][0]), min(h, rejected[b][1]))
+        else:
+            skylines.append(([0.0], [0.0]))
+            rejected.append((np.inf, np.inf))
+            b = len(skylines) - 1
+            spot = (0.0, 0.0)
+        x, y = spot
+        _skyline_place(*skylines[b], x, w, y + h, bin_width)
+        bins[k], xs[k], ys[k] = b, x, y
+    return bins, xs, ys
+
+
+def _skyline_fit(starts, depths, w, h, bin_width, bin_height):
+    """Highest, then leftmost (x, y) where a w x h rectangle rests on the skyline, or None."""
+    best = None
+    n = len(starts)
+    for i in range(n):
+        x = starts[i]
+        if x + w > bin_width + 1e-9:
+            break
+        # The rectangle rests on the deepest segment under its width
+        y = depths[i]
+        j = i + 1
+        while j < n and starts[j] < x + w - 1e-9:
+            y = max(y, depths[j])
+            j += 1
+        if y + h <= bin_height + 1e-9 and (best is None or y < best[1] - 1e-9):
+            best = (x, y)
+    return best
+
+
+def _skyline_place(starts, depths, x, w, depth, bin_width):
+    """Raise the skyline to depth over [x, x + w), merging equal neighbours."""
+    end = x + w
+    # Old depth where the rectangle ends, which continues to its right
+    after = max(k for k in range(len(starts)) if starts[k] <= end + 1e-9)
+    
+    new_starts = [sx for sx in starts if sx < x - 1e-9] + [x]
+    new_depths = depths[:len(new_starts) - 1] + [depth]
+    if end < bin_width - 1e-9:
+        new_starts.append(end)
+        new_depths.append(depths[after])
+    for k in range(after + 1, len(starts)):
+        new_starts.append(starts[k])
+        new_depths.append(depths[k])
+    
+    starts[:] = [new_starts[0]]
+    depths[:] = [new_depths[0]]
+    for sx, sd in zip(new_starts[1:], new_depths[1:]):
+        if abs(sd - depths[-1]) > 1e-9:
+            starts.append(sx)
+            depths.append(sd)
+
+
+def pack_layout(marker_ids, page_size=A4, marker_size_mm=10, border_mm=0.5, spacing_mm=2,
+                margin_mm=5, show_labels=True):
+    """
+    Pack markers of individual sizes onto as few sheets as possible.
+    
+    Every marker occupies its outline plus, with labels, the label below it
+    (widened if the label is wider than the marker). spacing_mm is kept
+    between markers and margin_mm along the sheet edges.
+    
+    Args:
+        marker_ids (list): List of marker IDs to place
+        page_size (tuple): Sheet size in PDF points
+        marker_size_mm (float or list): Marker size in millimeters, one value or one per marker
+        border_mm (float or list): White border in millimeters, one value or one per marker
+        spacing_mm (float): Gap between markers in millimeters
+        margin_mm (float): Unused margin along the sheet edges in millimeters
+        show_labels (bool): Reserve room for the ID labels
+    
+    Returns:
+        np.ndarray: Structured array of PACKED_LAYOUT_DTYPE, sorted by sheet
+            and then top to bottom, left to right
+    
+    Raises:
+        ValueError: If a marker does not fit on the sheet
+    """
+    ids = np.asarray(marker_ids, dtype=np.int32).ravel()
+    size = np.broadcast_to(np.asarray(marker_size_mm, dtype=np.float64) * mm, ids.shape)
+    border = np.broadcast_to(np.asarray(border_mm, dtype=np.float64) * mm, ids.shape)
+    total = size + 2 * border
+    
+    width, height = total.copy(), total.copy()
+    if show_labels:
+        label_width = np.array([helvetica_width(str(marker_id), 6) for marker_id in ids.tolist()])
+        width = np.maximum(width, label_width)
+        height = height + LABEL_SPACE
+    
+    # Pad every item by the spacing and give the sheet the same extra room,
+    # so the gap is kept between items but not at the far edges
+    gap = spacing_mm * mm
+    page_width, page_height = page_size
+    bins, x, y = pack_rectangles(width + gap, height + gap,
+                                 page_width - 2 * margin_mm * mm + gap,
+                                 page_height - 2 * margin_mm * mm + gap)
+    
+    layout = np.empty(len(ids), dtype=PACKED_LAYOUT_DTYPE)
+    layout['page'] = bins
+    layout['x'] = margin_mm * mm + x + (width - total) / 2
+    layout['y'] = page_height - margin_mm * mm - y
+    layout['id'] = ids
+    layout['size'] = size
+    layout['border'] = border
+    return layout[np.lexsort((layout['x'], -layout['y'], layout['page']))]
+
+
+def format_packing_report(layout, page_size):
+    """Sheet count and material utilisation of a packed layout."""
+    if not len(layout):
+        return "  Sheets: 0"
+    total = layout['size'] + 2 * layout['border']
+    n_sheets = int(layout['page'].max()) + 1
+    sheet_area = page_size[0] * page_size[1]
+    used = np.bincount(layout['page'], weights=total * total, minlength=n_sheets) / sheet_area
+    per_sheet = ", ".join(f"{u * 100:.0f}%" for u in used.tolist())
+    return (f"  Sheets: {n_sheets} of {page_size[0] / mm:.0f}×{page_size[1] / mm:.0f} mm, "
+            f"utilisation {used.mean() * 100:.1f}% ({per_sheet})")
+
+
+def check_marker_ids(marker_ids, aruco_dict_name):
+    """
+    Check that marker IDs exist in an ArUco dictionary.
+    
+    Args:
+        marker_ids (list or numpy.ndarray): Marker IDs, e.g. a layout's 'id' column
+        aruco_dict_name (str): ArUco dictionary name
+    
+    Raises:
+        ValueError: If the dictionary is unknown or an ID is outside it
+    """
+    _validate_options(dict(aruco_dict_name=aruco_dict_name))
+    max_markers = ARUCO_DICTS[aruco_dict_name][1]
+    if not len(marker_ids):
+        return
+    # Layout columns are checked in numpy; plain lists without importing it
+    low, high = (marker_ids.min(), marker_ids.max()) if hasattr(marker_ids, 'min') else \
+        (min(marker_ids), max(marker_ids))
+    if low < 0 or high >= max_markers:
+        raise ValueError(f"Marker IDs must be between 0 and {max_markers-1} for {aruco_dict_name}")
+
+
+def _validate_options(options):
+    """
+    Check sheet settings, as named in generate_aruco_laser_pdf(); absent ones are skipped.
+    
+    The one place every entry point (generate_aruco_laser_pdf(), the
+    streaming and bed generators, MarkerSheetGenerator and the CLI) validates
+    its settings, so they all fail the same way.
+    
+    Raises:
+        ValueError: If a setting or a combination of settings is invalid
+    """
+    get = options.get
+    if 'aruco_dict_name' in options and options['aruco_dict_name'] not in ARUCO_DICTS:
+        raise ValueError(f"Unknown dictionary '{options['aruco_dict_name']}', "
+                         f"expected one of {list(ARUCO_DICTS)}")
+    for key, label, choices in (('engrave_mode', 'engrave mode', ENGRAVE_MODES),
+                                ('cut_mode', 'cut mode', CUT_MODES),
+                                ('label_mode', 'label mode', LABEL_MODES),
+                                ('pdf_writer', 'PDF writer', PDF_WRITERS),
+                                ('output_format', 'output format', OUTPUT_FORMATS)):
+        if key in options and options[key] not in choices:
+            raise ValueError(f"Unknown {label} '{options[key]}', expected one of {choices}")
+    
+    output_format, native = get('output_format', 'pdf'), get('pdf_writer', 'native') == 'native'
+    if output_format in RASTER_FORMATS and 'dpi' in options and not options['dpi'] > 0:
+        raise ValueError(f"DPI must be positive, got {options['dpi']}")
+    sizes = [options[key] for key in ('marker_size_mm', 'border_mm') if key in options]
+    if sizes and not get('pack') and any(np.ndim(size) for size in sizes):
+        raise ValueError("Markers of different sizes need pack=True")
+    if get('board') is not None and get('pack'):
+        raise ValueError("A board cannot be packed")
+    if get('bed'):
+        if get('pack') or get('board') is not None or get('optimize_travel'):
+            raise ValueError("Bed mode cannot be combined with packing, boards or travel optimization")
+        if output_format == 'pdf' and not native:
+            raise ValueError("Bed mode needs the native PDF writer")
+    if output_format == 'pdf' and (get('max_pages') or get('max_bytes')) and not native:
+        raise ValueError("Splitting output by pages or size needs the native PDF writer")
+
+
+def generate_aruco_laser_pdf(marker_ids, aruco_dict_name='4X4_50', output_file="aruco_markers.pdf",
+                              marker_size_mm=3, border_mm=0.5, spacing_mm=20,
+                              page_size=A4, markers_per_page=20, nrows=None, ncols=None, show_labels=True,
+                              engrave_mode='cells', jobs=1, pdf_writer='native', output_format='pdf',
+                              cut_mode='outlines', optimize_travel=False, pack=False, margin_mm=5,
+                              max_pages=None, max_bytes=None, cache=None, dpi=600, board=None,
+                              board_shape=None, square_mm=None, bed=False, label_mode='text',
+                              verbose=True):
+    """
+    Generate ArUco markers optimized for laser cutting.
+    
+    Args:
+        marker_ids (list): List of marker IDs to generate
+        aruco_dict_name (str): ArUco dictionary name (e.g., '4X4_50', '5X5_100')
+        output_file (str): Output PDF filename
+        marker_size_mm (float or list): Size of the marker in millimeters; with pack,
+            one value per marker is allowed
+        border_mm (float or list): White border around marker in millimeters; with pack,
+            one value per marker is allowed
+        spacing_mm (float): Space between markers in millimeters
+        page_size (tuple): Page size (A4, letter, or any sheet size in points)
+        markers_per_page (int): How many markers per page (used if nrows/ncols not specified)
+        nrows (int, optional): Explicit number of rows per page (overrides markers_per_page)
+        ncols (int, optional): Explicit number of columns per page (overrides markers_per_page)
+        show_labels (bool): Whether to show marker ID labels below each marker
+        engrave_mode (str): Engrave geometry, one of ENGRAVE_MODES ('cells', 'rects', 'polygons')
+        jobs (int): Worker processes used to render pages (1 = serial, 0 = one per CPU)
+        pdf_writer (str): 'native' for the built-in PDF writer, 'reportlab' for ReportLab
+        output_format (str): 'pdf', 'svg', 'dxf', 'png' or 'tiff' (all but PDF
+            write one file per page; PNG/TIFF hold the engrave layer only)
+        cut_mode (str): Cut geometry, one of CUT_MODES ('outlines', 'merged')
+        optimize_travel (bool): Group each page by layer and reorder its paths
+            to shorten laser head travel (see TravelOrderingRenderer)
+        pack (bool): Pack markers onto as few sheets as possible (pack_layout)
+            instead of a centred grid; nrows/ncols/markers_per_page are ignored
+        margin_mm (float): Sheet edge margin in millimeters when packing
+        max_pages (int, optional): PDF only - split the output into numbered
+            files (out_001.pdf, ...) of at most this many pages
+        max_bytes (int, optional): PDF only - split the output into numbered
+            files of at most this many bytes (see RolloverPDFRenderer)
+        cache (OutputCache or bool, optional): Reuse earlier outputs of the
+            same job, and with the native writer unchanged PDF pages; True
+            uses the default cache directory
+        dpi (float): Resolution of PNG/TIFF output in dots per inch
+        board (str, optional): Lay the markers out as one calibration board,
+            'grid' or 'charuco' (see aruco_boards.compute_board()); the board takes the
+            first IDs of marker_ids, spacing_mm is the GridBoard gap and
+            margin_mm the margin inside its cut outline
+        board_shape (tuple, optional): Board (cols, rows) in markers or
+            squares (default: as large as fits on the page)
+        square_mm (float, optional): ChArUco square size in millimeters
+        bed (bool): Put every marker on one page_size sheet, placed and drawn
+            tile by tile in constant memory (see generate_aruco_laser_bed());
+            the grid, parallel, splitting and cache options do not apply
+        label_mode (str): How ID labels are drawn, one of LABEL_MODES ('text'
+            or 'paths'); board labels are always text
+        verbose (bool): Print a summary line when done (and the travel and
+            packing reports)
+    
+    Returns:
+        dict or None: Travel statistics when optimize_travel is set (saves PDF to output_file)
+    
+    Raises:
+        ValueError: If a setting or marker ID is invalid
+    """
+    _validate_options(dict(aruco_dict_name=aruco_dict_name, marker_size_mm=marker_size_mm,
+                           border_mm=border_mm, engrave_mode=engrave_mode, pdf_writer=pdf_writer,
+                           output_format=output_format, cut_mode=cut_mode, label_mode=label_mode,
+                           optimize_travel=optimize_travel, pack=pack, max_pages=max_pages,
+                           max_bytes=max_bytes, dpi=dpi, board=board, bed=bed))
+    rollover = output_format == 'pdf' and bool(max_pages or max_bytes)
+    
+    if bed:
+        generate_aruco_laser_bed(marker_ids, aruco_dict_name, output_file, marker_size_mm, border_mm,
+                                 spacing_mm, page_size, margin_mm, show_labels, engrave_mode,
+                                 output_format, cut_mode, dpi, label_mode=label_mode, verbose=verbose)
+        return None
+    with _phase('layout'):
+        if board is not None:
+            cols, rows = board_shape or _boards.fit_board_shape(board, page_size, marker_size_mm,
+                                                                spacing_mm, square_mm, margin_mm,
+                                                                show_labels)
+            layout, squares, outline = _boards.compute_board(board, marker_ids, cols, rows, page_size,
+                                                             marker_size_mm, spacing_mm, square_mm,
+                                                             margin_mm, show_labels)
+        elif pack:
+            layout = pack_layout(marker_ids, page_size=page_size, marker_size_mm=marker_size_mm,
+                                 border_mm=border_mm, spacing_mm=spacing_mm, margin_mm=margin_mm,
+                                 show_labels=show_labels)
+        else:
+            layout = compute_layout(marker_ids, page_size=page_size, marker_size_mm=marker_size_mm,
+                                    border_mm=border_mm, spacing_mm=spacing_mm,
+                                    markers_per_page=markers_per_page, nrows=nrows, ncols=ncols)
+    check_marker_ids(layout['id'], aruco_dict_name)
+    n_pages = int(layout['page'][-1]) + 1 if len(layout) else 1
+    
+    if cache is True:
+        cache = OutputCache()
+    if cache is not None:
+        job_key = cache.job_key(dict(
+            ids=layout['id'], dictionary=aruco_dict_name, marker_size_mm=marker_size_mm,
+            border_mm=border_mm, spacing_mm=spacing_mm, page_size=page_size,
+            grid=resolve_grid(markers_per_page, nrows, ncols), show_labels=show_labels,
+            engrave_mode=engrave_mode, pdf_writer=pdf_writer, output_format=output_format,
+            cut_mode=cut_mode, optimize_travel=optimize_travel, pack=pack, margin_mm=margin_mm,
+            max_pages=max_pages, max_bytes=max_bytes,
+            dpi=dpi if output_format in RASTER_FORMATS else None,
+            board=board and (board, cols, rows, square_mm), label_mode=label_mode))
+        with _phase('cache'):
+            restored = cache.restore(job_key, output_file)
+        if restored is not None:
+            files, travel = restored
+            if verbose:
+                where = f"{len(files)} files: {files[0]} ... {files[-1]}" if len(files) > 1 else files[0]
+                print(f"✓ Up to date (cached): {len(layout)} markers in {where}")
+            return travel
+    
+    render_options = dict(aruco_dict_name=aruco_dict_name, marker_size_mm=marker_size_mm,
+                          border_mm=border_mm, page_size=page_size, show_labels=show_labels,
+                          engrave_mode=engrave_mode, pdf_writer=pdf_writer,
+                          output_format=output_format, cut_mode=cut_mode,
+                          optimize_travel=optimize_travel, label_mode=label_mode, paged=n_pages > 1)
+    
+    jobs = jobs or os.cpu_count() or 1
+    files = None
+    if board is not None and output_format in RASTER_FORMATS:
+        render_layout_raster(layout, output_file, aruco_dict_name, marker_size_mm, 0, page_size, dpi,
+                             output_format, rects=squares)
+        travel = None
+    elif board is not None:
+        label = show_labels and _boards.format_board_label(board, aruco_dict_name, cols, rows,
+                                                           marker_size_mm, spacing_mm, square_mm,
+                                                           layout['id'])
+        with open_renderer(output_file, page_size, output_format, pdf_writer) as renderer:
+            travel = _boards.render_board(renderer, layout, squares, outline, aruco_dict_name,
+                                          marker_size_mm, engrave_mode, label, optimize_travel)
+    elif output_format in RASTER_FORMATS:
+        render_layout_raster(layout, output_file, aruco_dict_name, marker_size_mm, border_mm,
+                             page_size, dpi, output_format, paged=n_pages > 1)
+        travel = None
+    elif cache is not None and output_format == 'pdf' and pdf_writer == 'native':
+        files, travel = _render_layout_cached(layout, output_file, render_options, jobs, cache,
+                                              max_pages, max_bytes)
+        if not rollover:
+            files = None
+    elif rollover:
+        with RolloverPDFRenderer(output_file, page_size, max_pages, max_bytes) as writer:
+            if jobs > 1 and n_pages > 1:
+                with _phase('parallel render'):
+                    travel = _render_layout_parallel(layout, writer, render_options, jobs)
+            else:
+                travel = render_layout(writer, layout, aruco_dict_name, marker_size_mm, border_mm,
+                                       show_labels, engrave_mode, cut_mode, optimize_travel, label_mode)
+        files = writer.files
+    elif jobs > 1 and n_pages > 1:
+        with _phase('parallel render'):
+            travel = _render_layout_parallel(layout, output_file, render_options, jobs)
+    else:
+        travel = render_layout_file(layout, output_file, **render_options)
+    
+    if cache is not None:
+        if files:
+            outputs = files
+        elif output_format != 'pdf' and n_pages > 1:
+            outputs = [paged_output_path(output_file, page) for page in range(n_pages)]
+        else:
+            outputs = [output_file]
+        with _phase('cache'):
+            cache.store(job_key, output_file, outputs, travel)
+            cache.evict()
+    
+    if not verbose:
+        return travel
+    if board is not None:
+        print(f"✓ Generated {cols}x{rows} {'ChArUco board' if board == 'charuco' else 'GridBoard'} "
+              f"({len(layout)} markers) in {output_file}")
+    elif files:
+        print(f"✓ Generated {len(marker_ids)} markers in {len(files)} files: {files[0]} ... {files[-1]}")
+    elif output_format != 'pdf' and n_pages > 1:
+        print(f"✓ Generated {len(marker_ids)} markers in {n_pages} files: "
+              f"{paged_output_path(output_file, 0)} ... {paged_output_path(output_file, n_pages - 1)}")
+    else:
+        print(f"✓ Generated {len(marker_ids)} markers in {output_file}")
+    if pack:
+        print(format_packing_report(layout, page_size))
+    if cache is not None and cache.pages_reused:
+        print(f"  Cache: re-rendered {cache.pages_rendered} of "
+              f"{cache.pages_rendered + cache.pages_reused} pages")
+    if travel is not None:
+        print(format_travel_report(travel))
+    return travel
+
+
+def generate_aruco_laser_stream(marker_ids, aruco_dict_name='4X4_50', output_file="aruco_markers.pdf",
+                                marker_size_mm=3, border_mm=0.5, spacing_mm=20, page_size=A4,
+                                markers_per_page=20, nrows=None, ncols=None, show_labels=True,
+                                engrave_mode='cells', output_format='pdf', cut_mode='outlines',
+                                optimize_travel=False, max_pages=None, max_bytes=None, dpi=600,
+                                label_mode='text', verbose=True):
+    """
+    Generate markers from any iterable of IDs, writing pages as they are laid out.
+    
+    Only one page of IDs and geometry is held at a time, so memory stays flat
+    for any number of markers. PDF output uses the native writer and, with
+    max_pages or max_bytes, rolls over into out_001.pdf, out_002.pdf, ...;
+    the other formats always write one numbered file per page (out_p001.svg, ...).
+    
+    Args:
+        marker_ids (iterable): Marker IDs, e.g. a generator
+        max_pages (int, optional): PDF only - most pages per output file
+        max_bytes (int, optional): PDF only - largest output file in bytes
+        dpi (float): PNG/TIFF only - resolution in dots per inch
+        (remaining arguments as for generate_aruco_laser_pdf())
+    
+    Returns:
+        list: Output files written
+    
+    Raises:
+        ValueError: If a marker ID is outside the dictionary
+    """
+    _validate_options(dict(aruco_dict_name=aruco_dict_name, marker_size_mm=marker_size_mm,
+                           border_mm=border_mm, engrave_mode=engrave_mode, cut_mode=cut_mode,
+                           output_format=output_format, label_mode=label_mode, dpi=dpi))
+    
+    if output_format == 'pdf':
+        renderer = RolloverPDFRenderer(output_file, page_size, max_pages, max_bytes)
+    elif output_format in RASTER_FORMATS:
+        renderer = contextlib.nullcontext()
+    else:
+        renderer = open_renderer(output_file, page_size, output_format, paged=True)
+    
+    count, n_pages, travel = 0, 0, None
+    with renderer:
+        for page_layout in iter_layout_pages(marker_ids, page_size, marker_size_mm, border_mm,
+                                             spacing_mm, markers_per_page, nrows, ncols):
+            check_marker_ids(page_layout['id'], aruco_dict_name)
+            if output_format in RASTER_FORMATS:
+                render_layout_raster(page_layout, output_file, aruco_dict_name, marker_size_mm,
+                                     border_mm, page_size, dpi, output_format, paged=True)
+            else:
+                travel = _add_travel_stats(travel, render_layout(
+                    renderer, page_layout, aruco_dict_name, marker_size_mm, border_mm,
+                    show_labels, engrave_mode, cut_mode, optimize_travel, label_mode))
+            count += len(page_layout)
+            n_pages += 1
+        if not n_pages:
+            if output_format in RASTER_FORMATS:
+                render_layout_raster(compute_layout([]), output_file, aruco_dict_name,
+                                     page_size=page_size, dpi=dpi, output_format=output_format,
+                                     paged=True)
+            else:
+                render_layout(renderer, compute_layout([]), aruco_dict_name)
+            n_pages = 1
+    
+    if output_format == 'pdf':
+        files = renderer.files
+    else:
+        files = [paged_output_path(output_file, page) for page in range(n_pages)]
+    if not verbose:
+        return files
+    if len(files) > 1:
+        print(f"✓ Generated {count} markers on {n_pages} pages in {len(files)} files: "
+              f"{files[0]} ... {files[-1]}")
+    else:
+        print(f"✓ Generated {count} markers in {files[0]}")
+    if travel is not None:
+        print(format_travel_report(travel))
+    return files
+
+
+def generate_aruco_laser_bed(marker_ids, aruco_dict_name='4X4_50', output_file="aruco_markers.pdf",
+                             marker_size_mm=3, border_mm=0.5, spacing_mm=2, page_size=A4, margin_mm=5,
+                             show_labels=True, engrave_mode='cells', output_format='pdf',
+                             cut_mode='outlines', dpi=600, tile_markers=None, label_mode='text',
+                             verbose=True):
+    """
+    Put every marker on a single bed-sized page, placed and drawn tile by tile.
+    
+    For one large sheet holding tens of thousands of markers: placement is
+    computed per band of rows (iter_bed_tiles()) and each band's geometry is
+    drawn in bulk (render_bed()) straight into the output. PDF pages are
+    compressed into the file as they grow (NativePDFRenderer with
+    stream_threshold), SVG and DXF are written as drawn, so memory stays
+    flat and time grows linearly with the number of markers. PNG/TIFF are
+    rasterized strip by strip from the tiles crossing each strip
+    (iter_bed_raster_strips()).
+    
+    Args:
+        marker_ids (iterable): Marker IDs, e.g. a generator
+        page_size (tuple): Sheet size in PDF points
+        margin_mm (float): Unused margin along the sheet edges in millimeters
+        tile_markers (int, optional): Markers per tile (default: BED_TILE_MARKERS)
+        (remaining arguments as for generate_aruco_laser_pdf())
+    
+    Returns:
+        int: Markers placed
+    
+    Raises:
+        ValueError: If the markers do not fit on the sheet or an ID is
+            outside the dictionary
+    """
+    _validate_options(dict(aruco_dict_name=aruco_dict_name, marker_size_mm=marker_size_mm,
+                           border_mm=border_mm, engrave_mode=engrave_mode, cut_mode=cut_mode,
+                           output_format=output_format, label_mode=label_mode, dpi=dpi, bed=True))
+    tiles = iter_bed_tiles(marker_ids, page_size, marker_size_mm, border_mm, spacing_mm, margin_mm,
+                           show_labels, tile_markers)
+    
+    if output_format in RASTER_FORMATS:
+        placed = [0]
+        
+        def checked(tiles):
+            for tile in tiles:
+                check_marker_ids(tile['id'], aruco_dict_name)
+                placed[0] += len(tile)
+                yield tile
+        
+        width, height = raster_page_size(page_size, dpi)
+        strip_rows = max(1, RASTER_STRIP_BYTES // max(width, 1))
+        strips = iter_bed_raster_strips(checked(tiles), aruco_dict_name, marker_size_mm, border_mm,
+                                        page_size, dpi, strip_rows)
+        with _phase('rasterize'):
+            if output_format == 'tiff':
+                write_tiff(output_file, width, height, strips, dpi, strip_rows)
+            else:
+                write_png(output_file, width, height, strips, dpi)
+        count = placed[0]
+    else:
+        if output_format == 'pdf':
+            renderer = NativePDFRenderer(output_file, page_size, stream_threshold=BED_STREAM_BYTES)
+        else:
+            renderer = open_renderer(output_file, page_size, output_format)
+        with renderer:
+            count = render_bed(renderer, tiles, aruco_dict_name, marker_size_mm, border_mm,
+                               show_labels, engrave_mode, cut_mode, label_mode)
+    
+    if verbose:
+        print(f"✓ Generated {count} markers on one {page_size[0] / mm:g} x {page_size[1] / mm:g} mm "
+              f"sheet in {output_file}")
+    return count
+
+
+class MarkerSheetGenerator:
+    """
+    Reusable in-process generator for embedding the tool as a library.
+    
+    Settings are given once and kept, together with warm state: the
+    dictionary's bit grids (decoded once), the label widths of its IDs and
+    the page templates (slot positions) of every grid used so far. Each
+    render() call then only places the IDs into a template and draws them.
+    Output is returned as bytes or written to a file object; nothing is
+    printed. The output is the same as generate_aruco_laser_pdf() writes for
+    the same settings.
+    
+    One generator can be shared by threads: its caches are filled under a
+    lock and every call draws into its own renderer. It pickles as its
+    settings only, so it can be sent to worker processes, where it warms up
+    again on arrival.
+    
+    Args:
+        aruco_dict_name (str): ArUco dictionary name (e.g., '4X4_50', '5X5_100')
+        **options: Defaults for render(), named as in generate_aruco_laser_pdf():
+            marker_size_mm, border_mm, spacing_mm, page_size,
+            markers_per_page, nrows, ncols, show_labels, label_mode, engrave_mode,
+            cut_mode, output_format, pdf_writer, optimize_travel, dpi
+    
+    Raises:
+        ValueError: If the dictionary or an option is unknown
+    
+    Example:
+        generator = MarkerSheetGenerator('4X4_1000', marker_size_mm=10, spacing_mm=5)
+        pdf = generator.render(range(20))
+        svg = generator.render([7], output_format='svg')
+    """
+    
+    DEFAULTS = dict(marker_size_mm=3, border_mm=0.5, spacing_mm=20, page_size=A4, markers_per_page=20,
+                    nrows=None, ncols=None, show_labels=True, label_mode='text', engrave_mode='cells',
+                    cut_mode='outlines', output_format='pdf', pdf_writer='native', optimize_travel=False,
+                    dpi=600)
+    
+    def __init__(self, aruco_dict_name='4X4_50', **options):
+        import threading
+        
+        _validate_options(dict(aruco_dict_name=aruco_dict_name))
+        self.aruco_dict_name = aruco_dict_name
+        self.max_markers = ARUCO_DICTS[aruco_dict_name][1]
+        self.options = self._resolve(dict(self.DEFAULTS), options)
+        self._lock = threading.Lock()
+        self._templates = {}
+        
+        # Warm state: bit grids and label widths of the whole dictionary
+        load_marker_images(aruco_dict_name)
+        for marker_id in range(self.max_markers):
+            helvetica_width(str(marker_id), 6)
+    
+    def __getstate__(self):
+        return {'aruco_dict_name': self.aruco_dict_name, 'options': self.options}
+    
+    def __setstate__(self, state):
+        self.__init__(state['aruco_dict_name'], **state['options'])
+    
+    def __repr__(self):
+        return f"MarkerSheetGenerator({self.aruco_dict_name!r}, {self.options!r})"
+    
+    @staticmethod
+    def _resolve(options, overrides):
+        """Settings with overrides applied, validated."""
+        unknown = set(overrides) - set(MarkerSheetGenerator.DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown options: {', '.join(sorted(unknown))}")
+        options = dict(options, **overrides)
+        _validate_options(options)
+        return options
+    
+    def _template(self, options):
+        """Slot positions of one page for these settings (computed once per grid)."""
+        rows, cols = resolve_grid(options['markers_per_page'], options['nrows'], options['ncols'])
+        key = (tuple(options['page_size']), options['marker_size_mm'], options['border_mm'],
+               options['spacing_mm'], rows, cols)
+        template = self._templates.get(key)
+        if template is None:
+            with self._lock:
+                template = self._templates.get(key)
+                if template is None:
+                    template = compute_layout(np.zeros(rows * cols, dtype=np.int32), options['page_size'],
+                                              options['marker_size_mm'], options['border_mm'],
+                                              options['spacing_mm'], nrows=rows, ncols=cols)
+                    template.flags.writeable = False
+                    self._templates[key] = template
+        return template
+    
+    def layout(self, marker_ids, **overrides):
+        """
+        Layout table for marker_ids, as compute_layout() returns it.
+        
+        Raises:
+            ValueError: If a marker ID is outside the dictionary
+        """
+        options = self._resolve(self.options, overrides) if overrides else self.options
+        ids = np.asarray(marker_ids, dtype=np.int64).ravel()
+        check_marker_ids(ids, self.aruco_dict_name)
+        template = self._template(options)
+        page, slot = np.divmod(np.arange(len(ids)), len(template))
+        layout = np.empty(len(ids), dtype=LAYOUT_DTYPE)
+        layout['page'] = page
+        layout['x'] = template['x'][slot]
+        layout['y'] = template['y'][slot]
+        layout['id'] = ids
+        return layout
+    
+    def render(self, marker_ids, output=None, **overrides):
+        """
+        Render one sheet document.
+        
+        PDF output holds every page; SVG, DXF, PNG and TIFF hold one page, so
+        IDs that need more than one page raise ValueError (use render_pages()).
+        
+        Args:
+            marker_ids (list): Marker IDs to place
+            output: Binary file object to write to; None returns the bytes
+            **overrides: Settings for this call only (see the class arguments)
+        
+        Returns:
+            bytes or None: The output when output is None
+        
+        Raises:
+            ValueError: If an option or marker ID is invalid, or a page-less
+                format would need several pages
+        """
+        options = self._resolve(self.options, overrides) if overrides else self.options
+        layout = self.layout(marker_ids, **overrides)
+        n_pages = int(layout['page'][-1]) + 1 if len(layout) else 1
+        if options['output_format'] != 'pdf' and n_pages > 1:
+            raise ValueError(f"{options['output_format'].upper()} output holds one page, these markers "
+                             f"need {n_pages}; use render_pages()")
+        import io
+        
+        target = io.BytesIO() if output is None else output
+        self._draw(layout, target, options)
+        return target.getvalue() if output is None else None
+    
+    def render_pages(self, marker_ids, **overrides):
+        """
+        Render every page as its own document (one SVG, PNG, ... per page).
+        
+        Returns:
+            list: Bytes of each page, in order
+        """
+        import io
+        
+        options = self._resolve(self.options, overrides) if overrides else self.options
+        layout = self.layout(marker_ids, **overrides)
+        page_starts = np.flatnonzero(np.diff(layout['page'], prepend=-1)).tolist() + [len(layout)]
+        pages = []
+        for start, stop in zip(page_starts[:-1], page_starts[1:]) if len(layout) else [(0, 0)]:
+            target = io.BytesIO()
+            page_layout = layout[start:stop].copy()
+            page_layout['page'] = 0
+            self._draw(page_layout, target, options)
+            pages.append(target.getvalue())
+        return pages
+    
+    def _draw(self, layout, target, options):
+        if options['output_format'] in RASTER_FORMATS:
+            render_layout_raster(layout, target, self.aruco_dict_name, options['marker_size_mm'],
+                                 options['border_mm'], options['page_size'], options['dpi'],
+                                 options['output_format'])
+            return
+        import io
+        
+        text = None
+        if options['output_format'] == 'pdf':
+            renderer = open_renderer(target, options['page_size'], 'pdf', options['pdf_writer'])
+        else:
+            # SVG and DXF renderers write text; encode it as their files would be
+            text = io.TextIOWrapper(target, encoding='utf-8', newline='\n')
+            renderer = open_renderer(text, options['page_size'], options['output_format'])
+        try:
+            with renderer:
+                render_layout(renderer, layout, self.aruco_dict_name, options['marker_size_mm'],
+                              options['border_mm'], options['show_labels'], options['engrave_mode'],
+                              options['cut_mode'], options['optimize_travel'], options['label_mode'])
+        finally:
+            if text is not None:
+                text.flush()
+                text.detach()
+
+
+def render_layout(renderer, layout, aruco_dict_name='4X4_50', marker_size_mm=3, border_mm=0.5,
+                  show_labels=True, engrave_mode='cells', cut_mode='outlines', optimize_travel=False,
+                  label_mode='text'):
+    """
+    Draw every marker of a layout table through a renderer.
+    
+    Pages are numbered relative to the first row of the layout, so any
+    contiguous slice of a layout can be rendered on its own.
+    
+    Args:
+        renderer (MarkerRenderer): Renderer receiving the pages
+        layout (np.ndarray): Structured array of LAYOUT_DTYPE from compute_layout(),
+            or PACKED_LAYOUT_DTYPE from pack_layout() (sizes taken from the rows)
+        aruco_dict_name (str): ArUco dictionary name (e.g., '4X4_50', '5X5_100')
+        marker_size_mm (float): Size of the marker in millimeters
+        border_mm (float): White border around marker in millimeters
+        show_labels (bool): Whether to show marker ID labels below each marker
+        engrave_mode (str): Engrave geometry, one of ENGRAVE_MODES
+        cut_mode (str): Cut geometry, one of CUT_MODES
+        optimize_travel (bool): Reorder each page for short head travel
+        label_mode (str): 'text' labels, or 'paths' - each page's labels as one
+            engrave shape assembled from cached digit outlines
+    
+    Returns:
+        dict or None: Travel statistics when optimize_travel is set
+    """
+    profiler = _PROFILER.get()
+    if profiler is not None and not isinstance(renderer, ProfilingRenderer):
+        renderer = ProfilingRenderer(renderer, profiler)
+    if optimize_travel:
+        renderer = TravelOrderingRenderer(renderer)
+    
+    # All markers of the dictionary at grid resolution (4x4 -> 6x6 with border, etc.)
+    with _phase('dictionary'):
+        marker_images = load_marker_images(aruco_dict_name)
+    
+    sized = 'size' in layout.dtype.names
+    merged_cuts = cut_mode == 'merged'
+    path_labels = show_labels and label_mode == 'paths'
+    
+    page_starts = np.flatnonzero(np.diff(layout['page'], prepend=-1)).tolist() + [len(layout)]
+    for start, stop in zip(page_starts[:-1], page_starts[1:]):
+        page_layout = layout[start:stop]
+        renderer.begin_page()
+        with _phase('draw'):
+            for row in page_layout.tolist():
+                page, x, y, marker_id = row[:4]
+                size, border = row[4:] if sized else (marker_size_mm * mm, border_mm * mm)
+                
+                # ArUco marker at grid resolution (clean, simple output)
+                marker_img = marker_images[marker_id]
+                
+                # Draw the marker
+                draw_marker_for_laser(renderer, marker_img, x, y, size, border, 
+                                    marker_id, show_labels and not path_labels, engrave_mode,
+                                    cut=not merged_cuts)
+        if profiler is not None:
+            profiler.count('markers', len(page_layout))
+        
+        if path_labels:
+            with _phase('labels'):
+                loops = layout_label_loops(page_layout, marker_size_mm, border_mm)
+            renderer.set_layer('engrave')
+            renderer.polygon(loops)
+        
+        if merged_cuts:
+            # One cut line per grid line instead of one square per marker
+            if sized:
+                total_size = page_layout['size'] + 2 * page_layout['border']
+            else:
+                total_size = np.full(len(page_layout), (marker_size_mm + 2 * border_mm) * mm)
+            outlines = np.column_stack([page_layout['x'], page_layout['y'] - total_size,
+                                        total_size, total_size])
+            with _phase('merge cuts'):
+                lines = merge_cut_outlines(outlines)
+            renderer.set_layer('cut')
+            renderer.polylines(lines)
+        renderer.end_page()
+    
+    if len(page_starts) == 1:
+        renderer.begin_page()
+        renderer.end_page()
+    
+    return renderer.stats if optimize_travel else None
+
+
+def layout_engrave_geometry(layout, aruco_dict_name='4X4_50', marker_size_mm=10, border_mm=0,
+                            engrave_mode='cells', squares=None):
+    """
+    Engrave geometry of many markers at once, built in bulk from their bit grids.
+    
+    The bit grids of all markers are gathered into one (n x grid x grid)
+    array and turned into geometry with array operations, never one marker
+    at a time through draw_marker_for_laser().
+    
+    Args:
+        layout (np.ndarray): Layout rows of one page (LAYOUT_DTYPE)
+        aruco_dict_name (str): ArUco dictionary name
+        marker_size_mm (float): Marker size in millimeters
+        border_mm (float): White border around each marker in millimeters
+        engrave_mode (str): One of ENGRAVE_MODES
+        squares (np.ndarray, optional): Extra black squares, (n x 4) in
+            points, e.g. the chessboard of a ChArUco board
+    
+    Returns:
+        np.ndarray or list: (n x 4) rectangles for 'cells' and 'rects', else
+            the closed loops of one even-odd shape covering everything
+    """
+    black = load_marker_images(aruco_dict_name)[layout['id']] == 0
+    cell_size = marker_size_mm * mm / black.shape[1]
+    x, y = layout['x'] + border_mm * mm, layout['y'] - border_mm * mm
+    squares = np.empty((0, 4)) if squares is None else np.asarray(squares, dtype=np.float64).reshape(-1, 4)
+    
+    if engrave_mode != 'polygons':
+        if engrave_mode == 'cells':
+            k, i, j = np.nonzero(black)
+            w = h = np.ones(len(k))
+        else:
+            k, j, i, w, h = merge_cells_to_rects_bulk(black).T
+        cells = np.column_stack([x[k] + j * cell_size, y[k] - (i + h) * cell_size,
+                                 w * cell_size, h * cell_size])
+        return np.concatenate([squares, cells])
+    
+    # Every square is a loop; every marker is its traced outline moved into place
+    sx, sy, sw, sh = squares.T
+    square_loops = np.stack([np.column_stack([sx, sy]), np.column_stack([sx + sw, sy]),
+                             np.column_stack([sx + sw, sy + sh]), np.column_stack([sx, sy + sh])], axis=1)
+    outlines = [_marker_outline(aruco_dict_name, marker_id) for marker_id in layout['id'].tolist()]
+    return list(square_loops) + _place_outlines(outlines, x, y, cell_size)
+
+
+def _place_outlines(outlines, x, y, cell_size):
+    """
+    Move cached outlines into place in one step.
+    
+    Args:
+        outlines (list): (vertices, loop lengths) per item, vertices in cells
+            from the item's top-left with rows growing downwards
+        x, y (np.ndarray): Top-left corner of every item in points
+        cell_size (float): Cell size in points
+    
+    Returns:
+        list: Closed loops, (n x 2) arrays in points
+    """
+    if not outlines:
+        return []
+    vertices = np.concatenate([vertices for vertices, _ in outlines])
+    owner = np.repeat(np.arange(len(outlines)), [len(vertices) for vertices, _ in outlines])
+    points = np.column_stack([x[owner] + vertices[:, 0] * cell_size, y[owner] - vertices[:, 1] * cell_size])
+    loop_ends = np.cumsum(np.concatenate([lengths for _, lengths in outlines])).tolist()
+    return [points[start:end] for start, end in zip([0] + loop_ends[:-1], loop_ends)]
+
+
+def render_bed(renderer, tiles, aruco_dict_name='4X4_50', marker_size_mm=3, border_mm=0.5,
+               show_labels=True, engrave_mode='cells', cut_mode='outlines', label_mode='text'):
+    """
+    Draw layout tiles onto one page, emitting each tile's geometry in bulk.
+    
+    Every tile becomes a few drawing calls - engrave geometry from
+    layout_engrave_geometry(), its cut outlines as one array and its labels -
+    so the work per marker is array arithmetic only. With cut_mode 'merged',
+    row edges shared with the previous tile are not cut twice.
+    
+    Args:
+        renderer (MarkerRenderer): Renderer receiving the page
+        tiles (iterable): Layout tables of one page, e.g. from iter_bed_tiles()
+        (remaining arguments as for render_layout())
+    
+    Returns:
+        int: Markers drawn
+    
+    Raises:
+        ValueError: If a marker ID is outside the dictionary
+    """
+    profiler = _PROFILER.get()
+    if profiler is not None and not isinstance(renderer, ProfilingRenderer):
+        renderer = ProfilingRenderer(renderer, profiler)
+    total = (marker_size_mm + 2 * border_mm) * mm
+    digit_width = _HELVETICA_WIDTHS['0'] * 6 / 1000.0
+    
+    renderer.begin_page()
+    count, shared_edge = 0, None
+    for layout in tiles:
+        ids = layout['id']
+        check_marker_ids(ids, aruco_dict_name)
+        with _phase('draw'):
+            geometry = layout_engrave_geometry(layout, aruco_dict_name, marker_size_mm, border_mm,
+                                               engrave_mode)
+            renderer.set_layer('engrave')
+            if engrave_mode == 'polygons':
+                renderer.polygon(geometry)
+            else:
+                renderer.rects(geometry)
+            
+            outlines = np.column_stack([layout['x'], layout['y'] - total,
+                                        np.full(len(layout), total), np.full(len(layout), total)])
+            renderer.set_layer('cut')
+            if cut_mode == 'merged':
+                with _phase('merge cuts'):
+                    lines = merge_cut_outlines(outlines)
+                if shared_edge is not None:
+                    horizontal = lines[:, 0, 1] == lines[:, 1, 1]
+                    lines = lines[~(horizontal & (np.abs(lines[:, 0, 1] - shared_edge) < 1e-3))]
+                shared_edge = outlines[:, 1].min()
+                renderer.polylines(lines)
+            else:
+                renderer.rects(outlines, fill=False)
+            
+            if show_labels and label_mode == 'paths':
+                renderer.set_layer('engrave')
+                renderer.polygon(layout_label_loops(layout, marker_size_mm, border_mm))
+            elif show_labels:
+                # Labels are digits only, so their widths follow from the digit count
+                labels = ids.astype(str)
+                label_x = layout['x'] + (total - np.char.str_len(labels) * digit_width) / 2
+                renderer.set_layer('label')
+                for x, y, text in zip(label_x.tolist(), (layout['y'] - total - 8).tolist(), labels.tolist()):
+                    renderer.text(x, y, text, 6)
+        if profiler is not None:
+            profiler.count('markers', len(layout))
+        count += len(layout)
+    renderer.end_page()
+    return count
+
+
+def open_renderer(output, page_size=A4, output_format='pdf', pdf_writer='native',
+                  paged=False, first_page=0):
+    """
+    Create the renderer for an output format.
+    
+    Args:
+        output: Output filename or binary file object
+        page_size (tuple): Page size in PDF points
+        output_format (str): 'pdf', 'svg' or 'dxf'
+        pdf_writer (str): 'native' or 'reportlab' (PDF output only)
+        paged (bool): SVG/DXF only - write each page to its own numbered file
+        first_page (int): SVG/DXF only - number of the first page written
+    
+    Returns:
+        MarkerRenderer: Renderer writing to output
+    """
+    if output_format == 'svg':
+        renderer = SVGRenderer(output, page_size, paged, first_page)
+    elif output_format == 'dxf':
+        renderer = DXFRenderer(output, page_size, paged, first_page)
+    elif pdf_writer == 'reportlab':
+        renderer = ReportLabRenderer(output, page_size)
+    else:
+        renderer = NativePDFRenderer(output, page_size)
+    profiler = _PROFILER.get()
+    return renderer if profiler is None else ProfilingRenderer(renderer, profiler)
+
+
+def render_layout_file(layout, output_file, aruco_dict_name='4X4_50', marker_size_mm=3,
+                       border_mm=0.5, page_size=A4, show_labels=True, engrave_mode='cells',
+                       pdf_writer='native', output_format='pdf', cut_mode='outlines',
+                       optimize_travel=False, label_mode='text', paged=False):
+    """
+    Draw every marker of a layout table into an output file.
+    
+    Args:
+        layout (np.ndarray): Structured array of LAYOUT_DTYPE from compute_layout()
+        output_file (str): Output filename
+        aruco_dict_name (str): ArUco dictionary name (e.g., '4X4_50', '5X5_100')
+        marker_size_mm (float): Size of the marker in millimeters
+        border_mm (float): White border around marker in millimeters
+        page_size (tuple): Page size (A4 or letter)
+        show_labels (bool): Whether to show marker ID labels below each marker
+        engrave_mode (str): Engrave geometry, one of ENGRAVE_MODES
+        pdf_writer (str): 'native' or 'reportlab'
+        output_format (str): 'pdf', 'svg' or 'dxf'
+        cut_mode (str): Cut geometry, one of CUT_MODES
+        optimize_travel (bool): Reorder each page for short head travel
+        label_mode (str): Label drawing, one of LABEL_MODES
+        paged (bool): SVG/DXF only - write each page to its own numbered file
+    
+    Returns:
+        dict or None: Travel statistics when optimize_travel is set
+    """
+    first_page = int(layout['page'][0]) if len(layout) else 0
+    with open_renderer(output_file, page_size, output_format, pdf_writer, paged, first_page) as renderer:
+        return render_layout(renderer, layout, aruco_dict_name, marker_size_mm, border_mm,
+                             show_labels, engrave_mode, cut_mode, optimize_travel, label_mode)
+
+
+def _render_chunk(task):
+    """Worker entry point: render one contiguous page range, returning (result, travel stats)."""
+    layout, chunk_file, render_options = task
+    if render_options['output_format'] != 'pdf':
+        # One file per page, so workers write their pages directly
+        return None, render_layout_file(layout, **render_options)
+    if render_options['pdf_writer'] == 'native':
+        # Hand back the finished page streams; the parent writes the document
+        renderer = NativePDFRenderer(None, render_options['page_size'])
+        travel = render_layout(renderer, layout, render_options['aruco_dict_name'],
+                               render_options['marker_size_mm'], render_options['border_mm'],
+                               render_options['show_labels'], render_options['engrave_mode'],
+                               render_options['cut_mode'], render_options['optimize_travel'],
+                               render_options['label_mode'])
+        return renderer.finished_pages, travel
+    return chunk_file, render_layout_file(layout, chunk_file, **render_options)
+
+
+def _render_layout_parallel(layout, output_file, render_options, jobs):
+    """
+    Render page chunks in a process pool and merge them in page order.
+    
+    output_file may also be an open NativePDFRenderer (e.g. a
+    RolloverPDFRenderer), which receives the native pages and is left open.
+    
+    Each worker renders a contiguous run of pages with the same drawing code
+    as a serial run. With the native writer the workers return compressed
+    page streams that are written straight into the output; with ReportLab
+    they write standalone chunk PDFs that are merged with pypdf. SVG and DXF
+    pages are separate files, which the workers write themselves.
+    
+    Returns:
+        dict or None: Travel statistics summed over all chunks, when enabled
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    
+    native = render_options['pdf_writer'] == 'native'
+    travel = None
+    if render_options['output_format'] != 'pdf':
+        tasks = [(layout[layout['page'] == page], None, dict(render_options, output_file=output_file))
+                 for page in np.unique(layout['page'])]
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            for _, chunk_travel in pool.map(_render_chunk, tasks):
+                travel = _add_travel_stats(travel, chunk_travel)
+        return travel
+    if not native:
+        try:
+            from pypdf import PdfReader, PdfWriter
+        except ImportError:
+            raise RuntimeError("Parallel rendering with the ReportLab writer requires pypdf: pip install pypdf")
+    
+    # Split on page boundaries into a few chunks per worker for load balancing
+    page_starts = np.flatnonzero(np.diff(layout['page'], prepend=-1))
+    n_chunks = min(len(page_starts), jobs * 4)
+    bounds = [page_starts[k * len(page_starts) // n_chunks] for k in range(n_chunks)] + [len(layout)]
+    
+    tmp_dir = tempfile.mkdtemp(prefix='aruco-laser-')
+    try:
+        tasks = [(layout[bounds[k]:bounds[k + 1]], os.path.join(tmp_dir, f"chunk_{k:05d}.pdf"), render_options)
+                 for k in range(n_chunks)]
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            if native:
+                if isinstance(output_file, NativePDFRenderer):
+                    writer = contextlib.nullcontext(output_file)
+                else:
+                    writer = NativePDFRenderer(output_file, render_options['page_size'])
+                with writer as writer:
+                    for pages, chunk_travel in pool.map(_render_chunk, tasks):
+                        travel = _add_travel_stats(travel, chunk_travel)
+                        for page_size, stream in pages:
+                            writer.write_page(page_size, stream)
+            else:
+                merged = PdfWriter()
+                for chunk_file, chunk_travel in pool.map(_render_chunk, tasks):
+                    travel = _add_travel_stats(travel, chunk_travel)
+                    for pdf_page in PdfReader(chunk_file).pages:
+                        merged.add_page(pdf_page)
+                with open(output_file, 'wb') as f:
+                    merged.write(f)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return travel
+
+
+def _render_layout_cached(layout, output_file, render_options, jobs, cache, max_pages=None, max_bytes=None):
+    """
+    Native PDF rendering that reuses cached pages and renders only the rest.
+    
+    Each page is keyed by its own content (marker positions, IDs and sizes)
+    and the drawing options, so changing a few IDs re-renders only the pages
+    that hold them. Missing pages are rendered in a process pool when jobs > 1.
+    
+    Returns:
+        tuple: (files written, travel statistics or None)
+    """
+    render_key = cache.render_key(render_options)
+    page_starts = np.flatnonzero(np.diff(layout['page'], prepend=-1)).tolist() + [len(layout)]
+    pages = [layout[a:b] for a, b in zip(page_starts[:-1], page_starts[1:])] or [layout]
+    keys = [cache.page_key(render_key, render_options['page_size'], page) for page in pages]
+    entries = [cache.load_page(key) for key in keys]
+    
+    missing = [k for k, entry in enumerate(entries) if entry is None]
+    tasks = [(pages[k], None, render_options) for k in missing]
+    if jobs > 1 and len(tasks) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(_render_chunk, tasks))
+    else:
+        results = [_render_chunk(task) for task in tasks]
+    for k, (finished, page_travel) in zip(missing, results):
+        page_size, stream = finished[0]
+        cache.store_page(keys[k], page_size, stream, page_travel)
+        entries[k] = (page_size, stream, page_travel)
+    cache.pages_rendered += len(missing)
+    cache.pages_reused += len(pages) - len(missing)
+    
+    travel = None
+    with RolloverPDFRenderer(output_file, render_options['page_size'], max_pages, max_bytes) as writer:
+        for page_size, stream, page_travel in entries:
+            writer.write_page(page_size, stream)
+            travel = _add_travel_stats(travel, page_travel)
+    return writer.files, travel
+
+
+@lru_cache(maxsize=None)
+def tool_fingerprint():
+    """Tool version plus a hash of the drawing code's source, part of every output cache key."""
+    import hashlib
+    digest = hashlib.sha256()
+    here = os.path.dirname(os.path.abspath(__file__))
+    # This module and the board module draw every output
+    for name in (os.path.basename(__file__), 'aruco_boards.py'):
+        with open(os.path.join(here, name), 'rb') as f:
+            digest.update(f.read())
+    return f"{__version__}+{digest.hexdigest()[:16]}"
+
+
+class OutputCache:
+    """
+    Content-addressed on-disk cache of generated outputs and PDF pages.
+    
+    Whole outputs are stored under a hash of the normalised job (IDs,
+    dictionary, sizes, page, grid, options and tool_fingerprint()), so a
+    repeated job is restored without rendering, and files that are already
+    up to date are not even rewritten. Native PDF pages are cached by their
+    own content for incremental re-rendering. Entries are evicted least
+    recently used first once the cache grows beyond max_bytes.
+    
+    Args:
+        directory (str, optional): Cache directory (default: 'outputs' in dictionary_cache_dir())
+        max_bytes (int): Size bound of the cache in bytes
+    """
+    
+    def __init__(self, directory=None, max_bytes=512 * 1_000_000):
+        self.directory = directory or os.path.join(dictionary_cache_dir(), 'outputs')
+        self.max_bytes = max_bytes
+        self.pages_rendered = 0
+        self.pages_reused = 0
+    
+    @staticmethod
+    def _digest(value):
+        """SHA-256 of a JSON-normalised value; arrays are hashed by their bytes."""
+        import hashlib
+        import json
+        
+        def normalise(v):
+            if isinstance(v, dict):
+                return {k: normalise(v[k]) for k in sorted(v)}
+            if isinstance(v, (list, tuple)):
+                return [normalise(x) for x in v]
+            if isinstance(v, np.ndarray):
+                return hashlib.sha256(np.ascontiguousarray(v).tobytes() + str(v.dtype).encode()).hexdigest()
+            if isinstance(v, (float, np.floating)):
+                return round(float(v), 6)
+            if isinstance(v, np.integer):
+                return int(v)
+            return v
+        
+        text = json.dumps([tool_fingerprint(), normalise(value)], sort_keys=True)
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+    
+    def job_key(self, job):
+        """Key of a whole job given as a dict of its output-affecting settings."""
+        return self._digest(job)
+    
+    def render_key(self, render_options):
+        """Key of the drawing options shared by all pages of a job."""
+        return self._digest({k: v for k, v in render_options.items()
+                             if k in ('aruco_dict_name', 'marker_size_mm', 'border_mm', 'show_labels',
+                                      'engrave_mode', 'cut_mode', 'optimize_travel', 'label_mode')})
+    
+    def page_key(self, render_key, page_size, page_layout):
+        """Key of one page: drawing options plus the markers on it (not its page number)."""
+        # Column by column: a multi-field view would still carry the page bytes
+        columns = {name: page_layout[name] for name in page_layout.dtype.names if name != 'page'}
+        return self._digest([render_key, page_size, columns])
+    
+    def _job_dir(self, key):
+        return os.path.join(self.directory, 'jobs', key)
+    
+    def _page_path(self, key):
+        return os.path.join(self.directory, 'pages', key[:2], key + '.page')
+    
+    def restore(self, key, output_file):
+        """
+        Restore the outputs of a cached job next to output_file.
+        
+        Returns:
+            tuple or None: (files, travel statistics), or None on a cache miss
+        """
+        import json
+        entry = self._job_dir(key)
+        try:
+            with open(os.path.join(entry, 'manifest.json'), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            stem = os.path.splitext(output_file)[0]
+            files = []
+            for k, (suffix, digest) in enumerate(manifest['files']):
+                path = stem + suffix
+                if not (os.path.exists(path) and _file_digest(path) == digest):
+                    shutil.copyfile(os.path.join(entry, str(k)), path)
+                files.append(path)
+            os.utime(entry)
+        except (OSError, ValueError, KeyError):
+            return None
+        return files, manifest.get('travel')
+    
+    def store(self, key, output_file, files, travel=None):
+        """Copy the finished outputs of a job into the cache."""
+        import json
+        stem = os.path.splitext(output_file)[0]
+        if not all(path.startswith(stem) for path in files):
+            return
+        try:
+            os.makedirs(os.path.join(self.directory, 'jobs'), exist_ok=True)
+            tmp_dir = tempfile.mkdtemp(dir=os.path.join(self.directory, 'jobs'), suffix='.tmp')
+            for k, path in enumerate(files):
+                shutil.copyfile(path, os.path.join(tmp_dir, str(k)))
+            with open(os.path.join(tmp_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+                json.dump({'files': [(path[len(stem):], _file_digest(path)) for path in files],
+                           'travel': travel}, f)
+            try:
+                os.replace(tmp_dir, self._job_dir(key))
+            except OSError:
+                # Stored concurrently by another process
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        except OSError:
+            # The cache is only an optimisation; read-only locations just skip it
+            pass
+    
+    def load_page(self, key):
+        """Cached (page_size, compressed stream, travel statistics) of a page, or None."""
+        import json
+        path = self._page_path(key)
+        try:
+            with open(path, 'rb') as f:
+                header, stream = f.read().split(b'\n', 1)
+            os.utime(path)
+            meta = json.loads(header)
+        except (OSError, ValueError):
+            return None
+        return tuple(meta['page_size']), stream, meta['travel']
+    
+    def store_page(self, key, page_size, stream, travel=None):
+        """Cache the compressed content stream of a rendered page."""
+        import json
+        path = self._page_path(key)
+        header = json.dumps({'page_size': list(page_size), 'travel': travel}).encode('utf-8')
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(header + b'\n' + stream)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+    
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        jobs_dir = os.path.join(self.directory, 'jobs')
+        pages_dir = os.path.join(self.directory, 'pages')
+        try:
+            for name in os.listdir(jobs_dir) if os.path.isdir(jobs_dir) else []:
+                entry = os.path.join(jobs_dir, name)
+                size = sum(e.stat().st_size for e in os.scandir(entry))
+                entries.append((os.stat(entry).st_mtime, size, entry))
+            for root, _, names in os.walk(pages_dir):
+                for name in names:
+                    stat = os.stat(os.path.join(root, name))
+                    entries.append((stat.st_mtime, stat.st_size, os.path.join(root, name)))
+        except OSError:
+            return
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                try:
+                    os.remove(path)
+                    os.rmdir(os.path.dirname(path))  # only succeeds once the shard is empty
+                except OSError:
+                    pass
+            total -= size
+
+
+def _file_digest(path):
+    """SHA-256 of a file's contents."""
+    import hashlib
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def merge_cells_to_rects(black):
+    """
+    Merge the black cells of a marker grid into maximal rectangles.
+    
+    Cells are scanned row by row; each unclaimed run of black cells is grown
+    downwards for as long as the whole run stays black.
+    
+    Args:
+        black: Boolean array (rows x cols), True where the cell is engraved
+    
+    Returns:
+        np.ndarray: Integer array (n x 4) of (col, row, width, height) in cell units
+    """
+    black = np.asarray(black, dtype=bool)
+    rows, cols = black.shape
+    free = black.copy()
+    rects = []
+    
+    for i in range(rows):
+        j = 0
+        while j < cols:
+            if not free[i, j]:
+                j += 1
+                continue
+            # Extend the run to the right, then grow it downwards
+            j_end = j + 1
+            while j_end < cols and free[i, j_end]:
+                j_end += 1
+            i_end = i + 1
+            while i_end < rows and free[i_end, j:j_end].all():
+                i_end += 1
+            free[i:i_end, j:j_end] = False
+            rects.append((j, i, j_end - j, i_end - i))
+            j = j_end
+    
+    return np.array(rects, dtype=np.int32).reshape(-1, 4)
+
+
+def trace_cell_polygons(black):
+    """
+    Trace the outlines of the black regions of a marker grid.
+    
+    Every boundary edge between a black and a white cell is collected once
+    (shared inner edges cancel out) and the edges are chained into closed loops.
+    Loops around white holes are returned alongside the outer outlines, so the
+    result has to be filled with the even-odd rule.
+    
+    Args:
+        black: Boolean array (rows x cols), True where the cell is engraved
+    
+    Returns:
+        list: Closed loops, each an integer array (n x 2) of (col, row) grid
+            vertices with collinear points removed
+    """
+    padded = np.pad(np.asarray(black, dtype=bool), 1)
+    
+    # Edges are oriented with the black cell on the right (rows grow downwards)
+    above, below = padded[:-1, 1:-1], padded[1:, 1:-1]
+    left, right = padded[1:-1, :-1], padded[1:-1, 1:]
+    
+    edges = {}
+    for r, c in zip(*np.nonzero(below & ~above)):
+        edges.setdefault((c, r), []).append((c + 1, r))
+    for r, c in zip(*np.nonzero(above & ~below)):
+        edges.setdefault((c + 1, r), []).append((c, r))
+    for r, c in zip(*np.nonzero(right & ~left)):
+        edges.setdefault((c, r + 1), []).append((c, r))
+    for r, c in zip(*np.nonzero(left & ~right)):
+        edges.setdefault((c, r), []).append((c, r + 1))
+    
+    loops = []
+    while edges:
+        start = next(iter(edges))
+        loop = [start]
+        prev, current = None, start
+        while True:
+            targets = edges[current]
+            if len(targets) == 1 or prev is None:
+                nxt = targets.pop()
+            else:
+                # Two regions touch diagonally at this vertex: turn right so
+                # each region keeps its own loop
+                dx, dy = current[0] - prev[0], current[1] - prev[1]
+                right_turn = (current[0] - dy, current[1] + dx)
+                nxt = right_turn if right_turn in targets else targets[0]
+                targets.remove(nxt)
+            if not targets:
+                del edges[current]
+            if nxt == start:
+                break
+            loop.append(nxt)
+            prev, current = current, nxt
+        
+        # Drop vertices that sit in the middle of a straight run
+        pts = np.array(loop, dtype=np.int32)
+        before = np.roll(pts, 1, axis=0)
+        after = np.roll(pts, -1, axis=0)
+        cross = ((pts[:, 0] - before[:, 0]) * (after[:, 1] - pts[:, 1])
+                 - (pts[:, 1] - before[:, 1]) * (after[:, 0] - pts[:, 0]))
+        loops.append(pts[cross != 0])
+    
+    return loops
+
+
+def merge_cells_to_rects_bulk(black):
+    """
+    Merge the black cells of many marker grids into rectangles in one pass.
+    
+    Vectorized counterpart of merge_cells_to_rects() for a whole stack of
+    grids: horizontal runs of black cells are found in every row of every
+    grid with a single diff, then runs with the same extent in consecutive
+    rows are stacked into one rectangle. The cover can differ from
+    merge_cells_to_rects(), but is exact and free of overlaps.
+    
+    Args:
+        black: Boolean array (n x rows x cols), True where the cell is engraved
+    
+    Returns:
+        np.ndarray: Integer array (m x 5) of (grid, col, row, width, height)
+            in cell units, ordered by grid, row and column
+    """
+    black = np.asarray(black, dtype=bool)
+    steps = np.diff(np.pad(black, ((0, 0), (0, 0), (1, 1))).view(np.int8), axis=2)
+    k, i, j0 = np.nonzero(steps == 1)
+    j1 = np.nonzero(steps == -1)[2]
+    
+    # Runs of one grid with the same columns in consecutive rows form one rectangle
+    order = np.lexsort((i, j1, j0, k))
+    k, i, j0, j1 = k[order], i[order], j0[order], j1[order]
+    starts = np.ones(len(k), dtype=bool)
+    starts[1:] = (k[1:] != k[:-1]) | (j0[1:] != j0[:-1]) | (j1[1:] != j1[:-1]) | (i[1:] != i[:-1] + 1)
+    first = np.flatnonzero(starts)
+    height = np.diff(np.append(first, len(k)))
+    rects = np.column_stack([k[first], j0[first], i[first], (j1 - j0)[first], height]).astype(np.int32)
+    return rects[np.lexsort((rects[:, 1], rects[:, 2], rects[:, 0]))]
+
+
+@lru_cache(maxsize=None)
+def _marker_outline(aruco_dict_name, marker_id):
+    """trace_cell_polygons() of one marker, as (vertices, loop lengths) arrays."""
+    black = load_marker_images(aruco_dict_name)[marker_id] == 0
+    return _cell_outline(black.tobytes(), black.shape[0])
+
+
+@lru_cache(maxsize=8192)
+def _cell_outline(bits, grid_size):
+    """trace_cell_polygons() of a square cell grid given as bool bytes (memoized by its bits)."""
+    loops = trace_cell_polygons(np.frombuffer(bits, dtype=bool).reshape(grid_size, grid_size))
+    return np.concatenate(loops), np.array([len(loop) for loop in loops])
+
+
+def merge_cut_outlines(rects, tolerance=1e-3):
+    """
+    Merge the outlines of axis-aligned rectangles into shared straight cuts.
+    
+    Every rectangle edge is projected onto its grid line; overlapping or
+    touching edges on the same line are joined into one segment. Edges
+    shared by neighbouring markers (zero spacing) are therefore cut once,
+    and a fully packed row or column becomes a single line.
+    
+    Args:
+        rects (np.ndarray): (n x 4) array of (x, y, width, height) in points
+        tolerance (float): Distance in points below which edges are treated
+            as collinear or touching
+    
+    Returns:
+        np.ndarray: (m x 2 x 2) array of line segments ((x0, y0), (x1, y1)),
+            horizontal lines first, each sorted along its line
+    """
+    rects = np.asarray(rects, dtype=np.float64).reshape(-1, 4)
+    x0, y0 = rects[:, 0], rects[:, 1]
+    x1, y1 = x0 + rects[:, 2], y0 + rects[:, 3]
+    
+    segments = []
+    # Horizontal edges: fixed y, spanning x; vertical edges: fixed x, spanning y
+    for line, lo, hi, horizontal in ((np.concatenate([y0, y1]), np.tile(x0, 2), np.tile(x1, 2), True),
+                                     (np.concatenate([x0, x1]), np.tile(y0, 2), np.tile(y1, 2), False)):
+        if not len(line):
+            continue
+        key = np.round(line / tolerance).astype(np.int64)
+        order = np.lexsort((lo, key))
+        key, line, lo, hi = key[order], line[order], lo[order], hi[order]
+        
+        # Running maximum of the segment ends, restarted on every grid line by
+        # offsetting each line by more than the whole extent
+        rank = np.cumsum(np.diff(key, prepend=key[0]) != 0)
+        offset = rank * (2 * (hi.max() - lo.min()) + 1)
+        reach = np.maximum.accumulate(hi + offset)
+        starts = np.ones(len(key), dtype=bool)
+        starts[1:] = (rank[1:] != rank[:-1]) | (lo[1:] + offset[1:] > reach[:-1] + tolerance)
+        
+        first = np.flatnonzero(starts)
+        last = np.append(first[1:], len(key)) - 1
+        fixed, start, end = line[first], lo[first], reach[last] - offset[last]
+        if horizontal:
+            segments.append(np.stack([np.column_stack([start, fixed]), np.column_stack([end, fixed])], axis=1))
+        else:
+            segments.append(np.stack([np.column_stack([fixed, start]), np.column_stack([fixed, end])], axis=1))
+    
+    if not segments:
+        return np.empty((0, 2, 2))
+    return np.concatenate(segments)
+
+
+def hilbert_index(x, y, order=16):
+    """
+    Position of integer grid points along a Hilbert curve.
+    
+    Args:
+        x (np.ndarray): Integer x coordinates in [0, 2**order)
+        y (np.ndarray): Integer y coordinates in [0, 2**order)
+        order (int): Bits per coordinate
+    
+    Returns:
+        np.ndarray: int64 distance of each point along the curve
+    """
+    x = np.asarray(x, dtype=np.int64).copy()
+    y = np.asarray(y, dtype=np.int64).copy()
+    n = 1 << order
+    d = np.zeros(x.shape, dtype=np.int64)
+    s = n >> 1
+    while s:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        d += s * s * ((3 * rx) ^ ry)
+        # Rotate the quadrant so the curve continues in the right direction
+        flip = ~ry & rx
+        x = np.where(flip, n - 1 - x, x)
+        y = np.where(flip, n - 1 - y, y)
+        x, y = np.where(ry, x, y), np.where(ry, y, x)
+        s >>= 1
+    return d
+
+
+def order_paths(starts, ends=None, origin=(0.0, 0.0)):
+    """
+    Choose a short visiting order for paths from a few vectorized heuristics.
+    
+    Candidates are the given order, a Hilbert curve through the start points
+    (which keeps nearby paths together at every scale) and serpentine sweeps
+    in horizontal and vertical strips of several widths. The candidate with
+    the least head travel wins. Everything is a sort, so this stays fast for
+    tens of thousands of paths.
+    
+    Args:
+        starts (np.ndarray): (n x 2) start point of each path
+        ends (np.ndarray, optional): (n x 2) end point of each path (default: starts)
+        origin (tuple): Head position before the first path
+    
+    Returns:
+        np.ndarray: Indices of the paths in visiting order
+    """
+    starts = np.asarray(starts, dtype=np.float64).reshape(-1, 2)
+    ends = starts if ends is None else np.asarray(ends, dtype=np.float64).reshape(-1, 2)
+    n = len(starts)
+    if n < 3:
+        return np.arange(n)
+    
+    low = starts.min(axis=0)
+    span = np.maximum(starts.max(axis=0) - low, 1e-9)
+    candidates = [np.arange(n)]
+    
+    grid = np.round((starts - low) / span.max() * ((1 << 16) - 1)).astype(np.int64)
+    candidates.append(np.argsort(hilbert_index(grid[:, 0], grid[:, 1]), kind='stable'))
+    
+    # Serpentine: sweep each strip along its length, alternating direction
+    base = np.sqrt(n / 2)
+    for along, across in ((0, 1), (1, 0)):
+        for strips in sorted({max(1, int(round(base * f))) for f in (0.25, 0.5, 1, 2, 4)}):
+            strip = np.minimum(((starts[:, across] - low[across]) / span[across] * strips).astype(np.int64),
+                               strips - 1)
+            position = np.where(strip % 2, -starts[:, along], starts[:, along])
+            candidates.append(np.lexsort((position, strip)))
+    
+    return min(candidates, key=lambda order: travel_length(starts[order], ends[order], origin))
+
+
+def travel_length(starts, ends, origin=(0.0, 0.0)):
+    """Total head travel between paths visited in the given order, from origin."""
+    starts = np.asarray(starts, dtype=np.float64).reshape(-1, 2)
+    if not len(starts):
+        return 0.0
+    previous = np.vstack([np.asarray(origin, dtype=np.float64).reshape(1, 2),
+                          np.asarray(ends, dtype=np.float64).reshape(-1, 2)[:-1]])
+    return float(np.hypot(*(starts - previous).T).sum())
+
+
+class MarkerRenderer(abc.ABC):
+    """
+    Minimal drawing interface targeted by the marker and layout code.
+    
+    Coordinates are PDF points with the origin at the bottom-left of the
+    page. Geometry arrives as NumPy arrays so backends can emit it in bulk.
+    Renderers are context managers; leaving the block closes the output.
+    A backend must implement every abstract method before it can be created.
+    """
+    
+    def __init__(self, page_size):
+        self.page_size = page_size
+    
+    @abc.abstractmethod
+    def begin_page(self, page_size=None):
+        """Start a new page (defaults to the renderer's page size)."""
+    
+    @abc.abstractmethod
+    def end_page(self):
+        """Finish the current page."""
+    
+    @abc.abstractmethod
+    def set_layer(self, layer):
+        """Switch to the 'engrave', 'cut' or 'label' layer (see LAYER_COLORS)."""
+    
+    @abc.abstractmethod
+    def rects(self, rects, fill=True):
+        """Draw rectangles given as an (n x 4) array of (x, y, width, height)."""
+    
+    @abc.abstractmethod
+    def polygon(self, loops):
+        """Draw one filled shape made of closed loops (even-odd fill)."""
+    
+    @abc.abstractmethod
+    def polylines(self, paths):
+        """Stroke open paths, each given as an (n x 2) array of points."""
+    
+    @abc.abstractmethod
+    def text(self, x, y, text, size):
+        """Draw a Helvetica string with its baseline starting at (x, y)."""
+    
+    @abc.abstractmethod
+    def string_width(self, text, size):
+        """Width of a Helvetica string in points."""
+    
+    @abc.abstractmethod
+    def close(self):
+        """Finish the document."""
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ReportLabRenderer(MarkerRenderer):
+    """
+    Renderer on top of a ReportLab canvas.
+    
+    Produces exactly the drawing calls the generator has always made, so its
+    output matches earlier versions of the tool.
+    
+    Args:
+        output: Output filename, or an existing ReportLab canvas to draw on
+        page_size (tuple): Page size in PDF points
+    """
+    
+    def __init__(self, output, page_size=A4):
+        from reportlab.pdfgen import canvas
+        
+        super().__init__(page_size)
+        if isinstance(output, canvas.Canvas):
+            self.canvas = output
+        else:
+            self.canvas = canvas.Canvas(output, pagesize=page_size)
+        self._page_open = False
+    
+    def begin_page(self, page_size=None):
+        if self._page_open:
+            self.end_page()
+        self.canvas.setPageSize(page_size or self.page_size)
+        self._page_open = True
+    
+    def end_page(self):
+        self.canvas.showPage()
+        self._page_open = False
+    
+    def set_layer(self, layer):
+        c = self.canvas
+        if layer == 'engrave':
+            c.setStrokeColorRGB(*LAYER_COLORS['engrave'])
+            c.setFillColorRGB(*LAYER_COLORS['engrave'])
+            c.setLineWidth(0.1)
+        elif layer == 'cut':
+            c.setStrokeColorRGB(*LAYER_COLORS['cut'])
+            c.setLineWidth(0.1)
+        else:
+            c.setFillColorRGB(*LAYER_COLORS['label'])
+    
+    def rects(self, rects, fill=True):
+        for x, y, w, h in np.asarray(rects).tolist():
+            self.canvas.rect(x, y, w, h, fill=int(fill), stroke=1)
+    
+    def polygon(self, loops):
+        from reportlab.pdfgen.canvas import FILL_EVEN_ODD
+        
+        path = self.canvas.beginPath()
+        for loop in loops:
+            path.moveTo(*loop[0])
+            for point in loop[1:]:
+                path.lineTo(*point)
+            path.close()
+        self.canvas.drawPath(path, fill=1, stroke=1, fillMode=FILL_EVEN_ODD)
+    
+    def polylines(self, paths):
+        if not len(paths):
+            return
+        path = self.canvas.beginPath()
+        for points in paths:
+            path.moveTo(*points[0])
+            for point in points[1:]:
+                path.lineTo(*point)
+        self.canvas.drawPath(path, fill=0, stroke=1)
+    
+    def text(self, x, y, text, size):
+        self.canvas.setFont("Helvetica", size)
+        self.canvas.drawString(x, y, text)
+    
+    def string_width(self, text, size):
+        return self.canvas.stringWidth(text, "Helvetica", size)
+    
+    def close(self):
+        self.canvas.save()
+
+
+# Helvetica advance widths (1/1000 em) for the characters used in labels
+_HELVETICA_WIDTHS = dict.fromkeys('0123456789', 556)
+_HELVETICA_WIDTHS.update({' ': 278, '-': 333, '.': 278, '_': 556})
+
+
+@lru_cache(maxsize=4096)
+def helvetica_width(text, size):
+    """Width of a label string in Helvetica, without needing a font engine (memoized)."""
+    return sum(_HELVETICA_WIDTHS.get(ch, 556) for ch in text) * size / 1000.0
+
+
+# Digits of path labels as 3x5 cell bitmaps. With a blank column after each
+# digit the advance is 4 cells; at 0.139 em per cell that is Helvetica's
+# 0.556 em, so path labels line up exactly where text labels would.
+_DIGIT_GLYPHS = {
+    '0': ('###', '#.#', '#.#', '#.#', '###'),
+    '1': ('.#.', '##.', '.#.', '.#.', '###'),
+    '2': ('###', '..#', '###', '#..', '###'),
+    '3': ('###', '..#', '.##', '..#', '###'),
+    '4': ('#.#', '#.#', '###', '..#', '..#'),
+    '5': ('###', '#..', '###', '..#', '###'),
+    '6': ('###', '#..', '###', '#.#', '###'),
+    '7': ('###', '..#', '.#.', '.#.', '.#.'),
+    '8': ('###', '#.#', '###', '#.#', '###'),
+    '9': ('###', '#.#', '###', '..#', '###'),
+}
+_GLYPH_CELL_EM = 0.139
+
+
+@lru_cache(maxsize=None)
+def glyph_outline(char):
+    """Traced outline of one label digit as (vertices, loop lengths), in cells from the top-left."""
+    black = np.array([[cell == '#' for cell in row] for row in _DIGIT_GLYPHS[char]])
+    loops = trace_cell_polygons(black)
+    return np.concatenate(loops), np.array([len(loop) for loop in loops])
+
+
+@lru_cache(maxsize=4096)
+def label_outline(text):
+    """Outline of a digit label, assembled from the cached glyph outlines 4 cells apart."""
+    glyphs = [glyph_outline(char) for char in text]
+    vertices = np.concatenate([v + (4 * k, 0) for k, (v, _) in enumerate(glyphs)])
+    return vertices, np.concatenate([lengths for _, lengths in glyphs])
+
+
+def label_path_loops(texts, x, y, size):
+    """
+    Closed loops of many path labels, placed in bulk from cached outlines.
+    
+    Args:
+        texts (list): Label strings (digits only)
+        x (np.ndarray): Left end of each label's baseline in points
+        y (np.ndarray): Baseline of each label in points
+        size (float): Font size in points (digits are 0.695 em tall)
+    
+    Returns:
+        list: Closed loops, (n x 2) arrays in points, of one even-odd shape
+    """
+    cell = size * _GLYPH_CELL_EM
+    return _place_outlines([label_outline(text) for text in texts], np.asarray(x, dtype=np.float64),
+                           np.asarray(y, dtype=np.float64) + 5 * cell, cell)
+
+
+def _label_origins(layout, marker_size_mm, border_mm, size):
+    """Label strings of a layout and the baseline start of each, where draw_marker_for_laser() puts them."""
+    if 'size' in layout.dtype.names:
+        total = layout['size'] + 2 * layout['border']
+    else:
+        total = np.full(len(layout), (marker_size_mm + 2 * border_mm) * mm)
+    texts = layout['id'].astype(str)
+    width = np.char.str_len(texts) * (4 * _GLYPH_CELL_EM * size)
+    return texts, layout['x'] + (total - width) / 2, layout['y'] - total - 8
+
+
+def layout_label_loops(layout, marker_size_mm=3, border_mm=0.5, size=6):
+    """Path labels of every marker of a layout, centred where draw_marker_for_laser() puts text labels."""
+    texts, x, y = _label_origins(layout, marker_size_mm, border_mm, size)
+    return label_path_loops(texts.tolist(), x, y, size)
+
+
+@lru_cache(maxsize=None)
+def _digit_cells():
+    """Glyph bitmaps of the digits 0-9 as one (10 x 5 x 3) boolean array."""
+    return np.array([[[cell == '#' for cell in row] for row in _DIGIT_GLYPHS[digit]]
+                     for digit in '0123456789'])
+
+
+def layout_label_rects(layout, marker_size_mm=3, border_mm=0.5, size=6):
+    """
+    Block-digit labels of every marker of a layout as filled cells.
+    
+    The same glyphs as layout_label_loops(), but as one (n x 4) array of
+    (x, y, width, height) rectangles in points, ready for rasterizing.
+    """
+    texts, x, y = _label_origins(layout, marker_size_mm, border_mm, size)
+    cell = size * _GLYPH_CELL_EM
+    lengths = np.char.str_len(texts)
+    digits = np.frombuffer(''.join(texts.tolist()).encode('ascii'), dtype=np.uint8) - ord('0')
+    owner = np.repeat(np.arange(len(texts)), lengths)
+    position = np.arange(len(digits)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    glyph, row, col = np.nonzero(_digit_cells()[digits])
+    left = x[owner[glyph]] + (4 * position[glyph] + col) * cell
+    bottom = y[owner[glyph]] + (4 - row) * cell
+    return np.column_stack([left, bottom, np.full(len(left), cell), np.full(len(left), cell)])
+
+
+class NativePDFRenderer(MarkerRenderer):
+    """
+    Lean PDF writer for the plain vector geometry this tool produces.
+    
+    Each page is a single Flate-compressed content stream of raw path
+    operators formatted straight from NumPy coordinate arrays; all
+    rectangles of one call share a single fill/stroke operator. Finished
+    pages are written to the file immediately, so memory does not grow with
+    the page count. With stream_threshold, a page whose operators outgrow
+    that many bytes is compressed into the file as it is drawn (its length
+    follows the stream as an indirect object), so memory does not grow with
+    the page's content either. Output is deterministic (no timestamps or IDs).
+    
+    Args:
+        output: Output filename or binary file object; None collects the
+            compressed pages in finished_pages instead of writing a file
+        page_size (tuple): Default page size in PDF points
+        stream_threshold (int, optional): Buffered operator bytes above which
+            the current page is streamed into the file
+    """
+    
+    _CATALOG, _PAGES, _FONT = 1, 2, 3
+    
+    def __init__(self, output, page_size=A4, stream_threshold=None):
+        super().__init__(page_size)
+        self.finished_pages = []
+        self.stream_threshold = stream_threshold
+        self._ops = None
+        self._pending = 0
+        self._deflate = None
+        self._page_size = None
+        self._layer = None
+        self._file = None
+        if output is not None:
+            self._start_file(output)
+    
+    def _start_file(self, output):
+        """Open the output and write the header and shared font object."""
+        if hasattr(output, 'write'):
+            self._file, self._owns_file = output, False
+        else:
+            self._file, self._owns_file = open(output, 'wb'), True
+        self._offsets = {}
+        self._kids = []
+        self._next_obj = 4
+        self._written = 0
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._write_object(self._FONT, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica "
+                                       b"/Encoding /WinAnsiEncoding >>")
+    
+    def _write(self, data):
+        self._file.write(data)
+        self._written += len(data)
+    
+    def _write_object(self, number, body):
+        self._offsets[number] = self._written
+        self._write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    
+    def begin_page(self, page_size=None):
+        if self._ops is not None:
+            self.end_page()
+        self._ops = []
+        self._pending = 0
+        self._page_size = page_size or self.page_size
+        self._layer = None
+    
+    def end_page(self):
+        if self._deflate is not None:
+            self._finish_streamed_page()
+            return
+        stream = zlib.compress("".join(self._ops).encode('latin-1'), 6)
+        self._ops = None
+        if self._file is None:
+            self.finished_pages.append((self._page_size, stream))
+        else:
+            self.write_page(self._page_size, stream)
+    
+    def _emit(self, op):
+        self._ops.append(op)
+        if self.stream_threshold is not None and self._file is not None:
+            self._pending += len(op)
+            if self._pending > self.stream_threshold:
+                self._flush_ops()
+    
+    def _flush_ops(self):
+        """Compress the buffered operators of the current page straight into the file."""
+        if self._deflate is None:
+            # Content stream, its length and the page object
+            self._stream_obj = self._next_obj
+            self._next_obj += 3
+            self._offsets[self._stream_obj] = self._written
+            self._write(b"%d 0 obj\n<< /Length %d 0 R /Filter /FlateDecode >>\nstream\n"
+                        % (self._stream_obj, self._stream_obj + 1))
+            self._deflate = zlib.compressobj(6)
+            self._stream_length = 0
+        data = self._deflate.compress("".join(self._ops).encode('latin-1'))
+        self._ops = []
+        self._pending = 0
+        self._write(data)
+        self._stream_length += len(data)
+    
+    def _finish_streamed_page(self):
+        self._flush_ops()
+        data = self._deflate.flush()
+        self._write(data)
+        self._write(b"\nendstream\nendobj\n")
+        self._write_object(self._stream_obj + 1, b"%d" % (self._stream_length + len(data)))
+        self._write_page_object(self._stream_obj + 2, self._page_size, self._stream_obj)
+        self._deflate = None
+        self._ops = None
+    
+    def write_page(self, page_size, stream):
+        """Append a page from an already compressed content stream."""
+        content, page = self._next_obj, self._next_obj + 1
+        self._next_obj += 2
+        self._write_object(content, b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(stream)
+                           + stream + b"\nendstream")
+        self._write_page_object(page, page_size, content)
+    
+    def _write_page_object(self, page, page_size, content):
+        self._write_object(page, (
+            "<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %s %s] "
+            "/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>"
+            % (self._PAGES, _pdf_num(page_size[0]), _pdf_num(page_size[1]), self._FONT, content)
+        ).encode('latin-1'))
+        self._kids.append(page)
+    
+    def set_layer(self, layer):
+        if layer == self._layer:
+            return
+        r, g, b = LAYER_COLORS[layer]
+        if layer == 'engrave':
+            self._emit(f"{r} {g} {b} RG {r} {g} {b} rg 0.1 w\n")
+        elif layer == 'cut':
+            self._emit(f"{r} {g} {b} RG 0.1 w\n")
+        else:
+            self._emit(f"{r} {g} {b} rg\n")
+        self._layer = layer
+    
+    def rects(self, rects, fill=True):
+        rects = np.asarray(rects, dtype=np.float64)
+        if not len(rects):
+            return
+        self._emit(("%.3f %.3f %.3f %.3f re\n" * len(rects)) % tuple(rects.ravel().tolist()))
+        self._emit("B\n" if fill else "S\n")
+    
+    def polygon(self, loops):
+        # One format call for the whole shape; loop templates are cached by length
+        loops = [np.asarray(loop, dtype=np.float64) for loop in loops]
+        template = "".join([_pdf_loop_template(len(loop)) for loop in loops]) + "B*\n"
+        coords = np.concatenate(loops).ravel().tolist() if loops else []
+        self._emit(template % tuple(coords))
+    
+    def polylines(self, paths):
+        if not len(paths):
+            return
+        parts = []
+        for points in paths:
+            points = np.asarray(points, dtype=np.float64)
+            coords = tuple(points.ravel().tolist())
+            parts.append(("%.3f %.3f m\n" + "%.3f %.3f l\n" * (len(points) - 1)) % coords)
+        parts.append("S\n")
+        self._emit("".join(parts))
+    
+    def text(self, x, y, text, size):
+        escaped = text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+        self._emit(f"BT /F1 {_pdf_num(size)} Tf {x:.3f} {y:.3f} Td ({escaped}) Tj ET\n")
+    
+    def string_width(self, text, size):
+        return helvetica_width(text, size)
+    
+    def close(self):
+        if self._ops is not None:
+            self.end_page()
+        if self._file is not None:
+            self._finish_file()
+    
+    def _finish_file(self):
+        """Write the page tree, cross-reference table and trailer, then close the output."""
+        kids = " ".join(f"{k} 0 R" for k in self._kids)
+        self._write_object(self._PAGES, f"<< /Type /Pages /Kids [{kids}] /Count {len(self._kids)} >>".encode('latin-1'))
+        self._write_object(self._CATALOG, b"<< /Type /Catalog /Pages %d 0 R >>" % self._PAGES)
+        
+        xref_offset = self._written
+        size = self._next_obj
+        lines = [b"xref\n0 %d\n" % size, b"0000000000 65535 f \n"]
+        lines += [b"%010d 00000 n \n" % self._offsets[n] for n in range(1, size)]
+        self._write(b"".join(lines))
+        self._write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+                    % (size, self._CATALOG, xref_offset))
+        if self._owns_file:
+            self._file.close()
+        self._file = None
+
+
+def rollover_output_path(output_file, file_index):
+    """Numbered filename for split output: out.pdf -> out_001.pdf."""
+    stem, ext = os.path.splitext(output_file)
+    return f"{stem}_{file_index + 1:03d}{ext}"
+
+
+class RolloverPDFRenderer(NativePDFRenderer):
+    """
+    Native PDF writer that starts a new file at a page-count or size limit.
+    
+    With a limit, pages go to out_001.pdf, out_002.pdf, ... and a new file is
+    started before a page would take the current one past max_pages or
+    max_bytes (a single page larger than max_bytes still gets its own file).
+    Without limits it writes the output file as given. Every file is a
+    complete PDF and is closed as soon as the next one starts.
+    
+    Args:
+        output_file (str): Output filename (the base name when splitting)
+        page_size (tuple): Default page size in PDF points
+        max_pages (int, optional): Most pages per file
+        max_bytes (int, optional): Largest file size in bytes
+    """
+    
+    # Bytes the page and page tree objects, their cross-reference entries and
+    # the trailer add on top of the content streams (generous upper bounds)
+    _PAGE_OVERHEAD = 300
+    _FILE_OVERHEAD = 400
+    
+    def __init__(self, output_file, page_size=A4, max_pages=None, max_bytes=None):
+        self.output_file = output_file
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        self.files = []
+        super().__init__(self._next_path(), page_size)
+    
+    def _next_path(self):
+        if self.max_pages or self.max_bytes:
+            path = rollover_output_path(self.output_file, len(self.files))
+        else:
+            path = self.output_file
+        self.files.append(path)
+        return path
+    
+    def write_page(self, page_size, stream):
+        if self._kids:
+            full = self.max_pages and len(self._kids) >= self.max_pages
+            projected = (self._written + len(stream) + self._FILE_OVERHEAD
+                         + self._PAGE_OVERHEAD * (len(self._kids) + 1))
+            if full or (self.max_bytes and projected > self.max_bytes):
+                self._finish_file()
+                self._start_file(self._next_path())
+        super().write_page(page_size, stream)
+
+
+def paged_output_path(output_file, page_index, paged=True):
+    """Per-page filename for page-less formats: name.svg -> name_p001.svg."""
+    if not paged:
+        return output_file
+    stem, ext = os.path.splitext(output_file)
+    return f"{stem}_p{page_index + 1:03d}{ext}"
+
+
+class _PagedTextRenderer(MarkerRenderer):
+    """
+    Base for text formats without pages (SVG, DXF).
+    
+    A single-page job writes to the output as given; with paged=True every
+    page goes to its own numbered file. Elements are written to the file as
+    they are drawn, so memory does not depend on the number of markers.
+    """
+    
+    def __init__(self, output, page_size, paged=False, first_page=0):
+        super().__init__(page_size)
+        self.output = output
+        self.paged = paged
+        self._page_index = first_page
+        self._file = None
+        self._layer = 'engrave'
+    
+    def begin_page(self, page_size=None):
+        if self._file is not None:
+            self.end_page()
+        self._current_size = page_size or self.page_size
+        if hasattr(self.output, 'write'):
+            if self.paged:
+                raise ValueError("Multi-page SVG/DXF output needs a filename, not a file object")
+            self._file, self._owns_file = self.output, False
+        else:
+            path = paged_output_path(self.output, self._page_index, self.paged)
+            self._file, self._owns_file = open(path, 'w', encoding='utf-8', newline='\n'), True
+        self._start_document()
+    
+    def end_page(self):
+        self._end_document()
+        if self._owns_file:
+            self._file.close()
+        self._file = None
+        self._page_index += 1
+    
+    def set_layer(self, layer):
+        self._layer = layer
+    
+    def string_width(self, text, size):
+        return helvetica_width(text, size)
+    
+    def close(self):
+        if self._file is not None:
+            self.end_page()
+
+
+class SVGRenderer(_PagedTextRenderer):
+    """
+    Streaming SVG writer in millimetres.
+    
+    Each laser layer becomes a named Inkscape-style layer group ('Engrave',
+    'Cut', 'Labels') carrying the layer colour, which LightBurn maps to its
+    own layers. Elements are spooled to one temporary file per layer while
+    the page is drawn and copied into the output in layer order when the
+    page ends, so memory stays constant.
+    
+    Args:
+        output: Output filename or text file object
+        page_size (tuple): Page size in PDF points
+        paged (bool): Write each page to its own numbered file
+        first_page (int): Number of the first page written
+    """
+    
+    _LAYER_STYLES = {
+        'engrave': ('Engrave', 'fill="#0000ff" stroke="#0000ff"'),
+        'cut': ('Cut', 'fill="none" stroke="#ff0000"'),
+        'label': ('Labels', 'fill="#000000" stroke="none" font-family="Helvetica, Arial, sans-serif"'),
+    }
+    
+    def _start_document(self):
+        width, height = self._current_size
+        self._height_mm = height / mm
+        self._spools = {layer: tempfile.TemporaryFile('w+', encoding='utf-8')
+                        for layer in self._LAYER_STYLES}
+        self._file.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<svg xmlns="http://www.w3.org/2000/svg" '
+            'xmlns:inkscape="http://www.inkscape.org/namespaces/inkscape" '
+            f'width="{width / mm:.4f}mm" height="{height / mm:.4f}mm" '
+            f'viewBox="0 0 {width / mm:.4f} {height / mm:.4f}">\n')
+    
+    def _end_document(self):
+        # 0.1pt hairline, like the PDF output
+        stroke_width = 0.1 / mm
+        for layer, (name, style) in self._LAYER_STYLES.items():
+            spool = self._spools[layer]
+            self._file.write(f'<g id="{layer}" inkscape:groupmode="layer" inkscape:label="{name}" '
+                             f'{style} stroke-width="{stroke_width:.4f}">\n')
+            spool.seek(0)
+            shutil.copyfileobj(spool, self._file)
+            spool.close()
+            self._file.write('</g>\n')
+        self._file.write('</svg>\n')
+    
+    def rects(self, rects, fill=True):
+        rects = np.asarray(rects, dtype=np.float64) / mm
+        if not len(rects):
+            return
+        # Flip to SVG's top-left origin: the rectangle's top edge is at y + height
+        rects[:, 1] = self._height_mm - rects[:, 1] - rects[:, 3]
+        d = ("M%.4f %.4fh%.4fv%.4fh%.4fz" * len(rects)) % tuple(
+            np.column_stack([rects[:, :3], rects[:, 3], -rects[:, 2]]).ravel().tolist())
+        self._spools[self._layer].write(f'<path d="{d}"/>\n')
+    
+    def polygon(self, loops):
+        parts = []
+        for loop in loops:
+            loop = np.asarray(loop, dtype=np.float64) / mm
+            loop[:, 1] = self._height_mm - loop[:, 1]
+            parts.append(("M%.4f %.4f" + "L%.4f %.4f" * (len(loop) - 1) + "Z") % tuple(loop.ravel().tolist()))
+        self._spools[self._layer].write(f'<path fill-rule="evenodd" d="{"".join(parts)}"/>\n')
+    
+    def polylines(self, paths):
+        if not len(paths):
+            return
+        parts = []
+        for points in paths:
+            points = np.asarray(points, dtype=np.float64) / mm
+            points[:, 1] = self._height_mm - points[:, 1]
+            parts.append(("M%.4f %.4f" + "L%.4f %.4f" * (len(points) - 1)) % tuple(points.ravel().tolist()))
+        self._spools[self._layer].write(f'<path fill="none" d="{"".join(parts)}"/>\n')
+    
+    def text(self, x, y, text, size):
+        escaped = text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+        self._spools[self._layer].write(
+            f'<text x="{x / mm:.4f}" y="{self._height_mm - y / mm:.4f}" '
+            f'font-size="{size / mm:.4f}">{escaped}</text>\n')
+
+
+class DXFRenderer(_PagedTextRenderer):
+    """
+    Streaming DXF (R12, millimetres) writer.
+    
+    Geometry goes on the ENGRAVE, CUT and LABELS layers, coloured blue, red
+    and white/black (ACI 5, 1 and 7) on both the layer and the entity.
+    Outlines are closed polylines; DXF has no fill, so set the ENGRAVE layer
+    to fill mode in the laser software. Every entity is written as soon as
+    it is drawn.
+    
+    Args:
+        output: Output filename or text file object
+        page_size (tuple): Page size in PDF points
+        paged (bool): Write each page to its own numbered file
+        first_page (int): Number of the first page written
+    """
+    
+    _LAYERS = {'engrave': ('ENGRAVE', 5), 'cut': ('CUT', 1), 'label': ('LABELS', 7)}
+    
+    def _start_document(self):
+        width, height = self._current_size
+        table = "".join(f"0\nLAYER\n2\n{name}\n70\n0\n62\n{color}\n6\nCONTINUOUS\n"
+                        for name, color in self._LAYERS.values())
+        self._file.write(
+            "0\nSECTION\n2\nHEADER\n"
+            "9\n$ACADVER\n1\nAC1009\n"
+            "9\n$INSUNITS\n70\n4\n"
+            f"9\n$EXTMIN\n10\n0.0\n20\n0.0\n9\n$EXTMAX\n10\n{width / mm:.4f}\n20\n{height / mm:.4f}\n"
+            "0\nENDSEC\n"
+            f"0\nSECTION\n2\nTABLES\n0\nTABLE\n2\nLAYER\n70\n{len(self._LAYERS)}\n{table}0\nENDTAB\n0\nENDSEC\n"
+            "0\nSECTION\n2\nENTITIES\n")
+    
+    def _end_document(self):
+        self._file.write("0\nENDSEC\n0\nEOF\n")
+    
+    def _polylines(self, loops, closed=True):
+        """Write polylines, each given as an (n x 2) array in points."""
+        name, color = self._LAYERS[self._layer]
+        head = (f"0\nPOLYLINE\n8\n{name}\n62\n{color}\n66\n1\n70\n{int(closed)}\n"
+                "10\n0.0\n20\n0.0\n30\n0.0\n")
+        vertex = f"0\nVERTEX\n8\n{name}\n10\n%.4f\n20\n%.4f\n30\n0.0\n"
+        tail = f"0\nSEQEND\n8\n{name}\n"
+        for loop in loops:
+            loop = np.asarray(loop, dtype=np.float64) / mm
+            self._file.write(head + (vertex * len(loop)) % tuple(loop.ravel().tolist()) + tail)
+    
+    def rects(self, rects, fill=True):
+        rects = np.asarray(rects, dtype=np.float64)
+        x0, y0 = rects[:, 0], rects[:, 1]
+        x1, y1 = x0 + rects[:, 2], y0 + rects[:, 3]
+        corners = np.stack([np.column_stack([x0, y0]), np.column_stack([x1, y0]),
+                            np.column_stack([x1, y1]), np.column_stack([x0, y1])], axis=1)
+        self._polylines(corners)
+    
+    def polygon(self, loops):
+        self._polylines(loops)
+    
+    def polylines(self, paths):
+        self._polylines(paths, closed=False)
+    
+    def text(self, x, y, text, size):
+        name, color = self._LAYERS[self._layer]
+        # DXF text height is the cap height, about 0.718 em for Helvetica
+        self._file.write(f"0\nTEXT\n8\n{name}\n62\n{color}\n10\n{x / mm:.4f}\n20\n{y / mm:.4f}\n"
+                         f"30\n0.0\n40\n{size / mm * 0.718:.4f}\n1\n{text}\n")
+
+
+# Raster output: bytes per uncompressed strip (the whole sheet is never held
+# in memory), and PNG data per IDAT chunk
+RASTER_STRIP_BYTES = 8_000_000
+_PNG_CHUNK_BYTES = 1 << 20
+
+
+def raster_page_size(page_size, dpi):
+    """Pixel (width, height) of a page at dpi."""
+    return int(round(page_size[0] / inch * dpi)), int(round(page_size[1] / inch * dpi))
+
+
+def iter_raster_strips(page_layout, aruco_dict_name='4X4_50', marker_size_mm=3, border_mm=0.5,
+                       page_size=A4, dpi=600, strip_rows=None, rects=None, row_range=None):
+    """
+    Rasterize the engrave layer of one page as horizontal strips of pixels.
+    
+    Cell edges of every marker are snapped to the pixel grid in one
+    vectorized step, so neighbouring cells meet without gaps. Each strip is
+    then filled by block copies of the marker bit grids, upscaled with
+    np.repeat (a pixel-to-cell column map, then per-cell row counts), never
+    by per-pixel loops. Only one strip is in memory at a time.
+    
+    Args:
+        page_layout (np.ndarray): Layout rows of one page (LAYOUT_DTYPE or PACKED_LAYOUT_DTYPE)
+        aruco_dict_name (str): ArUco dictionary name
+        marker_size_mm (float): Marker size in millimeters (unless the rows carry sizes)
+        border_mm (float): Border width in millimeters (unless the rows carry borders)
+        page_size (tuple): Page size in PDF points
+        dpi (float): Resolution in dots per inch
+        strip_rows (int, optional): Pixel rows per strip (default: about RASTER_STRIP_BYTES)
+        rects (np.ndarray, optional): Extra black rectangles, (n x 4) of
+            (x, y, width, height) in points, e.g. ChArUco board squares
+        row_range (tuple, optional): (first, stop) pixel rows to rasterize
+            (default: the whole page)
+    
+    Yields:
+        np.ndarray: Boolean strips (rows x width), True = engrave (black), top strip first
+    """
+    width, height = raster_page_size(page_size, dpi)
+    strip_rows = strip_rows or max(1, RASTER_STRIP_BYTES // max(width, 1))
+    black = load_marker_images(aruco_dict_name) == 0
+    grid_size = black.shape[1]
+    
+    if 'size' in page_layout.dtype.names:
+        size, border = page_layout['size'], page_layout['border']
+    else:
+        size = np.full(len(page_layout), marker_size_mm * mm)
+        border = np.full(len(page_layout), border_mm * mm)
+    # Cell edges in pixels, measured from the left and the top of the page
+    scale = dpi / inch
+    steps = np.arange(grid_size + 1) * (size / grid_size)[:, None]
+    col_edges = np.rint(((page_layout['x'] + border)[:, None] + steps) * scale).astype(np.int64)
+    row_edges = np.rint(((page_size[1] - page_layout['y'] + border)[:, None] + steps) * scale).astype(np.int64)
+    ids = page_layout['id']
+    rects = np.empty((0, 4)) if rects is None else np.asarray(rects, dtype=np.float64).reshape(-1, 4)
+    rect_cols = np.clip(np.rint(np.column_stack([rects[:, 0], rects[:, 0] + rects[:, 2]]) * scale),
+                        0, width).astype(np.int64)
+    rect_rows = np.rint(np.column_stack([page_size[1] - rects[:, 1] - rects[:, 3],
+                                         page_size[1] - rects[:, 1]]) * scale).astype(np.int64)
+    
+    first, stop = row_range or (0, height)
+    for r0 in range(first, stop, strip_rows):
+        r1 = min(r0 + strip_rows, stop)
+        strip = np.zeros((r1 - r0, width), dtype=bool)
+        active = np.flatnonzero((row_edges[:, 0] < r1) & (row_edges[:, -1] > r0)
+                                & (col_edges[:, 0] < width) & (col_edges[:, -1] > 0))
+        for m in active.tolist():
+            rows, cols = row_edges[m], col_edges[m]
+            a, b = max(rows[0], r0), min(rows[-1], r1)
+            c0, c1 = max(cols[0], 0), min(cols[-1], width)
+            # Cell index of every pixel column, then each cell row repeated for
+            # as many pixel rows as it covers inside this strip
+            cell_cols = np.repeat(np.arange(grid_size), np.diff(cols))[c0 - cols[0]:c1 - cols[0]]
+            row_counts = np.clip(np.minimum(rows[1:], b) - np.maximum(rows[:-1], a), 0, None)
+            strip[a - r0:b - r0, c0:c1] |= np.repeat(black[ids[m]][:, cell_cols], row_counts, axis=0)
+        for m in np.flatnonzero((rect_rows[:, 0] < r1) & (rect_rows[:, 1] > r0)).tolist():
+            strip[max(rect_rows[m, 0], r0) - r0:min(rect_rows[m, 1], r1) - r0,
+                  rect_cols[m, 0]:rect_cols[m, 1]] = True
+        yield strip
+
+
+def _png_chunk(kind, data):
+    return (len(data).to_bytes(4, 'big') + kind + data
+            + zlib.crc32(data, zlib.crc32(kind)).to_bytes(4, 'big'))
+
+
+def write_png(output, width, height, strips, dpi):
+    """
+    Write a 1-bit greyscale PNG from boolean strips (True = black).
+    
+    Rows are packed to bits and compressed as they arrive, so memory holds
+    one strip plus at most one IDAT chunk.
+    """
+    f = output if hasattr(output, 'write') else open(output, 'wb')
+    try:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(_png_chunk(b'IHDR', width.to_bytes(4, 'big') + height.to_bytes(4, 'big')
+                           + bytes([1, 0, 0, 0, 0])))
+        ppm = int(round(dpi / 0.0254)).to_bytes(4, 'big')
+        f.write(_png_chunk(b'pHYs', ppm + ppm + b"\x01"))
+        compressor = zlib.compressobj(6)
+        pending = []
+        for strip in strips:
+            # Filter byte 0 (none) before every row; PNG greyscale 1 = white
+            rows = np.packbits(~strip, axis=1)
+            pending.append(compressor.compress(
+                np.hstack([np.zeros((len(rows), 1), dtype=np.uint8), rows]).tobytes()))
+            if sum(map(len, pending)) >= _PNG_CHUNK_BYTES:
+                f.write(_png_chunk(b'IDAT', b"".join(pending)))
+                pending = []
+        pending.append(compressor.flush())
+        f.write(_png_chunk(b'IDAT', b"".join(pending)))
+        f.write(_png_chunk(b'IEND', b""))
+    finally:
+        if f is not output:
+            f.close()
+
+
+def write_tiff(output, width, height, strips, dpi, strip_rows):
+    """
+    Write an uncompressed 1-bit TIFF from boolean strips (True = black).
+    
+    Uncompressed bilevel strips are the baseline every TIFF reader supports.
+    Their sizes are known up front, so the directory is written first and
+    the strips follow as they arrive, without seeking.
+    """
+    import struct
+    
+    row_bytes = (width + 7) // 8
+    n_strips = -(-height // strip_rows)
+    counts = [min(strip_rows, height - k * strip_rows) * row_bytes for k in range(n_strips)]
+    resolution = (int(round(dpi * 1000)), 1000)
+    
+    # Header, then the directory with its out-of-line values, then pixel data
+    n_tags = 12
+    ifd_offset = 8
+    values_offset = ifd_offset + 2 + n_tags * 12 + 4
+    offsets_at = values_offset
+    counts_at = offsets_at + 4 * n_strips
+    xres_at = counts_at + 4 * n_strips
+    yres_at = xres_at + 8
+    data_at = yres_at + 8
+    if data_at + sum(counts) >= 1 << 32:
+        raise ValueError("Raster too large for a TIFF file; lower --dpi or use --format png")
+    offsets = [data_at + sum(counts[:k]) for k in range(n_strips)]
+    
+    SHORT, LONG, RATIONAL = 3, 4, 5
+    
+    def entry(tag, kind, count, value):
+        packed = struct.pack('<H', value) + b"\0\0" if kind == SHORT and count == 1 else struct.pack('<I', value)
+        return struct.pack('<HHI', tag, kind, count) + packed
+    
+    tags = [
+        entry(256, LONG, 1, width),
+        entry(257, LONG, 1, height),
+        entry(258, SHORT, 1, 1),                  # BitsPerSample
+        entry(259, SHORT, 1, 1),                  # Compression: none
+        entry(262, SHORT, 1, 0),                  # Photometric: WhiteIsZero, so 1 = black
+        entry(273, LONG, n_strips, offsets[0] if n_strips == 1 else offsets_at),
+        entry(277, SHORT, 1, 1),                  # SamplesPerPixel
+        entry(278, LONG, 1, strip_rows),
+        entry(279, LONG, n_strips, counts[0] if n_strips == 1 else counts_at),
+        entry(282, RATIONAL, 1, xres_at),
+        entry(283, RATIONAL, 1, yres_at),
+        entry(296, SHORT, 1, 2),                  # ResolutionUnit: inch
+    ]
+    f = output if hasattr(output, 'write') else open(output, 'wb')
+    try:
+        f.write(b"II*\0" + struct.pack('<I', ifd_offset))
+        f.write(struct.pack('<H', n_tags) + b"".join(tags) + struct.pack('<I', 0))
+        f.write(struct.pack(f'<{n_strips}I', *offsets) + struct.pack(f'<{n_strips}I', *counts))
+        f.write(struct.pack('<II', *resolution) * 2)
+        for strip in strips:
+            f.write(np.packbits(strip, axis=1).tobytes())
+    finally:
+        if f is not output:
+            f.close()
+
+
+def render_layout_raster(layout, output_file, aruco_dict_name='4X4_50', marker_size_mm=3,
+                         border_mm=0.5, page_size=A4, dpi=600, output_format='png', paged=False,
+                         strip_rows=None, rects=None):
+    """
+    Write the engrave layer of every page of a layout as a PNG or TIFF bitmap.
+    
+    Black pixels are the marker cells; cut outlines and labels stay in the
+    vector formats. Pages are written strip by strip (see
+    iter_raster_strips()), so memory stays bounded for bed-sized sheets at
+    high resolution. Multi-page layouts write one file per page.
+    
+    Args:
+        layout (np.ndarray): Layout table from compute_layout() or pack_layout()
+        output_file (str): Output filename (name_p001.png, ... when paged)
+        dpi (float): Resolution in dots per inch
+        output_format (str): 'png' or 'tiff'
+        paged (bool): Write each page to its own numbered file
+        strip_rows (int, optional): Pixel rows per strip
+        rects (np.ndarray, optional): Extra black rectangles drawn on every page
+        (remaining arguments as for render_layout_file())
+    
+    Returns:
+        list: Files written
+    """
+    width, height = raster_page_size(page_size, dpi)
+    strip_rows = strip_rows or max(1, RASTER_STRIP_BYTES // max(width, 1))
+    page_starts = np.flatnonzero(np.diff(layout['page'], prepend=-1)).tolist() + [len(layout)]
+    pages = [layout[a:b] for a, b in zip(page_starts[:-1], page_starts[1:])] or [layout]
+    files = []
+    for page_layout in pages:
+        page = int(page_layout['page'][0]) if len(page_layout) else 0
+        path = paged_output_path(output_file, page, paged)
+        strips = iter_raster_strips(page_layout, aruco_dict_name, marker_size_mm, border_mm,
+                                    page_size, dpi, strip_rows, rects)
+        with _phase('rasterize'):
+            if output_format == 'tiff':
+                write_tiff(path, width, height, strips, dpi, strip_rows)
+            else:
+                write_png(path, width, height, strips, dpi)
+        files.append(path)
+    return files
+
+
+def iter_bed_raster_strips(tiles, aruco_dict_name='4X4_50', marker_size_mm=3, border_mm=0.5,
+                           page_size=A4, dpi=600, strip_rows=None):
+    """
+    Rasterize a bed page strip by strip straight from its layout tiles.
+    
+    Tiles arrive top band first (iter_bed_tiles()) and are pulled only when
+    a strip reaches them, so just the tiles crossing the current strip are
+    held, never the whole bed layout. The pixels are those of
+    iter_raster_strips() for the full layout.
+    
+    Args:
+        tiles (iterable): Layout tables of one page, top band first
+        (remaining arguments as for iter_raster_strips())
+    
+    Yields:
+        np.ndarray: Boolean strips (rows x width), True = engrave (black), top strip first
+    """
+    width, height = raster_page_size(page_size, dpi)
+    strip_rows = strip_rows or max(1, RASTER_STRIP_BYTES // max(width, 1))
+    scale = dpi / inch
+    total = (marker_size_mm + 2 * border_mm) * mm
+    
+    def first_row(tile):
+        return int(np.floor((page_size[1] - tile['y'].max()) * scale))
+    
+    def stop_row(tile):
+        return int(np.ceil((page_size[1] - tile['y'].min() + total) * scale)) + 1
+    
+    tiles = iter(tiles)
+    window, pending = [], next(tiles, None)
+    for r0 in range(0, height, strip_rows):
+        r1 = min(r0 + strip_rows, height)
+        while pending is not None and (not len(pending) or first_row(pending) < r1):
+            if len(pending):
+                window.append(pending)
+            pending = next(tiles, None)
+        window = [tile for tile in window if stop_row(tile) > r0]
+        layout = np.concatenate(window) if window else compute_layout([])
+        yield from iter_raster_strips(layout, aruco_dict_name, marker_size_mm, border_mm, page_size, dpi,
+                                      strip_rows, row_range=(r0, r1))
+    # Tiles below the page still have to be consumed (and checked)
+    for _ in tiles:
+        pass
+
 
-# Available ArUco dictionaries with their marker counts
-ARUCO_DICTS = {
-    '4X4_50': (cv2.aruco.DICT_4X4_50, 50),
-    '4X4_100': (cv2.aruco.DICT_4X4_100, 100),
-    '4X4_250': (cv2.aruco.DICT_4X4_250, 250),
-    '4X4_1000': (cv2.aruco.DICT_4X4_1000, 1000),
-    '5X5_50': (cv2.aruco.DICT_5X5_50, 50),
-    '5X5_100': (cv2.aruco.DICT_5X5_100, 100),
-    '5X5_250': (cv2.aruco.DICT_5X5_250, 250),
-    '5X5_1000': (cv2.aruco.DICT_5X5_1000, 1000),
-    '6X6_50': (cv2.aruco.DICT_6X6_50, 50),
-    '6X6_100': (cv2.aruco.DICT_6X6_100, 100),
-    '6X6_250': (cv2.aruco.DICT_6X6_250, 250),
-    '6X6_1000': (cv2.aruco.DICT_6X6_1000, 1000),
-    '7X7_50': (cv2.aruco.DICT_7X7_50, 50),
-    '7X7_100': (cv2.aruco.DICT_7X7_100, 100),
-    '7X7_250': (cv2.aruco.DICT_7X7_250, 250),
-    '7X7_1000': (cv2.aruco.DICT_7X7_1000, 1000),
-}
+# Preview colours of the layers, as a PDF viewer shows them
+PREVIEW_COLORS = {'engrave': (0, 0, 255), 'cut': (255, 0, 0), 'label': (0, 0, 0)}
 
 
-def generate_aruco_laser_pdf(marker_ids, aruco_dict_name='4X4_50', output_file="aruco_markers.pdf", 
-                              marker_size_mm=3, border_mm=0.5, spacing_mm=20,
-                              page_size=A4, markers_per_page=20, nrows=None, ncols=None, show_labels=True):
+def render_page_preview(page_layout, aruco_dict_name='4X4_50', marker_size_mm=3, border_mm=0.5,
+                        page_size=A4, dpi=72, show_labels=True, supersample=4, rects=None):
     """
-    Generate ArUco markers optimized for laser cutting.
+    Colour preview of one page, rendered straight from its layout rows.
+    
+    Each layer - engrave cells, cut outlines and labels (as block digits) -
+    is rasterized by iter_raster_strips() at supersample times dpi and
+    box-filtered down to a coverage map, and the maps are blended over
+    white in PREVIEW_COLORS. No PDF is written or read, so previews need
+    neither a PDF renderer nor the output file.
     
     Args:
-        marker_ids (list): List of marker IDs to generate
-        aruco_dict_name (str): ArUco dictionary name (e.g., '4X4_50', '5X5_100')
-        output_file (str): Output PDF filename
-        marker_size_mm (float): Size of the marker in millimeters
-        border_mm (float): White border around marker in millimeters
-        spacing_mm (float): Space between markers in millimeters
-        page_size (tuple): Page size (A4 or letter)
-        markers_per_page (int): How many markers per page (used if nrows/ncols not specified)
-        nrows (int, optional): Explicit number of rows per page (overrides markers_per_page)
-        ncols (int, optional): Explicit number of columns per page (overrides markers_per_page)
-        show_labels (bool): Whether to show marker ID labels below each marker
+        page_layout (np.ndarray): Layout rows of one page
+        dpi (float): Resolution of the preview
+        show_labels (bool): Draw the ID labels
+        supersample (int): Sub-pixels per pixel side used for anti-aliasing
+        rects (np.ndarray, optional): Extra engraved rectangles, e.g. ChArUco squares
+        (remaining arguments as for render_page_raster())
     
     Returns:
-        None (saves PDF to output_file)
+        np.ndarray: RGB image, (height x width x 3) uint8
     """
+    width, height = raster_page_size(page_size, dpi)
+    fine_dpi = dpi * supersample
     
-    # Get ArUco dictionary
-    dict_id, max_markers = ARUCO_DICTS[aruco_dict_name]
-    aruco_dict = cv2.aruco.getPredefinedDictionary(dict_id)
-    
-    # Determine grid size based on dictionary (4x4 -> 6x6, 5x5 -> 7x7, etc.)
-    dict_grid = int(aruco_dict_name.split('X')[0])
-    grid_size = dict_grid + 2  # Add 2 for border
+    def coverage(layout, layer_rects):
+        mask = np.zeros((height * supersample, width * supersample), dtype=bool)
+        fine = np.vstack(list(iter_raster_strips(layout, aruco_dict_name, marker_size_mm, border_mm,
+                                                 page_size, fine_dpi, rects=layer_rects)))
+        h, w = min(fine.shape[0], mask.shape[0]), min(fine.shape[1], mask.shape[1])
+        mask[:h, :w] = fine[:h, :w]
+        # Box filter as strided sums of sub-pixel columns, then rows
+        mask = mask.view(np.uint8)
+        cols = sum(mask[:, k::supersample] for k in range(supersample))
+        return sum(cols[k::supersample] for k in range(supersample)) / supersample ** 2
     
-    # Create PDF canvas
-    c = canvas.Canvas(output_file, pagesize=page_size)
-    page_width, page_height = page_size
+    # Cut outlines as hairline frames (half a pixel) around every marker
+    if 'size' in page_layout.dtype.names:
+        total = page_layout['size'] + 2 * page_layout['border']
+    else:
+        total = np.full(len(page_layout), (marker_size_mm + 2 * border_mm) * mm)
+    line = inch / dpi / 2
+    x, top = page_layout['x'], page_layout['y']
+    frames = np.concatenate([
+        np.column_stack([x, top - line, total, np.full(len(x), line)]),
+        np.column_stack([x, top - total, total, np.full(len(x), line)]),
+        np.column_stack([x, top - total, np.full(len(x), line), total]),
+        np.column_stack([x + total - line, top - total, np.full(len(x), line), total]),
+    ])
     
-    # Calculate layout - use explicit nrows/ncols if provided, otherwise calculate from markers_per_page
-    if nrows is not None and ncols is not None:
-        # Both explicitly specified
-        markers_per_row = ncols
-        markers_per_col = nrows
-        markers_per_page = nrows * ncols
-    elif nrows is not None:
-        # Only nrows specified, calculate ncols from markers_per_page
-        markers_per_col = nrows
-        markers_per_row = markers_per_page // nrows
-        markers_per_page = nrows * markers_per_row
-    elif ncols is not None:
-        # Only ncols specified, calculate nrows from markers_per_page
-        markers_per_row = ncols
-        markers_per_col = markers_per_page // ncols
-        markers_per_page = markers_per_col * ncols
+    empty = compute_layout([])
+    layers = [('engrave', coverage(page_layout, rects)), ('cut', coverage(empty, frames))]
+    if show_labels and len(page_layout):
+        layers.append(('label', coverage(empty, layout_label_rects(page_layout, marker_size_mm, border_mm))))
+    image = np.full((height, width, 3), 255.0)
+    for layer, alpha in layers:
+        alpha = alpha[:, :, None]
+        image = image * (1 - alpha) + np.array(PREVIEW_COLORS[layer], dtype=np.float64) * alpha
+    return np.rint(image).astype(np.uint8)
+
+
+def write_png_rgb(output, image, dpi=72):
+    """Write an (height x width x 3) uint8 image as an 8-bit RGB PNG."""
+    height, width = image.shape[:2]
+    rows = np.hstack([np.zeros((height, 1), dtype=np.uint8), image.reshape(height, width * 3)])
+    ppm = int(round(dpi / 0.0254)).to_bytes(4, 'big')
+    data = (b"\x89PNG\r\n\x1a\n"
+            + _png_chunk(b'IHDR', width.to_bytes(4, 'big') + height.to_bytes(4, 'big')
+                         + bytes([8, 2, 0, 0, 0]))
+            + _png_chunk(b'pHYs', ppm + ppm + b"\x01")
+            + _png_chunk(b'IDAT', zlib.compress(rows.tobytes(), 9))
+            + _png_chunk(b'IEND', b""))
+    if hasattr(output, 'write'):
+        output.write(data)
     else:
-        # Neither specified, calculate square grid from markers_per_page
-        markers_per_row = int(np.sqrt(markers_per_page))
-        markers_per_col = markers_per_page // markers_per_row
-        markers_per_page = markers_per_row * markers_per_col
+        with open(output, 'wb') as f:
+            f.write(data)
+
+
+class TravelOrderingRenderer(MarkerRenderer):
+    """
+    Renderer wrapper that reorders each page for short laser head travel.
     
-    spacing = spacing_mm * mm
+    Drawing calls are buffered until the page ends. The page is then replayed
+    into the wrapped renderer in the shortest of a few orders (see _order():
+    as drawn, layer by layer with each layer ordered by order_paths(), or
+    marker blocks reordered as units); open polylines are drawn from the end
+    nearest the head. Travel is never longer than the order as drawn.
+    Consecutive rectangles are replayed as one rects() call.
     
-    marker_count = 0
+    Travel and stroked length are accumulated in stats (millimetres).
     
-    for marker_id in marker_ids:
-        # Generate ArUco marker at grid resolution (clean, simple output)
-        marker_img = cv2.aruco.generateImageMarker(aruco_dict, marker_id, grid_size)
-        
-        # Calculate position on page
-        row = (marker_count % markers_per_page) // markers_per_row
-        col = (marker_count % markers_per_page) % markers_per_row
-        
-        # Center the grid on page
-        total_width = markers_per_row * (marker_size_mm * mm + border_mm * 2 * mm) + (markers_per_row - 1) * spacing
-        total_height = markers_per_col * (marker_size_mm * mm + border_mm * 2 * mm) + (markers_per_col - 1) * spacing
+    Args:
+        renderer (MarkerRenderer): Renderer receiving the reordered pages
+    """
+    
+    _RECT_FILL, _RECT_STROKE, _POLYGON, _POLYLINE, _TEXT = range(5)
+    
+    def __init__(self, renderer):
+        super().__init__(renderer.page_size)
+        self.renderer = renderer
+        self.stats = None
+        self._calls = None
+    
+    def begin_page(self, page_size=None):
+        if self._calls is not None:
+            self.end_page()
+        self.renderer.begin_page(page_size)
+        self._calls = []
+        self._layer = 'engrave'
+    
+    def end_page(self):
+        with _phase('optimize travel'):
+            self._replay()
+        self._calls = None
+        self.renderer.end_page()
+    
+    def set_layer(self, layer):
+        self._layer = layer
+    
+    def rects(self, rects, fill=True):
+        rects = np.asarray(rects, dtype=np.float64).reshape(-1, 4)
+        if len(rects):
+            self._calls.append((self._layer, self._RECT_FILL if fill else self._RECT_STROKE, rects))
+    
+    def polygon(self, loops):
+        self._calls.append((self._layer, self._POLYGON, [np.asarray(loop, dtype=np.float64) for loop in loops]))
+    
+    def polylines(self, paths):
+        if len(paths):
+            self._calls.append((self._layer, self._POLYLINE, [np.asarray(p, dtype=np.float64) for p in paths]))
+    
+    def text(self, x, y, text, size):
+        self._calls.append((self._layer, self._TEXT, (x, y, text, size)))
+    
+    def string_width(self, text, size):
+        return self.renderer.string_width(text, size)
+    
+    def close(self):
+        if self._calls is not None:
+            self.end_page()
+        self.renderer.close()
+    
+    def _replay(self):
+        """Order the buffered page, update stats and draw it into the wrapped renderer."""
+        layers = list(LAYER_COLORS)
+        rect_rows, shapes = [], []
+        layer, kind, ref, starts, ends, work = [], [], [], [], [], []
+        for call_layer, call_kind, data in self._calls:
+            if call_kind in (self._RECT_FILL, self._RECT_STROKE):
+                # A rectangle is traced from its corner back to the same corner
+                first = sum(len(r) for r in rect_rows)
+                rect_rows.append(data)
+                n = len(data)
+                refs = np.arange(first, first + n)
+                start = end = data[:, :2]
+                length = 2 * (data[:, 2] + data[:, 3])
+            elif call_kind == self._POLYLINE:
+                n = len(data)
+                refs = np.arange(len(shapes), len(shapes) + n)
+                shapes.extend(data)
+                start = np.array([p[0] for p in data])
+                end = np.array([p[-1] for p in data])
+                length = np.array([np.hypot(*np.diff(p, axis=0).T).sum() for p in data])
+            else:
+                n = 1
+                refs = np.array([len(shapes)])
+                shapes.append(data)
+                if call_kind == self._POLYGON:
+                    start = end = np.array([data[0][0]]) if data else np.zeros((1, 2))
+                    length = np.array([sum(np.hypot(*(np.roll(loop, -1, axis=0) - loop).T).sum()
+                                           for loop in data)])
+                else:
+                    start = end = np.array([data[:2]], dtype=np.float64)
+                    length = np.zeros(1)
+            layer.append(np.full(n, layers.index(call_layer)))
+            kind.append(np.full(n, call_kind))
+            ref.append(refs)
+            starts.append(start)
+            ends.append(end)
+            work.append(length)
         
-        start_x = (page_width - total_width) / 2
-        start_y = (page_height - total_height) / 2
+        stats = dict(paths=0, travel_before_mm=0.0, travel_after_mm=0.0,
+                     layer_changes_before=0, layer_changes_after=0,
+                     work_mm=dict.fromkeys(layers, 0.0))
+        if layer:
+            layer, kind, ref = np.concatenate(layer), np.concatenate(kind), np.concatenate(ref)
+            starts, ends, work = np.concatenate(starts), np.concatenate(ends), np.concatenate(work)
+            rect_rows = np.concatenate(rect_rows) if rect_rows else np.empty((0, 4))
+            
+            sequence, reverse, travel_after = self._order(layer, kind, starts, ends)
+            stats['paths'] = len(layer)
+            stats['travel_before_mm'] = travel_length(starts, ends) / mm
+            stats['travel_after_mm'] = travel_after / mm
+            stats['layer_changes_before'] = int(np.count_nonzero(np.diff(layer)))
+            stats['layer_changes_after'] = int(np.count_nonzero(np.diff(layer[sequence])))
+            for code, name in enumerate(layers):
+                stats['work_mm'][name] = float(work[layer == code].sum()) / mm
+            self._draw(sequence, reverse, layer, kind, ref, rect_rows, shapes)
+        self.stats = _add_travel_stats(self.stats, stats)
+    
+    def _order(self, layer, kind, starts, ends):
+        """
+        Visiting order, per-path reversal flags and total travel for one page.
         
-        x = start_x + col * (marker_size_mm * mm + border_mm * 2 * mm + spacing)
-        y = page_height - (start_y + row * (marker_size_mm * mm + border_mm * 2 * mm + spacing))
+        Candidates are the page as drawn, the page grouped by layer (each
+        layer ordered with order_paths()) and the page's blocks - runs of
+        paths that start wherever the layer drops back, usually one marker
+        each - reordered as units with their own layer order kept. Each is
+        tried with and without turning polylines around, and the shortest
+        wins, so the result never travels further than the input.
+        """
+        n = len(layer)
+        candidates = [np.arange(n)]
         
-        # Draw the marker
-        draw_marker_for_laser(c, marker_img, x, y, marker_size_mm * mm, border_mm * mm, 
-                            marker_id, show_labels)
+        # Grouped by layer, each layer starting where the previous one ended
+        sequence, cursor = [], np.zeros(2)
+        for code in range(len(LAYER_COLORS)):
+            original = np.flatnonzero(layer == code)
+            if len(original):
+                sequence.append(original[order_paths(starts[original], ends[original], cursor)])
+                cursor = ends[sequence[-1][-1]]
+        candidates.append(np.concatenate(sequence))
         
-        marker_count += 1
+        # Blocks moved as units
+        block = np.concatenate([[0], np.cumsum(np.diff(layer) < 0)])
+        if block[-1] > 1:
+            first = np.flatnonzero(np.diff(block, prepend=-1))
+            last = np.append(first[1:], n) - 1
+            rank = np.empty(len(first), dtype=np.int64)
+            rank[order_paths(starts[first], ends[last])] = np.arange(len(first))
+            candidates.append(np.argsort(rank[block], kind='stable'))
         
-        # New page if needed
-        if marker_count % markers_per_page == 0 and marker_count < len(marker_ids):
-            c.showPage()
+        best = None
+        for sequence in candidates:
+            for orient in (False, True):
+                reverse, total = self._orient(sequence, kind, starts, ends, orient)
+                if best is None or total < best[2] - 1e-6:
+                    best = (sequence, reverse, total)
+        return best
+    
+    def _orient(self, sequence, kind, starts, ends, orient=True):
+        """Reversal flags (each polyline drawn from the end nearest the head) and travel of a sequence."""
+        reverse = np.zeros(len(kind), dtype=bool)
+        if orient:
+            for k in np.flatnonzero(kind[sequence] == self._POLYLINE).tolist():
+                previous = sequence[k - 1]
+                position = (np.zeros(2) if k == 0 else
+                            starts[previous] if reverse[previous] else ends[previous])
+                path = sequence[k]
+                reverse[path] = np.hypot(*(ends[path] - position)) < np.hypot(*(starts[path] - position))
+        flip = reverse[sequence][:, None]
+        ordered_starts = np.where(flip, ends[sequence], starts[sequence])
+        ordered_ends = np.where(flip, starts[sequence], ends[sequence])
+        return reverse, travel_length(ordered_starts, ordered_ends)
+    
+    def _draw(self, sequence, reverse, layer, kind, ref, rect_rows, shapes):
+        """Replay the paths in sequence, batching runs of the same layer and kind."""
+        layers = list(LAYER_COLORS)
+        run_key = layer[sequence] * 8 + kind[sequence]
+        bounds = np.flatnonzero(np.diff(run_key, prepend=-1)).tolist() + [len(sequence)]
+        r = self.renderer
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            run = sequence[start:stop]
+            run_kind = kind[run[0]]
+            r.set_layer(layers[layer[run[0]]])
+            if run_kind in (self._RECT_FILL, self._RECT_STROKE):
+                r.rects(rect_rows[ref[run]], fill=run_kind == self._RECT_FILL)
+            elif run_kind == self._POLYLINE:
+                r.polylines([shapes[i][::-1] if rev else shapes[i]
+                             for i, rev in zip(ref[run].tolist(), reverse[run].tolist())])
+            elif run_kind == self._POLYGON:
+                for i in ref[run].tolist():
+                    r.polygon(shapes[i])
+            else:
+                for i in ref[run].tolist():
+                    r.text(*shapes[i])
+
+
+class ProfilingRenderer(MarkerRenderer):
+    """
+    Renderer wrapper that counts and times every drawing call for a Profiler.
     
-    # Save PDF
-    c.save()
-    print(f"✓ Generated {len(marker_ids)} markers in {output_file}")
+    Drawing calls are timed as 'emit', label width lookups as 'label widths',
+    page ends (compression and writing) as 'finish page' and closing the
+    output (ReportLab's save) as 'save'. Counts go to the profiler counters
+    pages, rects, paths (polygon loops and polylines), strings and
+    string widths.
+    
+    Args:
+        renderer (MarkerRenderer): Renderer receiving the calls
+        profiler (Profiler): Profiler collecting the timings and counts
+    """
+    
+    def __init__(self, renderer, profiler):
+        super().__init__(renderer.page_size)
+        self.renderer = renderer
+        self.profiler = profiler
+    
+    def _timed(self, phase, method, *args):
+        with self.profiler.phase(phase):
+            return method(*args)
+    
+    def begin_page(self, page_size=None):
+        self.profiler.count('pages')
+        self._timed('emit', self.renderer.begin_page, page_size)
+    
+    def end_page(self):
+        self._timed('finish page', self.renderer.end_page)
+    
+    def set_layer(self, layer):
+        self._timed('emit', self.renderer.set_layer, layer)
+    
+    def rects(self, rects, fill=True):
+        self.profiler.count('rects', len(rects))
+        self._timed('emit', self.renderer.rects, rects, fill)
+    
+    def polygon(self, loops):
+        self.profiler.count('paths', len(loops))
+        self._timed('emit', self.renderer.polygon, loops)
+    
+    def polylines(self, paths):
+        self.profiler.count('paths', len(paths))
+        self._timed('emit', self.renderer.polylines, paths)
+    
+    def text(self, x, y, text, size):
+        self.profiler.count('strings')
+        self._timed('emit', self.renderer.text, x, y, text, size)
+    
+    def string_width(self, text, size):
+        self.profiler.count('string widths')
+        return self._timed('label widths', self.renderer.string_width, text, size)
+    
+    def close(self):
+        self._timed('save', self.renderer.close)
+
+
+def _add_travel_stats(total, stats):
+    """Sum two travel statistics dicts (either may be None)."""
+    if total is None or stats is None:
+        return stats if total is None else total
+    summed = {key: total[key] + stats[key] for key in total if key != 'work_mm'}
+    summed['work_mm'] = {key: total['work_mm'][key] + stats['work_mm'][key] for key in total['work_mm']}
+    return summed
+
+
+def estimate_job_seconds(travel_mm, work_mm, speeds=None):
+    """
+    Rough laser job time from head travel and stroked length per layer.
+    
+    Args:
+        travel_mm (float): Head travel between paths in millimetres
+        work_mm (dict): Stroked length per layer in millimetres
+        speeds (dict, optional): Speeds in mm/s (default: JOB_TIME_SPEEDS)
+    
+    Returns:
+        float: Estimated seconds
+    """
+    speeds = speeds or JOB_TIME_SPEEDS
+    return travel_mm / speeds['travel'] + sum(length / speeds[layer] for layer, length in work_mm.items())
+
+
+def _format_duration(seconds):
+    """Format seconds as '1h 02m 03s', '15m 20s' or '42s'."""
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}h {minutes:02d}m {seconds:02d}s"
+    if minutes:
+        return f"{minutes}m {seconds:02d}s"
+    return f"{seconds}s"
+
+
+def format_travel_report(stats):
+    """Before/after travel and job-time summary for --optimize-travel."""
+    before, after = stats['travel_before_mm'], stats['travel_after_mm']
+    saved = (1 - after / before) * 100 if before else 0.0
+    time_before = estimate_job_seconds(before, stats['work_mm'])
+    time_after = estimate_job_seconds(after, stats['work_mm'])
+    return (f"  Travel:        {before / 1000:.2f} m → {after / 1000:.2f} m "
+            f"({abs(saved):.0f}% {'less' if saved >= 0 else 'more'}, {stats['paths']} paths)\n"
+            f"  Layer changes: {stats['layer_changes_before']} → {stats['layer_changes_after']}\n"
+            f"  Est. job time: {_format_duration(time_before)} → {_format_duration(time_after)} "
+            f"(travel at {JOB_TIME_SPEEDS['travel']:.0f} mm/s)")
+
+
+# Profiler of the current run (see profiling()); None when profiling is off
+_PROFILER = contextvars.ContextVar('aruco_laser_profiler', default=None)
+_NO_PHASE = contextlib.nullcontext()
+
+
+class Profiler:
+    """
+    Per-phase timers, primitive counters and peak memory of one run.
+    
+    Phases nest: each phase records its total time and its self time (total
+    minus the phases inside it), so self times add up to the wall time.
+    Activate a profiler with profiling(); without one the instrumented code
+    only pays a context variable lookup per page.
+    
+    Attributes:
+        phases (dict): Phase name -> [calls, total seconds, self seconds]
+        counters (dict): Counter name -> count (markers, pages, rects, ...)
+        wall_seconds (float): Time spent inside profiling() blocks
+        peak_rss_mb (float or None): Peak resident memory of the process in MB
+    """
+    
+    def __init__(self):
+        self.phases = {}
+        self.counters = {}
+        self.wall_seconds = 0.0
+        self.peak_rss_mb = None
+        self._children = []
+    
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Time the enclosed block as phase name."""
+        self._children.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            inner = self._children.pop()
+            entry = self.phases.setdefault(name, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2] += elapsed - inner
+            if self._children:
+                self._children[-1] += elapsed
+    
+    def count(self, name, n=1):
+        """Add n to counter name."""
+        self.counters[name] = self.counters.get(name, 0) + n
+    
+    def as_dict(self):
+        """Metrics as plain JSON-serialisable data."""
+        return {
+            'wall_seconds': self.wall_seconds,
+            'peak_rss_mb': self.peak_rss_mb,
+            'phases': {name: {'calls': calls, 'seconds': total, 'self_seconds': own}
+                       for name, (calls, total, own) in self.phases.items()},
+            'counters': dict(self.counters),
+        }
+
+
+@contextlib.contextmanager
+def profiling(profiler=None):
+    """
+    Profile everything run inside the block in this thread.
+    
+    Example:
+        with profiling() as profiler:
+            generate_aruco_laser_pdf(range(1000), '4X4_1000', verbose=False)
+        print(format_profile_report(profiler))
+    
+    Args:
+        profiler (Profiler, optional): Profiler to add to (default: a new one)
+    
+    Yields:
+        Profiler: The active profiler
+    """
+    profiler = profiler or Profiler()
+    token = _PROFILER.set(profiler)
+    start = time.perf_counter()
+    try:
+        yield profiler
+    finally:
+        profiler.wall_seconds += time.perf_counter() - start
+        profiler.peak_rss_mb = peak_rss_mb()
+        _PROFILER.reset(token)
 
 
-def draw_marker_for_laser(c, marker_img, x, y, size, border, marker_id, show_labels=True):
+def _phase(name):
+    """Context manager timing phase name on the active profiler, if any."""
+    profiler = _PROFILER.get()
+    return _NO_PHASE if profiler is None else profiler.phase(name)
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB, or None where unavailable."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def format_profile_report(profiler):
+    """Phase table, counters and peak memory for --profile."""
+    wall = profiler.wall_seconds
+    memory = f", peak RSS {profiler.peak_rss_mb:.1f} MB" if profiler.peak_rss_mb is not None else ""
+    lines = [f"  Profile: {wall:.3f}s wall{memory}",
+             f"  {'Phase':<20}{'Calls':>8}{'Total s':>10}{'Self s':>10}{'Share':>8}"]
+    phases = sorted(profiler.phases.items(), key=lambda item: -item[1][2])
+    other = wall - sum(own for _, (_, _, own) in phases)
+    for name, (calls, total, own) in phases + [('other', (1, other, other))]:
+        share = own / wall * 100 if wall else 0.0
+        lines.append(f"  {name:<20}{calls:>8}{total:>10.3f}{own:>10.3f}{share:>7.0f}%")
+    if profiler.counters:
+        lines.append("  Counts: " + ", ".join(f"{name} {n}" for name, n in profiler.counters.items()))
+    return "\n".join(lines)
+
+
+@lru_cache(maxsize=None)
+def _pdf_loop_template(n):
+    """Format string of a closed PDF path through n points."""
+    return "%.3f %.3f m\n" + "%.3f %.3f l\n" * (n - 1) + "h\n"
+
+
+def _pdf_num(value):
+    """Format a number for PDF output without a trailing '.0' or float noise."""
+    return f"{value:.4f}".rstrip('0').rstrip('.')
+
+
+def draw_marker_for_laser(c, marker_img, x, y, size, border, marker_id, show_labels=True,
+                          engrave_mode='cells', cut=True):
     """
     Draw a single ArUco marker with laser-cutter color coding.
     
@@ -179,7 +3652,7 @@ def draw_marker_for_laser(c, marker_img, x, y, size, border, marker_id, show_lab
     - Red (RGB: 255,0,0) = Cutting layer for outer border
     
     Args:
-        c: ReportLab canvas object
+        c: MarkerRenderer, or a ReportLab canvas object
         marker_img: ArUco marker image array (grid_size x grid_size)
         x (float): X position in PDF points
         y (float): Y position in PDF points
@@ -187,41 +3660,54 @@ def draw_marker_for_laser(c, marker_img, x, y, size, border, marker_id, show_lab
         border (float): Border width in PDF points
         marker_id (int): Marker ID number
         show_labels (bool): Whether to show marker ID label
+        engrave_mode (str): 'cells' draws one square per black cell, 'rects' draws
+            merged rectangles and 'polygons' draws merged outlines with holes
+        cut (bool): Whether to draw the cut outline (off when the caller
+            draws merged cut lines for the whole page)
     """
+    if not isinstance(c, MarkerRenderer):
+        c = ReportLabRenderer(c)
     
     grid_size = marker_img.shape[0]
     cell_size = size / grid_size
+    black = marker_img == 0  # Black cells in ArUco marker
     
     # Draw blue filled squares for black cells (engraving layer)
-    c.setStrokeColorRGB(0, 0, 1)  # Blue stroke
-    c.setFillColorRGB(0, 0, 1)  # Blue fill
-    c.setLineWidth(0.1)
-    
-    for i in range(grid_size):
-        for j in range(grid_size):
-            if marker_img[i, j] == 0:  # Black cell in ArUco marker
-                # Calculate position (PDF coordinates start from bottom-left)
-                cell_x = x + j * cell_size + border
-                cell_y = y - (i + 1) * cell_size - border
-                
-                # Draw blue filled square
-                c.rect(cell_x, cell_y, cell_size, cell_size, fill=1, stroke=1)
+    c.set_layer('engrave')
+    
+    if engrave_mode == 'cells':
+        # Calculate positions (PDF coordinates start from bottom-left)
+        i, j = np.nonzero(black)
+        cells = np.empty((len(i), 4))
+        cells[:, 0] = x + j * cell_size + border
+        cells[:, 1] = y - (i + 1) * cell_size - border
+        cells[:, 2:] = cell_size
+        c.rects(cells)
+    elif engrave_mode == 'rects':
+        j, i, w, h = merge_cells_to_rects(black).T
+        c.rects(np.column_stack([x + j * cell_size + border, y - (i + h) * cell_size - border,
+                                 w * cell_size, h * cell_size]))
+    else:
+        # One shape for the whole marker; white holes are cut out by even-odd fill.
+        # The traced outline is cached by the marker's bits, so repeats are free
+        outline = _cell_outline(black.tobytes(), grid_size)
+        c.polygon(_place_outlines([outline], np.array([x + border]), np.array([y - border]), cell_size))
     
     # Draw red cutting outline (outer square - cutting layer)
-    c.setStrokeColorRGB(1, 0, 0)  # Red
-    c.setLineWidth(0.1)
     total_size = size + 2 * border
-    c.rect(x, y - total_size, total_size, total_size, fill=0, stroke=1)
+    if cut:
+        c.set_layer('cut')
+        c.rects([(x, y - total_size, total_size, total_size)], fill=False)
     
     # Add marker ID text below (optional, in black)
     if show_labels:
-        c.setFillColorRGB(0, 0, 0)
-        c.setFont("Helvetica", 6)
-        text_width = c.stringWidth(f"{marker_id}", "Helvetica", 6)
-        c.drawString(x + (total_size - text_width) / 2, y - total_size - 8, f"{marker_id}")
+        c.set_layer('label')
+        text_width = c.string_width(f"{marker_id}", 6)
+        c.text(x + (total_size - text_width) / 2, y - total_size - 8, f"{marker_id}", 6)
 
 
-def main():
+def build_parser():
+    """Build the command-line parser (also used to validate batch manifest jobs)."""
     parser = argparse.ArgumentParser(
         description='Generate ArUco markers for laser cutting (Blue=engrave, Red=cut)',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -232,7 +3718,14 @@ Examples:
   %(prog)s -r 0 20 -s 15 -b 1               # Generate IDs 0-20 with custom sizing
   %(prog)s -i 0 1 2 3 --spacing 30          # Custom spacing between markers
   %(prog)s -r 0 10 --no-labels              # Generate without ID labels
+  %(prog)s --select 40 --from 6X6_1000      # The 40 most distinct markers of a dictionary
   %(prog)s --dict 4X4_50 --nrows 5 --ncols 4  # Explicit 5×4 grid layout
+  %(prog)s --dict 7X7_1000 --engrave-mode polygons  # Merged engrave outlines
+  %(prog)s -r 0 99 --spacing 0 --cut-mode merged   # Cut shared edges only once
+  %(prog)s --dict 4X4_1000 --optimize-travel        # Reorder paths, report travel saving
+  %(prog)s --markers list.csv --sheet 600x400 --pack --spacing 2  # Mixed sizes on material sheets
+  %(prog)s batch jobs.toml -j 4             # Run every job of a manifest in one process
+  %(prog)s serve --port 8765                # Local HTTP render service (POST JSON jobs to /render)
 
 Available dictionaries:
   4X4_50, 4X4_100, 4X4_250, 4X4_1000
@@ -242,15 +3735,27 @@ Available dictionaries:
         """
     )
     
-    parser.add_argument('--dict', '--dictionary',
+    parser.add_argument('--dict', '--dictionary', '--from',
                         dest='dictionary',
                         choices=list(ARUCO_DICTS.keys()),
                         default='4X4_50',
-                        help='ArUco dictionary to use (default: 4X4_50)')
+                        help='ArUco dictionary to use (default: 4X4_50; --from reads better with --select)')
     
     parser.add_argument('-o', '--output', 
                         default='aruco_markers.pdf',
-                        help='Output PDF filename (default: aruco_markers.pdf)')
+                        help='Output filename (default: aruco_markers.pdf, or .svg/.dxf with --format)')
+    
+    parser.add_argument('--format',
+                        choices=OUTPUT_FORMATS,
+                        default=None,
+                        help='Output format (default: from the output file extension, else pdf). '
+                             'Multi-page SVG/DXF/PNG/TIFF jobs write one file per page; '
+                             'PNG/TIFF are 1-bit bitmaps of the engrave layer')
+    
+    parser.add_argument('--dpi',
+                        type=float,
+                        default=600.0,
+                        help='Resolution of PNG/TIFF output in dots per inch (default: 600)')
     
     parser.add_argument('-s', '--size', 
                         type=float, 
@@ -278,6 +3783,12 @@ Available dictionaries:
                         metavar=('START', 'END'),
                         help='Generate markers from START to END (inclusive)')
     
+    parser.add_argument('--select',
+                        type=int,
+                        metavar='N',
+                        help='Generate the N most distinct markers of the dictionary (largest minimum '
+                             'Hamming distance over all rotations), e.g. --select 40 --from 6X6_1000')
+    
     parser.add_argument('-p', '--per-page',
                         type=int,
                         default=20,
@@ -298,17 +3809,174 @@ Available dictionaries:
                         default='A4',
                         help='Page size (default: A4)')
     
+    parser.add_argument('--sheet',
+                        type=parse_sheet_size,
+                        default=None,
+                        metavar='WxH',
+                        help='Material sheet size in millimeters, e.g. 600x400 (overrides --page-size)')
+    
+    parser.add_argument('--pack',
+                        action='store_true',
+                        help='Pack markers onto as few sheets as possible instead of a centred grid '
+                             '(--spacing is the gap between markers) and report utilisation')
+    
+    parser.add_argument('--margin',
+                        type=float,
+                        default=5.0,
+                        help='Sheet edge margin in millimeters when packing or with --bed, and the '
+                             'margin between a board and its cut outline (default: 5.0)')
+    
+    parser.add_argument('--bed',
+                        action='store_true',
+                        help='Put every marker on one page the size of --sheet, row by row from the '
+                             'top-left --margin, streaming the geometry tile by tile in constant memory')
+    
+    parser.add_argument('--board',
+                        choices=BOARD_TYPES,
+                        default=None,
+                        help='Lay the markers out as one calibration board: an OpenCV GridBoard '
+                             '(--spacing apart) or a ChArUco board (markers in the white squares)')
+    
+    parser.add_argument('--board-shape',
+                        nargs=2,
+                        type=int,
+                        metavar=('COLS', 'ROWS'),
+                        help='Board size in markers (grid) or squares (charuco) '
+                             '(default: as large as fits on the page)')
+    
+    parser.add_argument('--square',
+                        type=float,
+                        default=None,
+                        help='ChArUco square size in millimeters (default: marker size / 0.75)')
+    
+    parser.add_argument('--markers',
+                        metavar='FILE',
+                        help="Marker list with one 'ids,size,border' line per marker or ID range "
+                             "(e.g. '0-49,10,0.5'); size and border default to -s/-b")
+    
     parser.add_argument('--no-labels',
                         action='store_true',
                         help='Do not show marker ID labels below markers')
     
-    args = parser.parse_args()
+    parser.add_argument('--label-mode',
+                        choices=LABEL_MODES,
+                        default='text',
+                        help='Draw ID labels as text, or as filled digit outlines on the engrave '
+                             'layer for laser software that ignores or slowly converts text '
+                             '(default: text)')
+    
+    parser.add_argument('-j', '--jobs',
+                        type=int,
+                        default=1,
+                        help='Worker processes for rendering pages (default: 1, 0 = one per CPU; '
+                             'with --pdf-writer reportlab, more than 1 needs pypdf)')
+    
+    parser.add_argument('--pdf-writer',
+                        choices=PDF_WRITERS,
+                        default='native',
+                        help='PDF writer: built-in native writer or ReportLab (default: native)')
+    
+    parser.add_argument('--engrave-mode',
+                        choices=ENGRAVE_MODES,
+                        default='cells',
+                        help='Engrave geometry: one square per cell, merged rectangles, '
+                             'or merged polygons with holes (default: cells)')
+    
+    parser.add_argument('--cut-mode',
+                        choices=CUT_MODES,
+                        default='outlines',
+                        help='Cut geometry: one square per marker, or merged lines along the grid '
+                             'so shared edges are cut once (default: outlines)')
+    
+    parser.add_argument('--max-pages',
+                        type=int,
+                        default=None,
+                        help='Split PDF output into numbered files (name_001.pdf, ...) of at most N pages')
+    
+    parser.add_argument('--max-size',
+                        type=float,
+                        default=None,
+                        metavar='MB',
+                        help='Split PDF output into numbered files of at most this many megabytes')
+    
+    parser.add_argument('--cache',
+                        action='store_true',
+                        help='Reuse outputs of identical earlier jobs and unchanged PDF pages '
+                             '(cache in ~/.cache/aruco-laser/outputs)')
+    
+    parser.add_argument('--cache-dir',
+                        default=None,
+                        help='Output cache directory (implies --cache)')
+    
+    parser.add_argument('--cache-size',
+                        type=float,
+                        default=512.0,
+                        metavar='MB',
+                        help='Output cache size limit; least recently used entries are evicted (default: 512)')
+    
+    parser.add_argument('--optimize-travel',
+                        action='store_true',
+                        help='Group each page by layer and reorder paths to shorten laser head travel; '
+                             'prints estimated travel and job time before and after')
+    
+    parser.add_argument('--profile',
+                        action='store_true',
+                        help='Print time per phase, primitive counts and peak memory when done '
+                             '(with -j > 1, worker processes are reported as one phase)')
+    
+    parser.add_argument('--verify',
+                        nargs='?',
+                        type=float,
+                        const=300.0,
+                        default=None,
+                        metavar='DPI',
+                        help='After generating, read every page back at DPI (default: 300; PNG/TIFF at '
+                             'their own) and check that OpenCV detects each marker with the right ID and '
+                             'corners (needs opencv-python; PDF read-back needs pymupdf, else the drawn '
+                             'geometry is checked)')
+    
+    parser.add_argument('--metrics-json',
+                        metavar='FILE',
+                        default=None,
+                        help="Write the profile as JSON to FILE ('-' for standard output; the report "
+                             "then goes to standard error)")
+    
+    return parser
+
+
+def resolve_job(args, parser=None):
+    """
+    Turn parsed command-line arguments into generate_aruco_laser_pdf() arguments.
+    
+    Args:
+        args (argparse.Namespace): Parsed arguments from build_parser()
+        parser (argparse.ArgumentParser, optional): Parser the arguments came from
+    
+    Returns:
+        dict: Keyword arguments for generate_aruco_laser_pdf()
+    
+    Raises:
+        ValueError: If a marker ID is outside the dictionary
+    """
+    parser = parser or build_parser()
     
     # Get dictionary info
     dict_id, max_markers = ARUCO_DICTS[args.dictionary]
     
     # Determine which markers to generate
-    if args.ids:
+    marker_size_mm, border_mm = args.size, args.border
+    if args.select is not None and (args.markers or args.ids or args.range):
+        raise ValueError("--select cannot be combined with --markers, --ids or --range")
+    if args.select is not None:
+        marker_ids = _selection.select_distinct_markers(args.dictionary, args.select)
+    elif args.markers:
+        marker_ids, sizes, borders = load_marker_list(args.markers, args.size, args.border)
+        # Uniform lists collapse to one value so they also work on the grid
+        marker_size_mm = sizes[0] if len(set(sizes)) == 1 else sizes
+        border_mm = borders[0] if len(set(borders)) == 1 else borders
+        if not args.pack and (isinstance(marker_size_mm, list) or isinstance(border_mm, list)):
+            raise ValueError("Markers of different sizes need --pack")
+    elif args.ids:
         marker_ids = args.ids
     elif args.range:
         marker_ids = list(range(args.range[0], args.range[1] + 1))
@@ -316,57 +3984,416 @@ Available dictionaries:
         marker_ids = list(range(max_markers))  # All markers in dictionary
     
     # Validate marker IDs
-    if any(mid < 0 or mid >= max_markers for mid in marker_ids):
-        print(f"Error: Marker IDs must be between 0 and {max_markers-1} for {args.dictionary}")
+    check_marker_ids(marker_ids, args.dictionary)
+    
+    # Output format: explicit, else from the file extension
+    output_file = args.output
+    output_format = args.format
+    if output_format is None:
+        extension = os.path.splitext(output_file)[1].lower().lstrip('.')
+        extension = {'tif': 'tiff'}.get(extension, extension)
+        output_format = extension if extension in OUTPUT_FORMATS else 'pdf'
+    elif output_file == parser.get_default('output'):
+        output_file = f"aruco_markers.{output_format}"
+    if (args.max_pages or args.max_size) and output_format == 'pdf' and args.pdf_writer != 'native':
+        raise ValueError("--max-pages/--max-size need the native PDF writer")
+    if args.dpi <= 0:
+        raise ValueError(f"--dpi must be positive, got {args.dpi:g}")
+    if args.board and (args.pack or args.markers):
+        raise ValueError("--board cannot be combined with --pack or --markers")
+    if args.bed and (args.pack or args.board or args.optimize_travel or args.markers):
+        raise ValueError("--bed cannot be combined with --pack, --board, --optimize-travel or --markers")
+    if args.bed and output_format == 'pdf' and args.pdf_writer != 'native':
+        raise ValueError("--bed needs the native PDF writer")
+    if (args.board_shape or args.square) and not args.board:
+        raise ValueError("--board-shape and --square need --board")
+    
+    return dict(
+        marker_ids=marker_ids,
+        aruco_dict_name=args.dictionary,
+        output_file=output_file,
+        marker_size_mm=marker_size_mm,
+        border_mm=border_mm,
+        spacing_mm=args.spacing,
+        page_size=args.sheet or (A4 if args.page_size == 'A4' else letter),
+        markers_per_page=args.per_page,
+        nrows=args.nrows,
+        ncols=args.ncols,
+        show_labels=not args.no_labels,
+        label_mode=args.label_mode,
+        engrave_mode=args.engrave_mode,
+        jobs=args.jobs,
+        pdf_writer=args.pdf_writer,
+        output_format=output_format,
+        cut_mode=args.cut_mode,
+        optimize_travel=args.optimize_travel,
+        pack=args.pack,
+        margin_mm=args.margin,
+        max_pages=args.max_pages,
+        max_bytes=int(args.max_size * 1_000_000) if args.max_size else None,
+        cache=(OutputCache(args.cache_dir, int(args.cache_size * 1_000_000))
+               if args.cache or args.cache_dir else None),
+        dpi=args.dpi,
+        board=args.board,
+        board_shape=tuple(args.board_shape) if args.board_shape else None,
+        square_mm=args.square,
+        bed=args.bed,
+    )
+
+
+def parse_sheet_size(text):
+    """Parse a 'WxH' sheet size in millimeters into a page size in PDF points."""
+    try:
+        width, height = (float(v) for v in text.lower().replace('×', 'x').split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid sheet size '{text}', expected WxH in mm (e.g. 600x400)")
+    if width <= 0 or height <= 0:
+        raise argparse.ArgumentTypeError(f"invalid sheet size '{text}', both sides must be positive")
+    return (width * mm, height * mm)
+
+
+def load_marker_list(path, marker_size_mm=10.0, border_mm=0.5):
+    """
+    Read a marker list file for mixed-size jobs.
+    
+    Each line is 'ids[,size_mm[,border_mm]]' where ids is one ID or an
+    inclusive range like '0-49'. Blank lines, '#' comments and a header line
+    are ignored; missing sizes and borders use the given defaults.
+    
+    Args:
+        path (str): Marker list filename
+        marker_size_mm (float): Default marker size in millimeters
+        border_mm (float): Default border in millimeters
+    
+    Returns:
+        tuple: (marker_ids, sizes_mm, borders_mm) lists, one entry per marker
+    
+    Raises:
+        ValueError: If a line cannot be parsed
+    """
+    marker_ids, sizes, borders = [], [], []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            fields = [v.strip() for v in line.split('#')[0].split(',')]
+            if not fields[0]:
+                continue
+            try:
+                first, _, last = fields[0].partition('-')
+                ids = range(int(first), int(last or first) + 1)
+                size = float(fields[1]) if len(fields) > 1 and fields[1] else marker_size_mm
+                border = float(fields[2]) if len(fields) > 2 and fields[2] else border_mm
+            except ValueError:
+                if not marker_ids and line_no == 1:
+                    continue  # header
+                raise ValueError(f"{path}:{line_no}: expected 'ids,size,border', got '{line.strip()}'")
+            marker_ids.extend(ids)
+            sizes.extend([size] * len(ids))
+            borders.extend([border] * len(ids))
+    return marker_ids, sizes, borders
+
+
+def manifest_job_argv(job):
+    """
+    Convert one manifest job table into command-line arguments.
+    
+    Keys are long option names ('dict', 'per-page' or 'per_page', 'no-labels',
+    ...). True adds a flag, False/None leaves it out, lists expand to several
+    values. A job may instead give its arguments verbatim as 'args'. The
+    'name' key only labels the job in reports.
+    """
+    if 'args' in job:
+        return [str(arg) for arg in job['args']]
+    argv = []
+    for key, value in job.items():
+        if key == 'name' or value is None or value is False:
+            continue
+        argv.append('--' + key.replace('_', '-'))
+        if value is True:
+            continue
+        argv.extend(str(v) for v in value) if isinstance(value, (list, tuple)) else argv.append(str(value))
+    return argv
+
+
+def load_manifest(path):
+    """
+    Read a batch manifest (TOML or JSON) into a list of job tables.
+    
+    The manifest holds a list of 'job' tables ([[job]] in TOML, a "job" array
+    in JSON) and an optional 'defaults' table merged into every job.
+    """
+    if path.lower().endswith('.json'):
+        import json
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    else:
+        try:
+            import tomllib
+        except ImportError:
+            try:
+                import tomli as tomllib
+            except ImportError:
+                raise RuntimeError("TOML manifests need Python 3.11+ or tomli (pip install tomli); "
+                                   "JSON manifests work everywhere")
+        with open(path, 'rb') as f:
+            manifest = tomllib.load(f)
+    
+    defaults = manifest.get('defaults', {})
+    return [dict(defaults, **job) for job in manifest.get('job', manifest.get('jobs', []))]
+
+
+def _run_batch_job(task):
+    """Run one batch job and return (name, output, seconds, error)."""
+    name, argv = task
+    start = time.perf_counter()
+    parser = build_parser()
+    try:
+        try:
+            args = parser.parse_args(argv)
+        except SystemExit:
+            raise ValueError(f"invalid arguments: {' '.join(argv)}")
+        job = resolve_job(args, parser)
+        generate_aruco_laser_pdf(verbose=False, **job)
+        return name, job['output_file'], time.perf_counter() - start, None
+    except Exception as e:
+        return name, None, time.perf_counter() - start, f"{type(e).__name__}: {e}"
+
+
+def run_batch(jobs, workers=1):
+    """
+    Run many generation jobs in one process, or in a pool of worker processes.
+    
+    Dictionaries are decoded once in the parent before the pool starts, so
+    workers share the marker bitmaps instead of loading them per job.
+    
+    Args:
+        jobs (list): Job tables (see manifest_job_argv) or command-line argument lists
+        workers (int): Worker processes (1 = run in this process, 0 = one per CPU)
+    
+    Returns:
+        list: One (name, output_file, seconds, error) tuple per job, in order;
+            error is None on success
+    """
+    tasks = []
+    for index, job in enumerate(jobs, 1):
+        if isinstance(job, dict):
+            tasks.append((job.get('name', f"job {index}"), manifest_job_argv(job)))
+        else:
+            tasks.append((f"job {index}", [str(arg) for arg in job]))
+    
+    # Decode every dictionary the jobs use up front; forked workers inherit them
+    for _, argv in tasks:
+        name = next((argv[k + 1] for k in range(len(argv) - 1) if argv[k] in ('--dict', '--dictionary', '--from')),
+                    '4X4_50')
+        if name in ARUCO_DICTS:
+            load_marker_images(name)
+    
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) <= 1:
+        return [_run_batch_job(task) for task in tasks]
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_run_batch_job, tasks))
+
+
+def batch_main(argv):
+    """Command-line entry point for 'batch': run every job of a manifest."""
+    parser = argparse.ArgumentParser(
+        prog='aruco-laser batch',
+        description='Run every job of a TOML/JSON manifest in one process')
+    parser.add_argument('manifest', help='Manifest file (.toml or .json)')
+    parser.add_argument('-j', '--jobs',
+                        type=int,
+                        default=1,
+                        help='Worker processes (default: 1, 0 = one per CPU)')
+    args = parser.parse_args(argv)
+    
+    try:
+        jobs = load_manifest(args.manifest)
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"Error: {e}")
         return 1
     
-    # Set page size
-    page_size = A4 if args.page_size == 'A4' else letter
+    print(f"\nRunning {len(jobs)} jobs from {args.manifest}")
+    print(f"{'='*50}")
+    start = time.perf_counter()
+    results = run_batch(jobs, workers=args.jobs)
+    for name, output_file, seconds, error in results:
+        if error is None:
+            print(f"  ✓ {name:<32} {seconds * 1000:8.1f} ms  {output_file}")
+        else:
+            print(f"  ✗ {name:<32} {seconds * 1000:8.1f} ms  {error}")
+    
+    failed = sum(1 for result in results if result[3] is not None)
+    print(f"{'='*50}")
+    print(f"{len(results) - failed}/{len(results)} jobs succeeded in {time.perf_counter() - start:.2f}s")
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] == 'batch':
+        return batch_main(argv[1:])
+    if argv and argv[0] == 'serve':
+        return _server.serve_main(argv[1:])
+    
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    stdout = sys.stdout
+    if args.metrics_json == '-':
+        # Standard output then carries the JSON document only; the report goes to stderr
+        with contextlib.redirect_stdout(sys.stderr):
+            return _generate_main(args, parser, stdout)
+    return _generate_main(args, parser, stdout)
+
+
+def _generate_main(args, parser, stdout):
+    """The generate command of main(); --metrics-json - writes to stdout."""
+    try:
+        job = resolve_job(args, parser)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    marker_ids = job['marker_ids']
+    squares = None
+    if args.board:
+        board_shape = job['board_shape'] or _boards.fit_board_shape(
+            args.board, job['page_size'], args.size, args.spacing, args.square, args.margin, not args.no_labels)
+        try:
+            layout, squares, outline = _boards.compute_board(args.board, marker_ids, *board_shape,
+                                                             job['page_size'], args.size, args.spacing,
+                                                             args.square, args.margin, not args.no_labels)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 1
+        marker_ids = layout['id'].tolist()
     
     # Print generation info
     print(f"\nGenerating ArUco Markers")
     print(f"{'='*50}")
     print(f"Dictionary:       {args.dictionary}")
     print(f"Marker count:     {len(marker_ids)}")
-    print(f"Marker size:      {args.size}mm × {args.size}mm")
-    print(f"Border:           {args.border}mm")
+    if args.select is not None and len(marker_ids) > 1:
+        first = _selection.min_marker_distance(args.dictionary, range(len(marker_ids)))
+        print(f"Selection:        most distinct, min distance "
+              f"{_selection.min_marker_distance(args.dictionary, marker_ids)} bits over all rotations "
+              f"(IDs 0-{len(marker_ids) - 1}: {first})")
+    sizes = np.atleast_1d(job['marker_size_mm'])
+    borders = np.atleast_1d(0 if args.board else job['border_mm'])
+    if len(sizes) > 1:
+        print(f"Marker size:      mixed, {sizes.min():g}mm to {sizes.max():g}mm")
+    else:
+        print(f"Marker size:      {sizes[0]:g}mm × {sizes[0]:g}mm")
+    print(f"Border:           {borders.min():g}mm" + (f" to {borders.max():g}mm" if len(borders) > 1 else ""))
     print(f"Spacing:          {args.spacing}mm")
-    print(f"Page size:        {args.page_size}")
-    if args.nrows is not None and args.ncols is not None:
-        print(f"Layout:           {args.nrows} rows × {args.ncols} cols ({args.nrows * args.ncols} markers per page)")
-    elif args.nrows is not None:
-        ncols = args.per_page // args.nrows
-        print(f"Layout:           {args.nrows} rows × {ncols} cols ({args.nrows * ncols} markers per page)")
-    elif args.ncols is not None:
-        nrows = args.per_page // args.ncols
-        print(f"Layout:           {nrows} rows × {args.ncols} cols ({nrows * args.ncols} markers per page)")
+    if args.sheet:
+        print(f"Page size:        {args.sheet[0] / mm:g} × {args.sheet[1] / mm:g} mm sheet")
+    else:
+        print(f"Page size:        {args.page_size}")
+    if args.board:
+        label = _boards.format_board_label(args.board, args.dictionary, *board_shape, args.size,
+                                           args.spacing, args.square)
+        print(f"Layout:           {label}")
+    elif args.bed:
+        cols, rows, _, _ = bed_grid(job['page_size'], args.size, args.border, args.spacing, args.margin,
+                                    not args.no_labels)
+        if len(marker_ids) > cols * rows:
+            print(f"Error: {_bed_full_error(job['page_size'], cols, rows)}")
+            return 1
+        # Placed tile by tile while drawing; the whole layout is only built for --verify
+        layout = None
+        n_pages = 1
+        print(f"Layout:           one sheet, {cols} cols × up to {rows} rows from a {args.margin:g}mm margin")
+    elif args.pack:
+        try:
+            layout = pack_layout(marker_ids, page_size=job['page_size'], marker_size_mm=job['marker_size_mm'],
+                                 border_mm=job['border_mm'], spacing_mm=args.spacing,
+                                 margin_mm=args.margin, show_labels=not args.no_labels)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 1
+        print(f"Layout:           packed, {args.margin:g}mm sheet margin")
     else:
-        print(f"Markers per page: {args.per_page}")
-    print(f"Show labels:      {'No' if args.no_labels else 'Yes'}")
-    print(f"Output:           {args.output}")
+        rows, cols = resolve_grid(args.per_page, args.nrows, args.ncols)
+        layout = compute_layout(marker_ids, page_size=job['page_size'], marker_size_mm=job['marker_size_mm'],
+                                border_mm=job['border_mm'], spacing_mm=args.spacing,
+                                markers_per_page=args.per_page, nrows=args.nrows, ncols=args.ncols)
+        print(f"Layout:           {rows} rows × {cols} cols ({rows * cols} markers per page)")
+    if layout is not None:
+        n_pages = int(layout['page'][-1]) + 1 if len(layout) else 0
+    print(f"Pages:            {n_pages}")
+    print(f"Show labels:      {'No' if args.no_labels else 'Yes' if args.label_mode == 'text' else 'Yes (paths)'}")
+    print(f"Engrave mode:     {args.engrave_mode}")
+    print(f"Cut mode:         {args.cut_mode}")
+    print(f"Optimize travel:  {'Yes' if args.optimize_travel else 'No'}")
+    if job['output_format'] in RASTER_FORMATS:
+        print(f"Output:           {job['output_file']} ({job['output_format'].upper()}, {args.dpi:g} dpi)")
+    else:
+        print(f"Output:           {job['output_file']} ({job['output_format'].upper()})")
     if len(marker_ids) <= 20:
         print(f"IDs:              {marker_ids}")
     else:
         print(f"IDs:              {marker_ids[:10]}...{marker_ids[-10:]}")
     print(f"{'='*50}\n")
     
+    if args.verify is not None and args.verify <= 0:
+        print("Error: --verify resolution must be positive")
+        return 1
+    
     # Generate PDF
-    generate_aruco_laser_pdf(
-        marker_ids=marker_ids,
-        aruco_dict_name=args.dictionary,
-        output_file=args.output,
-        marker_size_mm=args.size,
-        border_mm=args.border,
-        spacing_mm=args.spacing,
-        page_size=page_size,
-        markers_per_page=args.per_page,
-        nrows=args.nrows,
-        ncols=args.ncols,
-        show_labels=not args.no_labels
-    )
+    profiled = args.profile or args.metrics_json
+    report = None
+    with (profiling() if profiled else contextlib.nullcontext()) as profiler:
+        generate_aruco_laser_pdf(**job)
+        if args.verify is not None:
+            # Read the written pages back where the format allows, else check
+            # the geometry the drawing code emits for these options
+            if layout is None:
+                layout = np.concatenate([compute_layout([])] + list(iter_bed_tiles(
+                    marker_ids, job['page_size'], args.size, args.border, args.spacing, args.margin,
+                    not args.no_labels)))
+            sources = _verify.output_page_sources(job['output_file'], job['output_format'], max(n_pages, 1),
+                                                  split=bool(job['max_pages'] or job['max_bytes']))
+            if args.board:
+                drawing = ('board', dict(squares=squares, outline=outline, marker_size_mm=args.size,
+                                         engrave_mode=args.engrave_mode,
+                                         optimize_travel=args.optimize_travel))
+            else:
+                options = dict(marker_size_mm=job['marker_size_mm'], border_mm=job['border_mm'],
+                               show_labels=job['show_labels'], engrave_mode=args.engrave_mode,
+                               cut_mode=args.cut_mode, label_mode=args.label_mode)
+                if args.bed:
+                    drawing = ('bed', options)
+                else:
+                    drawing = ('layout', dict(options, optimize_travel=args.optimize_travel))
+            dpi = job['dpi'] if job['output_format'] in RASTER_FORMATS else args.verify
+            try:
+                report = _verify.verify_layout(layout, args.dictionary, job['marker_size_mm'],
+                                               0 if args.board else job['border_mm'], job['page_size'],
+                                               dpi=dpi, workers=0, drawing=drawing, sources=sources)
+            except RuntimeError as e:
+                print(f"Error: {e}")
+                return 1
+            print(_verify.format_verify_report(report))
+    if args.profile:
+        print(format_profile_report(profiler))
+    if args.metrics_json:
+        import json
+        metrics = dict(profiler.as_dict(), tool_version=__version__, dictionary=args.dictionary,
+                       markers=len(marker_ids), output=job['output_file'],
+                       output_format=job['output_format'])
+        if report is not None:
+            metrics['verify'] = dict(report, problems=[list(p) for p in report['problems']])
+        if args.metrics_json == '-':
+            print(json.dumps(metrics, indent=2), file=stdout)
+        else:
+            with open(args.metrics_json, 'w', encoding='utf-8') as f:
+                json.dump(metrics, f, indent=2)
+                f.write('\n')
     
-    return 0
+    return 1 if report is not None and report['problems'] else 0
 
 
 if __name__ == "__main__":
+    # The split-off modules import this file by name; let them share this copy
+    sys.modules.setdefault('generate_aruco_laser', sys.modules[__name__])
     exit(main())
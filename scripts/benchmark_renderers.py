@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Compare the native PDF writer against the ReportLab backend.
+Renders the same layouts with both writers and reports wall time,
+peak Python memory and output size for each.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import generate_aruco_laser as gal
+
+# (description, dictionary, marker count, layout options, render options)
+workloads = [
+    ("4X4_50, 10mm, labels", "4X4_50", 50,
+     dict(marker_size_mm=10, spacing_mm=15, markers_per_page=25),
+     dict(marker_size_mm=10, show_labels=True)),
+    ("4X4_50, 3mm dense", "4X4_50", 50,
+     dict(marker_size_mm=3, spacing_mm=2, markers_per_page=50),
+     dict(marker_size_mm=3, show_labels=False)),
+    ("7X7_1000, cells", "7X7_1000", 1000,
+     dict(marker_size_mm=10, spacing_mm=15, markers_per_page=25),
+     dict(marker_size_mm=10, show_labels=False)),
+    ("7X7_1000, polygons", "7X7_1000", 1000,
+     dict(marker_size_mm=10, spacing_mm=15, markers_per_page=25),
+     dict(marker_size_mm=10, show_labels=False, engrave_mode="polygons")),
+    ("4X4_1000, labels", "4X4_1000", 1000,
+     dict(marker_size_mm=10, spacing_mm=15, markers_per_page=25),
+     dict(marker_size_mm=10, show_labels=True)),
+]
+
+
+def run(dict_name, count, layout_options, render_options, writer, output_file, repeats=3):
+    """Render one workload and return (best seconds, peak bytes, file size)."""
+    layout = gal.compute_layout(list(range(count)), **layout_options)
+
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        gal.render_layout_file(layout, output_file, aruco_dict_name=dict_name,
+                              pdf_writer=writer, **render_options)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    gal.render_layout_file(layout, output_file, aruco_dict_name=dict_name,
+                          pdf_writer=writer, **render_options)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak, os.path.getsize(output_file)
+
+
+def main():
+    # Warm the dictionary cache so it is not part of the measurement
+    for _, dict_name, _, _, _ in workloads:
+        gal.load_marker_images(dict_name)
+
+    print(f"{'Workload':<24} {'Writer':<10} {'Time (ms)':>10} {'Peak (KB)':>10} {'Size (KB)':>10}")
+    print("=" * 68)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_file = os.path.join(tmp_dir, "bench.pdf")
+        for desc, dict_name, count, layout_options, render_options in workloads:
+            results = {}
+            for writer in gal.PDF_WRITERS:
+                results[writer] = run(dict_name, count, layout_options, render_options,
+                                      writer, output_file)
+                seconds, peak, size = results[writer]
+                print(f"{desc:<24} {writer:<10} {seconds * 1000:>10.1f} {peak / 1024:>10.0f} {size / 1024:>10.1f}")
+            speedup = results["reportlab"][0] / results["native"][0]
+            print(f"{'':<24} {'speedup':<10} {speedup:>9.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
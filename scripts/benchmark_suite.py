@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Benchmark the example matrix and stress cases against a stored baseline.
+
+Runs the 25 configurations of generate_examples.py plus large stress jobs
+(every marker of each 1000-marker dictionary) and records, per case, the
+fastest wall time, peak RSS, PDF operator count and output bytes. Results are
+compared with scripts/benchmark_baseline.json; any metric over its threshold
+fails the run.
+
+    python scripts/benchmark_suite.py                    # compare with the baseline
+    python scripts/benchmark_suite.py --update-baseline  # record a new baseline
+    python scripts/benchmark_suite.py -k 7X7 --repeats 5
+
+Each case runs in a forked copy of this process (where available), so the
+interpreter, NumPy and the dictionaries are already loaded and the peak RSS
+belongs to that case alone. Timings depend on the machine: record the
+baseline on the machine that runs the comparison.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import sys
+import tempfile
+import time
+import zlib
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import generate_aruco_laser as gal
+from generate_examples import examples
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+
+# Large jobs on top of the examples: (name, command-line arguments)
+stress_cases = [
+    (f"stress_{n}x{n}_1000", ["--dict", f"{n}X{n}_1000", "-s", "10", "--spacing", "5", "-p", "100"])
+    for n in (4, 5, 6, 7)
+] + [
+    ("stress_7x7_1000_labels_polygons", ["--dict", "7X7_1000", "-s", "10", "--spacing", "5", "-p", "100",
+                                         "--engrave-mode", "polygons"]),
+    ("stress_4x4_1000_dense_merged_cuts", ["--dict", "4X4_1000", "-s", "3", "--spacing", "0", "-p", "400",
+                                           "--no-labels", "--cut-mode", "merged"]),
+]
+
+# Metric -> (label, format)
+METRICS = {
+    "time_ms": ("Time (ms)", "{:.1f}"),
+    "peak_rss_mb": ("RSS (MB)", "{:.1f}"),
+    "operators": ("Ops", "{:d}"),
+    "bytes": ("Bytes", "{:d}"),
+}
+
+_STREAM = re.compile(rb"stream\r?\n(.*?)\r?\nendstream", re.S)
+_STRING = re.compile(rb"\((?:\\.|[^\\)])*\)")
+_OPERATOR = re.compile(rb"^[A-Za-z'\"][A-Za-z*'\"]*$")
+
+
+def all_cases():
+    """Every benchmark case as (name, command-line arguments without -o)."""
+    cases = []
+    for example in examples:
+        args = list(example["args"])
+        k = args.index("-o")
+        del args[k:k + 2]
+        cases.append((os.path.splitext(example["name"])[0], args))
+    return cases + stress_cases
+
+
+def count_pdf_operators(path):
+    """Number of content-stream operators in a PDF (Flate-compressed or plain streams)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    count = 0
+    for match in _STREAM.finditer(data):
+        stream = match.group(1)
+        try:
+            stream = zlib.decompress(stream)
+        except zlib.error:
+            pass
+        count += sum(1 for token in _STRING.sub(b" ", stream).split() if _OPERATOR.match(token))
+    return count
+
+
+def run_case(args, repeats):
+    """Run one case repeats times and return its metrics."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_file = os.path.join(tmp_dir, "bench.pdf")
+        parser = gal.build_parser()
+        job = gal.resolve_job(parser.parse_args(args + ["-o", output_file]), parser)
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            gal.generate_aruco_laser_pdf(verbose=False, **job)
+            times.append(time.perf_counter() - start)
+        outputs = [os.path.join(tmp_dir, name) for name in sorted(os.listdir(tmp_dir))]
+        rss = gal.peak_rss_mb()
+        return {
+            "time_ms": round(min(times) * 1000, 2),
+            "peak_rss_mb": None if rss is None else round(rss, 1),
+            "operators": sum(count_pdf_operators(path) for path in outputs),
+            "bytes": sum(os.path.getsize(path) for path in outputs),
+        }
+
+
+def _run_case_in_child(args, repeats, conn):
+    try:
+        conn.send(("ok", run_case(args, repeats)))
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+    conn.close()
+
+
+def measure(args, repeats):
+    """Run a case in a forked child so its peak RSS is its own."""
+    if "fork" not in multiprocessing.get_all_start_methods():
+        return run_case(args, repeats)
+    ctx = multiprocessing.get_context("fork")
+    parent_conn, child_conn = ctx.Pipe(duplex=False)
+    child = ctx.Process(target=_run_case_in_child, args=(args, repeats, child_conn))
+    child.start()
+    child_conn.close()
+    status, result = parent_conn.recv()
+    child.join()
+    if status != "ok":
+        raise RuntimeError(result)
+    return result
+
+
+def compare(name, current, baseline, thresholds, min_time_ms):
+    """List of 'metric +x%' strings for metrics over their threshold."""
+    regressions = []
+    for metric, limit in thresholds.items():
+        if metric not in baseline:
+            continue
+        base, value = baseline[metric], current[metric]
+        if base is None or value is None:
+            # Not measurable on this platform (peak RSS without the resource module)
+            continue
+        allowed = base * (1 + limit)
+        if metric == "time_ms":
+            allowed = max(allowed, base + min_time_ms)
+        if value > allowed:
+            change = (value / base - 1) * 100 if base else float("inf")
+            regressions.append(f"{metric} +{change:.0f}%")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the example matrix against a stored baseline")
+    parser.add_argument("-k", "--filter", default="", help="Only run cases whose name contains this text")
+    parser.add_argument("--repeats", type=int, default=5,
+                        help="Timed runs per case, the fastest is kept (default: 5)")
+    parser.add_argument("--no-stress", action="store_true", help="Skip the large stress cases")
+    parser.add_argument("--baseline", default=BASELINE, help="Baseline file (default: %(default)s)")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Write the results as the new baseline instead of comparing")
+    parser.add_argument("--time-threshold", type=float, default=0.30,
+                        help="Allowed relative wall-time increase (default: 0.30)")
+    parser.add_argument("--min-time-ms", type=float, default=5.0,
+                        help="Ignore wall-time increases smaller than this (default: 5)")
+    parser.add_argument("--rss-threshold", type=float, default=0.20,
+                        help="Allowed relative peak RSS increase (default: 0.20)")
+    parser.add_argument("--ops-threshold", type=float, default=0.0,
+                        help="Allowed relative PDF operator count increase (default: 0)")
+    parser.add_argument("--bytes-threshold", type=float, default=0.02,
+                        help="Allowed relative output size increase (default: 0.02)")
+    args = parser.parse_args()
+
+    thresholds = {"time_ms": args.time_threshold, "peak_rss_mb": args.rss_threshold,
+                  "operators": args.ops_threshold, "bytes": args.bytes_threshold}
+    cases = [(name, case_args) for name, case_args in all_cases()
+             if args.filter in name and not (args.no_stress and name.startswith("stress_"))]
+
+    baseline = {}
+    if not args.update_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["cases"]
+
+    # Load everything the children share before forking
+    for dict_name in gal.ARUCO_DICTS:
+        gal.load_marker_images(dict_name)
+
+    header = f"{'Case':<36}" + "".join(f"{label:>11}" for label, _ in METRICS.values())
+    print(header)
+    print("=" * len(header))
+    results, failed = {}, []
+    for name, case_args in cases:
+        try:
+            results[name] = current = measure(case_args, args.repeats)
+        except Exception as e:
+            print(f"{name:<36} ✗ {e}")
+            failed.append(name)
+            continue
+        row = f"{name:<36}" + "".join(f"{'n/a' if current[m] is None else fmt.format(current[m]):>11}"
+                                      for m, (_, fmt) in METRICS.items())
+        if name in baseline:
+            regressions = compare(name, current, baseline[name], thresholds, args.min_time_ms)
+            if regressions:
+                failed.append(name)
+                row += "  ✗ " + ", ".join(regressions)
+            else:
+                row += "  ✓"
+        print(row)
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"tool_version": gal.__version__, "python": sys.version.split()[0],
+                       "cases": results}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\n✓ Baseline written to {args.baseline} ({len(results)} cases)")
+        return 1 if failed else 0
+
+    if failed:
+        print(f"\n✗ {len(failed)} of {len(cases)} cases regressed or failed: {', '.join(failed)}")
+        return 1
+    if not baseline:
+        print(f"\nNo baseline at {args.baseline}; record one with --update-baseline")
+        return 0
+    print(f"\n✓ {len(cases)} cases within thresholds of the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Build or verify the vendored ArUco dictionary tables (aruco_dict_data.py).
+Requires OpenCV (pip install opencv-python).
+
+    python scripts/build_dictionary_data.py          # regenerate aruco_dict_data.py
+    python scripts/build_dictionary_data.py --check  # verify it bit-for-bit against OpenCV
+
+Every predefined dictionary is a prefix of the 1000-marker dictionary with
+the same marker size, so only the four 1000-marker tables are stored.
+"""
+
+import argparse
+import base64
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+import cv2
+import numpy as np
+
+import generate_aruco_laser as gal
+
+OUTPUT = os.path.join(ROOT, "aruco_dict_data.py")
+MARKER_SIZES = (4, 5, 6, 7)
+
+
+def build():
+    """Write aruco_dict_data.py from OpenCV's predefined dictionaries."""
+    lines = [
+        '"""',
+        "Predefined ArUco dictionaries, bit-packed.",
+        "",
+        f"Generated by scripts/build_dictionary_data.py from OpenCV {cv2.__version__}; do not edit.",
+        "",
+        "DICTIONARIES maps the marker size n to (marker count, base64 data). The data",
+        "holds the inner bits of every marker of the nXn_1000 dictionary, row by row",
+        "with 1 = white, packed MSB first into one continuous bit stream. Smaller",
+        "dictionaries of the same marker size are prefixes of it.",
+        '"""',
+        "",
+        "DICTIONARIES = {",
+    ]
+    for n in MARKER_SIZES:
+        bits = gal.load_dictionary_bits(f"{n}X{n}_1000", use_cache=False, source="opencv")
+        encoded = base64.b64encode(np.packbits(bits.reshape(-1)).tobytes()).decode("ascii")
+        lines.append(f"    {n}: ({len(bits)}, (")
+        lines.extend(f"        '{encoded[k:k + 76]}'" for k in range(0, len(encoded), 76))
+        lines.append("    )),")
+    lines.append("}")
+
+    with open(OUTPUT, "w", encoding="utf-8", newline="\n") as f:
+        f.write("\n".join(lines) + "\n")
+    print(f"✓ Wrote {OUTPUT}")
+
+
+def check():
+    """Compare every vendored dictionary with OpenCV, bit for bit."""
+    failed = []
+    for name, (dict_id, count) in gal.ARUCO_DICTS.items():
+        vendored = gal.load_dictionary_bits(name, source="vendored")
+        reference = gal.load_dictionary_bits(name, use_cache=False, source="opencv")
+        ok = vendored.shape == reference.shape and np.array_equal(vendored, reference)
+
+        # The rendered grids must match generateImageMarker too
+        aruco_dict = cv2.aruco.getPredefinedDictionary(dict_id)
+        grid_size = vendored.shape[1] + 2
+        images = gal.load_marker_images(name)
+        for marker_id in range(count):
+            if not np.array_equal(images[marker_id],
+                                  cv2.aruco.generateImageMarker(aruco_dict, marker_id, grid_size)):
+                ok = False
+                break
+
+        print(f"  {'✓' if ok else '✗'} {name:<9} {count:>5} markers")
+        if not ok:
+            failed.append(name)
+
+    if failed:
+        print(f"\n✗ {len(failed)} dictionaries differ from OpenCV {cv2.__version__}: {', '.join(failed)}")
+        return 1
+    print(f"\n✓ All {len(gal.ARUCO_DICTS)} dictionaries match OpenCV {cv2.__version__}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or verify aruco_dict_data.py")
+    parser.add_argument("--check", action="store_true",
+                        help="Verify the vendored tables against OpenCV instead of rebuilding")
+    args = parser.parse_args()
+    if args.check:
+        return check()
+    build()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
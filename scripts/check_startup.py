@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Check the CLI startup budget.
+Times --help, an ID-range error and a bare import in fresh interpreters,
+and fails if any of them is over budget or pulls in NumPy, OpenCV or
+ReportLab before rendering starts.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+HEAVY_MODULES = ("numpy", "cv2", "reportlab")
+
+
+def entry_point(*cli_args):
+    """Interpreter arguments that run the CLI the way the aruco-laser console script does."""
+    return ["-c", "import sys, generate_aruco_laser as g; sys.argv[0] = 'aruco-laser'; "
+                  f"sys.exit(g.main({list(cli_args)!r}))"]
+
+
+# (description, interpreter arguments)
+cases = [
+    ("python -c pass (interpreter only)", ["-c", "pass"]),
+    ("aruco-laser --help", entry_point("--help")),
+    ("aruco-laser ID out of range", entry_point("--dict", "4X4_50", "-r", "0", "99")),
+    ("import generate_aruco_laser", ["-c", "import generate_aruco_laser"]),
+]
+
+
+# Measure with bytecode caching on, as for an installed package
+ENV = {k: v for k, v in os.environ.items() if k != "PYTHONDONTWRITEBYTECODE"}
+
+
+def time_case(args, runs):
+    """Median wall time in milliseconds of running the interpreter with args."""
+    # One untimed run so the bytecode cache is warm
+    subprocess.run([sys.executable] + args, cwd=ROOT, env=ENV,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=ROOT, env=ENV,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def heavy_imports():
+    """Heavy modules loaded by importing the generator and parsing a job."""
+    code = ("import sys, generate_aruco_laser as g; "
+            "g.resolve_job(g.build_parser().parse_args(['-r', '0', '9'])); "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=ENV,
+                            capture_output=True, text=True, check=True)
+    return [m for m in result.stdout.strip().split(",") if m]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the CLI startup budget")
+    parser.add_argument("--runs", type=int, default=7, help="Runs per case (default: 7)")
+    parser.add_argument("--budget-ms", type=float, default=60.0,
+                        help="Allowed time on top of a bare interpreter start (default: 60)")
+    args = parser.parse_args()
+
+    results = [(desc, time_case(case_args, args.runs)) for desc, case_args in cases]
+    baseline = results[0][1]
+
+    print(f"{'Case':<36} {'Median (ms)':>12} {'Over python (ms)':>17}")
+    print("=" * 67)
+    failed = False
+    for desc, ms in results:
+        over = ms - baseline
+        flag = ""
+        if desc != cases[0][0] and over > args.budget_ms:
+            flag = "  ✗ over budget"
+            failed = True
+        print(f"{desc:<36} {ms:>12.1f} {over:>17.1f}{flag}")
+
+    loaded = heavy_imports()
+    if loaded:
+        print(f"\n✗ Heavy modules imported before rendering: {', '.join(loaded)}")
+        failed = True
+
+    if failed:
+        return 1
+    print(f"\n✓ Startup within budget ({args.budget_ms:.0f} ms over a bare interpreter)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
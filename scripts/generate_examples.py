@@ -3,14 +3,19 @@
 Script to generate all example PDFs for the repository.
 Run this to regenerate all example files with clean, systematic names.
 Each example demonstrates different parameters and use cases.
+
+All examples are rendered in this process through the batch runner, so
+the interpreter, NumPy and the marker dictionaries are loaded only once.
+Pass -j N to spread the examples over N worker processes.
 """
 
-import subprocess
+import argparse
 import sys
 import os
 
-# Ensure examples directory exists
-os.makedirs("examples", exist_ok=True)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from generate_aruco_laser import run_batch
 
 # Define all examples to generate - comprehensive coverage of all parameters
 examples = [
@@ -185,39 +190,34 @@ examples = [
 ]
 
 def main():
+    parser = argparse.ArgumentParser(description="Regenerate the example PDFs")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="Worker processes (default: 1, 0 = one per CPU)")
+    args = parser.parse_args()
+    
+    # Ensure examples directory exists
+    os.makedirs("examples", exist_ok=True)
+    
     print("Generating comprehensive example PDFs...")
     print("=" * 70)
     print(f"Total examples to generate: {len(examples)}")
     print("=" * 70)
     
+    jobs = [{"name": example["name"], "args": example["args"]} for example in examples]
+    results = run_batch(jobs, workers=args.jobs)
+    
     success_count = 0
     failed = []
     
-    for i, example in enumerate(examples, 1):
+    for i, (example, (name, output, seconds, error)) in enumerate(zip(examples, results), 1):
         print(f"\n[{i}/{len(examples)}] Generating {example['name']}...")
         print(f"  Description: {example['desc']}")
-        
-        # Try with uv run first, fall back to python
-        cmd = ["uv", "run", "generate_aruco_laser.py"] + example["args"]
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            print(f"  ✓ Success")
+        if error is None:
+            print(f"  ✓ Success ({seconds * 1000:.1f} ms)")
             success_count += 1
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            # Fall back to python
-            cmd = ["python", "generate_aruco_laser.py"] + example["args"]
-            try:
-                result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-                print(f"  ✓ Success")
-                success_count += 1
-            except subprocess.CalledProcessError as e:
-                print(f"  ✗ Failed: {e}")
-                if e.stderr:
-                    print(f"    Error: {e.stderr[:200]}")
-                failed.append(example['name'])
-            except FileNotFoundError:
-                print(f"  ✗ Failed: Python not found. Please install dependencies first.")
-                failed.append(example['name'])
+        else:
+            print(f"  ✗ Failed: {error}")
+            failed.append(example['name'])
     
     print("\n" + "=" * 70)
     print(f"Generation complete: {success_count}/{len(examples)} successful")
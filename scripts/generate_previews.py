@@ -1,84 +1,143 @@
 #!/usr/bin/env python3
 """
-Generate preview images from example PDFs.
-Requires: pdf2image (pip install pdf2image) and poppler-utils
+Generate preview images of the example sheets.
+
+Previews are rendered straight from each example's layout and the marker
+bit grids (render_page_preview), so no PDF is read back and neither
+pdf2image nor poppler is needed. The first page of each example is drawn
+in the PDF's layer colours, anti-aliased and scaled to fit --max-size.
+
+Regeneration is incremental: a manifest in the output directory records
+the job parameters and tool fingerprint (source hash) each preview was
+made from, and only previews whose example or drawing code changed (or
+whose file is missing) are rendered again, spread over worker processes.
+
+    python scripts/generate_previews.py               # stale previews only
+    python scripts/generate_previews.py --force -j 4  # every preview, 4 workers
 """
 
+import argparse
+import hashlib
+import json
 import os
-from pathlib import Path
-
-try:
-    from pdf2image import convert_from_path
-    PDF2IMAGE_AVAILABLE = True
-except ImportError:
-    PDF2IMAGE_AVAILABLE = False
-    print("Warning: pdf2image not available. Install with: pip install pdf2image")
-    print("Also requires poppler-utils: brew install poppler (macOS) or apt-get install poppler-utils (Linux)")
-
-def generate_preview(pdf_path, output_dir="examples/previews", dpi=150, max_size=(800, 600)):
-    """Generate a preview image from a PDF file."""
-    if not PDF2IMAGE_AVAILABLE:
-        return None
-    
-    os.makedirs(output_dir, exist_ok=True)
-    
-    pdf_name = Path(pdf_path).stem
-    output_path = os.path.join(output_dir, f"{pdf_name}_preview.png")
-    
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import generate_aruco_laser as gal
+from generate_examples import examples
+
+MANIFEST = "previews.json"
+
+
+def example_job(example):
+    """The generate_aruco_laser_pdf() arguments of an example."""
+    parser = gal.build_parser()
+    return gal.resolve_job(parser.parse_args(example["args"]), parser)
+
+
+def preview_key(job, max_size):
+    """Digest of everything a preview depends on: the job's parameters and the drawing code."""
+    params = {k: v for k, v in job.items() if k not in ("output_file", "jobs", "cache", "verbose")}
+    params.update(max_size=list(max_size), tool=gal.tool_fingerprint())
+    return hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def first_page_layout(job):
+    """Layout rows of the first page of a grid or packed job."""
+    if job["board"] is not None or job["bed"]:
+        raise ValueError("previews cover grid and packed jobs")
+    if job["pack"]:
+        layout = gal.pack_layout(job["marker_ids"], page_size=job["page_size"],
+                                 marker_size_mm=job["marker_size_mm"], border_mm=job["border_mm"],
+                                 spacing_mm=job["spacing_mm"], margin_mm=job["margin_mm"],
+                                 show_labels=job["show_labels"])
+    else:
+        layout = gal.compute_layout(job["marker_ids"], page_size=job["page_size"],
+                                    marker_size_mm=job["marker_size_mm"], border_mm=job["border_mm"],
+                                    spacing_mm=job["spacing_mm"], markers_per_page=job["markers_per_page"],
+                                    nrows=job["nrows"], ncols=job["ncols"])
+    return layout[layout["page"] == 0]
+
+
+def generate_preview(task):
+    """Worker entry point: render one preview PNG; returns (path, error or None)."""
+    example, output_path, max_size, max_dpi = task
     try:
-        # Convert first page of PDF to image
-        images = convert_from_path(pdf_path, dpi=dpi, first_page=1, last_page=1)
-        
-        if images:
-            img = images[0]
-            
-            # Resize if too large
-            if img.width > max_size[0] or img.height > max_size[1]:
-                img.thumbnail(max_size, resample=3)  # 3 = LANCZOS
-            
-            img.save(output_path, "PNG", optimize=True)
-            print(f"  ✓ Generated: {output_path}")
-            return output_path
+        job = example_job(example)
+        page_size = job["page_size"]
+        # Largest resolution that fits max_size, as a thumbnail of a max_dpi render would
+        dpi = min(max_size[0] / page_size[0] * 72, max_size[1] / page_size[1] * 72, max_dpi)
+        image = gal.render_page_preview(first_page_layout(job), job["aruco_dict_name"],
+                                        job["marker_size_mm"], job["border_mm"], page_size, dpi,
+                                        job["show_labels"])
+        gal.write_png_rgb(output_path, image, dpi)
+        return output_path, None
     except Exception as e:
-        print(f"  ✗ Failed to generate preview for {pdf_path}: {e}")
-        return None
+        return output_path, f"{type(e).__name__}: {e}"
+
 
 def main():
-    examples_dir = Path("examples")
-    if not examples_dir.exists():
-        print("Examples directory not found. Run generate_examples.py first.")
-        return 1
-    
-    pdf_files = sorted(examples_dir.glob("*.pdf"))
-    
-    if not pdf_files:
-        print("No PDF files found in examples directory.")
-        return 1
-    
-    print(f"Generating previews for {len(pdf_files)} PDFs...")
+    parser = argparse.ArgumentParser(description="Render preview images of the example sheets")
+    parser.add_argument("-o", "--output-dir", default="examples/previews",
+                        help="Directory of the preview images (default: %(default)s)")
+    parser.add_argument("--max-size", type=int, nargs=2, default=(800, 600), metavar=("W", "H"),
+                        help="Largest preview size in pixels (default: 800 600)")
+    parser.add_argument("--dpi", type=float, default=150,
+                        help="Highest preview resolution in dots per inch (default: 150)")
+    parser.add_argument("-j", "--jobs", type=int, default=0,
+                        help="Worker processes (default: 0 = one per CPU)")
+    parser.add_argument("--force", action="store_true", help="Render every preview, even unchanged ones")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    os.makedirs(args.output_dir, exist_ok=True)
+    manifest_path = os.path.join(args.output_dir, MANIFEST)
+    manifest = {}
+    if not args.force and os.path.exists(manifest_path):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+    tasks, keys = [], {}
+    for example in examples:
+        name = os.path.splitext(example["name"])[0]
+        output_path = os.path.join(args.output_dir, f"{name}_preview.png")
+        keys[output_path] = key = preview_key(example_job(example), args.max_size)
+        if manifest.get(os.path.basename(output_path)) != key or not os.path.exists(output_path):
+            tasks.append((example, output_path, tuple(args.max_size), args.dpi))
+
+    print(f"Previews: {len(tasks)} of {len(examples)} to render")
     print("=" * 60)
-    
-    if not PDF2IMAGE_AVAILABLE:
-        print("\nTo generate preview images, install:")
-        print("  pip install pdf2image")
-        print("  brew install poppler  # macOS")
-        print("  # or apt-get install poppler-utils  # Linux")
-        return 1
-    
-    generated = []
-    for pdf_file in pdf_files:
-        print(f"\nProcessing {pdf_file.name}...")
-        preview = generate_preview(str(pdf_file))
-        if preview:
-            generated.append(preview)
-    
+    jobs = min(args.jobs or os.cpu_count() or 1, max(len(tasks), 1))
+    if jobs > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(generate_preview, tasks))
+    else:
+        results = [generate_preview(task) for task in tasks]
+
+    failed = 0
+    for output_path, error in results:
+        if error is None:
+            manifest[os.path.basename(output_path)] = keys[output_path]
+            print(f"  ✓ Generated: {output_path}")
+        else:
+            manifest.pop(os.path.basename(output_path), None)
+            failed += 1
+            print(f"  ✗ Failed to generate preview {output_path}: {error}")
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write("\n")
+
     print("\n" + "=" * 60)
-    print(f"Generated {len(generated)} preview images")
-    print(f"Preview images saved to: examples/previews/")
-    
-    return 0
+    print(f"Generated {len(results) - failed} preview images, {len(examples) - len(tasks)} up to date "
+          f"({time.perf_counter() - start:.2f}s)")
+    print(f"Preview images saved to: {args.output_dir}/")
+    return 1 if failed else 0
+
 
 if __name__ == "__main__":
-    import sys
     sys.exit(main())
-
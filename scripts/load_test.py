@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Load generator for the local render service (aruco-laser serve).
+
+Starts a server on a free port (or targets --url), sends a mix of JSON jobs
+from concurrent keep-alive connections and reports throughput, latency
+percentiles and how many requests were coalesced. Only the standard
+library is used on the client side.
+
+    python scripts/load_test.py                          # spawn a server, 200 requests
+    python scripts/load_test.py -n 1000 -c 32 --distinct 4
+    python scripts/load_test.py --url http://127.0.0.1:8765 --max-p95-ms 250
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+GENERATOR = os.path.join(ROOT, "generate_aruco_laser.py")
+sys.path.insert(0, ROOT)
+
+from generate_aruco_laser import ARUCO_DICTS
+
+
+def make_jobs(count, distinct, dictionary, output_format):
+    """count jobs cycling through distinct different ID ranges."""
+    starts = max(ARUCO_DICTS[dictionary][1] - 19, 1)
+    jobs = []
+    for k in range(count):
+        start = (k % distinct) * 7 % starts
+        jobs.append({"dict": dictionary, "range": [start, start + 19], "size": 10,
+                     "output": f"sheet.{output_format}"})
+    return jobs
+
+
+async def request(reader, writer, host, method, path, body=b""):
+    """Send one HTTP/1.1 request on an open connection; returns (status, headers, body)."""
+    writer.write((f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                  f"Content-Length: {len(body)}\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+    head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+    status = int(head[0].split(" ")[1])
+    headers = {}
+    for line in head[1:]:
+        if ":" in line:
+            field, value = line.split(":", 1)
+            headers[field.strip().lower()] = value.strip()
+    data = await reader.readexactly(int(headers.get("content-length", 0)))
+    return status, headers, data
+
+
+async def run_load(host, port, jobs, concurrency):
+    """Send every job over concurrency connections; returns per-request results and wall time."""
+    queue = asyncio.Queue()
+    for job in jobs:
+        queue.put_nowait(json.dumps(job).encode("utf-8"))
+    results = []
+
+    async def client():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            while not queue.empty():
+                body = queue.get_nowait()
+                start = time.perf_counter()
+                status, headers, data = await request(reader, writer, host, "POST", "/render", body)
+                results.append((status, time.perf_counter() - start, len(data),
+                                headers.get("x-coalesced") == "yes"))
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return results, time.perf_counter() - start
+
+
+async def fetch_stats(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        _, _, data = await request(reader, writer, host, "GET", "/stats")
+        return json.loads(data)
+    finally:
+        writer.close()
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the local render service")
+    parser.add_argument("--url", help="Server to test (default: start one on a free port)")
+    parser.add_argument("-n", "--requests", type=int, default=200, help="Requests to send (default: 200)")
+    parser.add_argument("-c", "--concurrency", type=int, default=16,
+                        help="Concurrent connections (default: 16)")
+    parser.add_argument("--distinct", type=int, default=8,
+                        help="Different jobs in the mix; repeats can be coalesced (default: 8)")
+    parser.add_argument("--dict", default="4X4_1000", help="Dictionary of the jobs (default: 4X4_1000)")
+    parser.add_argument("--format", default="pdf", help="Output format of the jobs (default: pdf)")
+    parser.add_argument("-j", "--workers", type=int, default=0,
+                        help="Worker processes of a spawned server (default: one per CPU)")
+    parser.add_argument("--max-p95-ms", type=float, default=None,
+                        help="Exit with status 1 if the 95th percentile latency is above this")
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname, parts.port or 80
+    else:
+        server = subprocess.Popen([sys.executable, GENERATOR, "serve", "--port", "0", "-j", str(args.workers)],
+                                  stdout=subprocess.PIPE, text=True)
+        line = server.stdout.readline()
+        if not line.startswith("Listening on"):
+            print(f"✗ Server did not start: {line.strip()}")
+            server.kill()
+            return 1
+        host, port = "127.0.0.1", int(line.split(":")[2].split(" ")[0])
+        print(line.strip())
+
+    try:
+        jobs = make_jobs(args.requests, args.distinct, args.dict, args.format)
+        results, wall = asyncio.run(run_load(host, port, jobs, args.concurrency))
+        stats = asyncio.run(fetch_stats(host, port))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    ok = [r for r in results if r[0] == 200]
+    latencies = [r[1] * 1000 for r in ok]
+    print(f"\nRequests:     {len(results)} ({len(ok)} OK, {len(results) - len(ok)} failed), "
+          f"{args.concurrency} connections, {args.distinct} distinct jobs")
+    print(f"Throughput:   {len(results) / wall:.1f} requests/s, "
+          f"{sum(r[2] for r in ok) / wall / 1e6:.2f} MB/s")
+    if latencies:
+        print(f"Latency (ms): p50 {percentile(latencies, 50):.1f}, p90 {percentile(latencies, 90):.1f}, "
+              f"p95 {percentile(latencies, 95):.1f}, p99 {percentile(latencies, 99):.1f}, "
+              f"max {max(latencies):.1f}")
+    print(f"Coalesced:    {sum(1 for r in ok if r[3])} of {len(ok)}")
+    print(f"Server:       {stats['rendered']} rendered, "
+          f"{stats['render_seconds'] / max(stats['rendered'], 1) * 1000:.1f} ms per render")
+
+    if len(ok) < len(results):
+        print("\n✗ Some requests failed")
+        return 1
+    if args.max_p95_ms is not None and percentile(latencies, 95) > args.max_p95_ms:
+        print(f"\n✗ p95 latency above {args.max_p95_ms:g} ms")
+        return 1
+    print("\n✓ Load test passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
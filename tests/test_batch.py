@@ -0,0 +1,78 @@
+"""The in-process batch runner: manifests, job tables and worker pools."""
+
+import generate_aruco_laser as gal
+
+MANIFEST = """\
+[defaults]
+dict = "5X5_100"
+size = 8
+
+[[job]]
+name = "range"
+range = [0, 29]
+per-page = 12
+output = "{out}/a.pdf"
+
+[[job]]
+name = "no labels"
+ids = [3, 1, 4, 1, 5]
+no_labels = true
+format = "svg"
+output = "{out}/b.svg"
+
+[[job]]
+name = "bad"
+range = [0, 500]
+output = "{out}/c.pdf"
+"""
+
+
+def test_manifest_job_argv():
+    job = {"name": "x", "dict": "4X4_50", "per_page": 6, "range": [0, 9], "no-labels": True,
+           "verbose": False, "sheet": None}
+    assert gal.manifest_job_argv(job) == ["--dict", "4X4_50", "--per-page", "6", "--range", "0", "9",
+                                          "--no-labels"]
+    assert gal.manifest_job_argv({"args": ["-r", 0, 5]}) == ["-r", "0", "5"]
+
+
+def test_manifest_defaults_apply_to_every_job(tmp_path):
+    path = tmp_path / "jobs.toml"
+    path.write_text(MANIFEST.format(out=tmp_path))
+    jobs = gal.load_manifest(str(path))
+    assert [job["name"] for job in jobs] == ["range", "no labels", "bad"]
+    assert all(job["dict"] == "5X5_100" and job["size"] == 8 for job in jobs)
+
+
+def test_batch_outputs_match_single_runs(tmp_path):
+    (tmp_path / "batch").mkdir()
+    path = tmp_path / "jobs.toml"
+    path.write_text(MANIFEST.format(out=tmp_path / "batch"))
+    results = gal.run_batch(gal.load_manifest(str(path)))
+    assert [(name, error is None) for name, _, _, error in results] == [
+        ("range", True), ("no labels", True), ("bad", False)]
+    assert "between 0 and 99" in results[2][3]
+
+    assert gal.main(["--dict", "5X5_100", "-s", "8", "-r", "0", "29", "--per-page", "12",
+                     "-o", str(tmp_path / "a.pdf")]) == 0
+    assert (tmp_path / "batch" / "a.pdf").read_bytes() == (tmp_path / "a.pdf").read_bytes()
+    assert (tmp_path / "batch" / "b.svg").exists()
+    assert not (tmp_path / "batch" / "c.pdf").exists()
+
+
+def test_worker_pool_gives_the_same_results(tmp_path):
+    jobs = [["--dict", "4X4_50", "-r", "0", str(n), "-o", str(tmp_path / f"{workers}_{n}.pdf")]
+            for workers in (1, 2) for n in (5, 25, 45)]
+    results = gal.run_batch(jobs[:3], workers=1) + gal.run_batch(jobs[3:], workers=2)
+    assert all(error is None for _, _, _, error in results)
+    for n in (5, 25, 45):
+        assert (tmp_path / f"1_{n}.pdf").read_bytes() == (tmp_path / f"2_{n}.pdf").read_bytes()
+
+
+def test_batch_command_reports_failures(tmp_path, capsys):
+    path = tmp_path / "jobs.toml"
+    path.write_text(MANIFEST.format(out=tmp_path))
+    assert gal.main(["batch", str(path)]) == 1
+    out = capsys.readouterr().out
+    assert "2/3 jobs succeeded" in out
+    assert "✗ bad" in out
+    assert gal.main(["batch", str(tmp_path / "missing.toml")]) == 1
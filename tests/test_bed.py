@@ -0,0 +1,44 @@
+"""Bed sheets (--bed): tile-by-tile placement and streamed rasters."""
+
+import numpy as np
+import pytest
+
+import generate_aruco_laser as gal
+
+SHEET = (300 * gal.mm, 200 * gal.mm)
+
+
+def full_raster(ids, dpi, strip_rows):
+    layout = np.concatenate([gal.compute_layout([])] + list(gal.iter_bed_tiles(ids, SHEET, 5, 0.5, 2)))
+    return np.vstack(list(gal.iter_raster_strips(layout, "4X4_1000", 5, 0.5, SHEET, dpi, strip_rows)))
+
+
+@pytest.mark.parametrize("strip_rows, tile_markers", [(7, 1), (64, 30), (1000, 500)])
+def test_streamed_raster_matches_the_whole_layout(strip_rows, tile_markers):
+    ids = range(0, 500, 3)
+    tiles = gal.iter_bed_tiles(iter(ids), SHEET, 5, 0.5, 2, tile_markers=tile_markers)
+    streamed = np.vstack(list(gal.iter_bed_raster_strips(tiles, "4X4_1000", 5, 0.5, SHEET, 100, strip_rows)))
+    assert np.array_equal(streamed, full_raster(ids, 100, strip_rows))
+
+
+@pytest.mark.parametrize("output", ["bed.png", "bed.tiff", "bed.svg"])
+def test_bed_counts_markers_from_a_generator(tmp_path, output):
+    count = gal.generate_aruco_laser_bed((i for i in range(200)), "4X4_250", str(tmp_path / output),
+                                         marker_size_mm=5, spacing_mm=2, page_size=SHEET,
+                                         output_format=output.split(".")[1], dpi=100, verbose=False)
+    assert count == 200
+
+
+def test_bed_rejects_what_does_not_fit(tmp_path, capsys):
+    cols, rows, _, _ = gal.bed_grid(SHEET, 5, 0.5, 2)
+    with pytest.raises(ValueError, match=f"holds {cols * rows} markers"):
+        gal.generate_aruco_laser_bed(range(cols * rows + 1), "4X4_1000", str(tmp_path / "bed.png"),
+                                     marker_size_mm=5, spacing_mm=2, page_size=SHEET, output_format="png",
+                                     dpi=100, verbose=False)
+    with pytest.raises(ValueError, match="between 0 and 49"):
+        gal.generate_aruco_laser_bed(range(60), "4X4_50", str(tmp_path / "bed.png"), marker_size_mm=5,
+                                     spacing_mm=2, page_size=SHEET, output_format="png", dpi=100,
+                                     verbose=False)
+    assert gal.main(["-r", "0", str(cols * rows), "--dict", "4X4_1000", "--bed", "--sheet", "300x200",
+                     "-s", "5", "--spacing", "2", "-o", str(tmp_path / "bed.pdf")]) == 1
+    assert f"holds {cols * rows} markers" in capsys.readouterr().out
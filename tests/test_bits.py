@@ -0,0 +1,51 @@
+"""Whole-dictionary bit tensors and their on-disk cache."""
+
+import numpy as np
+import pytest
+
+import generate_aruco_laser as gal
+
+
+@pytest.mark.parametrize("name", ["4X4_50", "5X5_100", "6X6_250", "7X7_1000"])
+def test_bit_tensor_shape_and_packing(name):
+    dict_id, count = gal.ARUCO_DICTS[name]
+    n = int(name.split("X")[0])
+    bits = gal.load_dictionary_bits(name)
+    assert bits.shape == (count, n, n) and bits.dtype == np.uint8
+    assert set(np.unique(bits)) <= {0, 1}
+    packed = gal.load_dictionary_bits(name, packed=True)
+    assert packed.shape == (count, -(-n * n // 8))
+    assert np.array_equal(np.unpackbits(packed, axis=1)[:, :n * n].reshape(-1, n, n), bits)
+
+
+def test_smaller_dictionaries_are_prefixes():
+    assert np.array_equal(gal.load_dictionary_bits("4X4_100"), gal.load_dictionary_bits("4X4_1000")[:100])
+
+
+def test_marker_images_frame_the_bits():
+    bits = gal.load_dictionary_bits("4X4_50")
+    images = gal.load_marker_images("4X4_50")
+    assert images.shape == (50, 6, 6)
+    assert not images.flags.writeable
+    assert not images[:, 0].any() and not images[:, -1].any()
+    assert not images[:, :, 0].any() and not images[:, :, -1].any()
+    assert np.array_equal(images[:, 1:-1, 1:-1], bits * 255)
+
+
+def test_opencv_bits_are_cached_on_disk(tmp_path, monkeypatch):
+    pytest.importorskip("cv2")
+    monkeypatch.setenv("ARUCO_LASER_CACHE_DIR", str(tmp_path))
+    first = gal.load_dictionary_bits("5X5_50", source="opencv")
+    cached = list(tmp_path.glob("5X5_50-opencv-*.npy"))
+    assert len(cached) == 1
+    second = gal.load_dictionary_bits("5X5_50", source="opencv")
+    assert isinstance(second, np.memmap)
+    assert np.array_equal(first, second)
+    # A damaged cache file is decoded again rather than trusted
+    cached[0].write_bytes(b"not an array")
+    assert np.array_equal(gal.load_dictionary_bits("5X5_50", source="opencv"), first)
+
+
+def test_unknown_source_is_rejected():
+    with pytest.raises(ValueError, match="Unknown dictionary source"):
+        gal.load_dictionary_bits("4X4_50", source="disk")
@@ -0,0 +1,65 @@
+"""Calibration boards (--board) follow OpenCV's GridBoard and CharucoBoard geometry."""
+
+import numpy as np
+import pytest
+
+import generate_aruco_laser as gal
+
+DPI = 150
+
+
+def draw(board, ids, cols, rows, marker_size_mm, spacing_mm=2, engrave_mode="cells"):
+    """Engrave image of a board, and its pattern's top-left corner in pixels."""
+    layout, squares, outline = gal.compute_board(board, ids, cols, rows, gal.A4, marker_size_mm, spacing_mm,
+                                                 show_labels=False)
+    renderer = gal.EngraveRasterRenderer(gal.A4, DPI)
+    gal.render_board(renderer, layout, squares, outline, "4X4_50", marker_size_mm, engrave_mode)
+    margin = 5 * gal.mm
+    origin = np.array([outline[0] + margin, gal.A4[1] - (outline[1] + outline[3] - margin)]) / gal.inch * DPI
+    return renderer.pages[0], origin
+
+
+def image_points(origin, object_points):
+    """Pixel positions (OpenCV convention) of board points in millimetres."""
+    return origin + np.asarray(object_points).reshape(-1, 3)[:, :2] * DPI / 25.4 - 0.5
+
+
+@pytest.mark.parametrize("cols, rows", [(5, 7), (6, 8)])
+def test_charuco_board_matches_opencv(cols, rows):
+    cv2 = pytest.importorskip("cv2")
+    ids = list(range(cols * rows // 2))
+    image, origin = draw("charuco", ids, cols, rows, 10)
+    dictionary = cv2.aruco.getPredefinedDictionary(cv2.aruco.DICT_4X4_50)
+    board = cv2.aruco.CharucoBoard((cols, rows), gal.default_square_mm(10), 10, dictionary, np.array(ids))
+    corners, corner_ids, _, marker_ids = cv2.aruco.CharucoDetector(board).detectBoard(image)
+    assert len(marker_ids) == len(ids)
+    assert len(corner_ids) == (cols - 1) * (rows - 1)
+    expected = image_points(origin, board.getChessboardCorners()[corner_ids.ravel()])
+    assert np.abs(corners.reshape(-1, 2) - expected).max() < 1.5
+
+
+@pytest.mark.parametrize("engrave_mode", ["cells", "polygons"])
+def test_grid_board_matches_opencv(engrave_mode):
+    cv2 = pytest.importorskip("cv2")
+    ids = list(range(10, 34))
+    image, origin = draw("grid", ids, 4, 6, 15, 3, engrave_mode)
+    dictionary = cv2.aruco.getPredefinedDictionary(cv2.aruco.DICT_4X4_50)
+    board = cv2.aruco.GridBoard((4, 6), 15, 3, dictionary, np.array(ids))
+    corners, marker_ids, _ = cv2.aruco.ArucoDetector(dictionary).detectMarkers(image)
+    assert sorted(marker_ids.ravel()) == ids
+    object_points, found = board.matchImagePoints(corners, marker_ids)
+    assert np.abs(found.reshape(-1, 2) - image_points(origin, object_points)).max() < 1.5
+
+
+@pytest.mark.parametrize("board", gal.BOARD_TYPES)
+def test_fitted_board_fits_the_page(board):
+    cols, rows = gal.fit_board_shape(board, gal.A4, 10, 2)
+    count = gal.board_marker_count(board, cols, rows)
+    layout, squares, outline = gal.compute_board(board, range(count), cols, rows, gal.A4, 10, 2)
+    assert len(layout) == count and (layout["page"] == 0).all()
+    x, y, width, height = outline
+    assert x >= 0 and y >= 0 and x + width <= gal.A4[0] and y + height <= gal.A4[1]
+    with pytest.raises(ValueError, match="does not fit"):
+        gal.compute_board(board, range(count * 2), cols + 1, rows + 1, gal.A4, 10, 2)
+    with pytest.raises(ValueError, match="needs"):
+        gal.compute_board(board, range(count - 1), cols, rows, gal.A4, 10, 2)
@@ -0,0 +1,31 @@
+"""OutputCache reuses whole jobs and unchanged PDF pages, and never changes the output."""
+
+import generate_aruco_laser as gal
+
+
+def generate(ids, path, cache):
+    gal.generate_aruco_laser_pdf(ids, "4X4_50", str(path), cache=cache, verbose=False)
+    return path.read_bytes()
+
+
+def test_repeated_job_is_restored(tmp_path):
+    first = generate(range(40), tmp_path / "a.pdf", gal.OutputCache(str(tmp_path / "cache")))
+    cache = gal.OutputCache(str(tmp_path / "cache"))
+    assert generate(range(40), tmp_path / "b.pdf", cache) == first
+    assert cache.pages_rendered == 0
+
+
+def test_pages_are_reused_when_their_markers_move_to_another_page(tmp_path):
+    # IDs 20-39 are page 2 of the first job and page 1 of the second
+    generate(range(0, 40), tmp_path / "a.pdf", gal.OutputCache(str(tmp_path / "cache")))
+    cache = gal.OutputCache(str(tmp_path / "cache"))
+    cached = generate(range(20, 50), tmp_path / "b.pdf", cache)
+    assert (cache.pages_reused, cache.pages_rendered) == (1, 1)
+    assert cached == generate(range(20, 50), tmp_path / "c.pdf", None)
+
+
+def test_changed_markers_are_rendered_again(tmp_path):
+    generate(range(0, 40), tmp_path / "a.pdf", gal.OutputCache(str(tmp_path / "cache")))
+    cache = gal.OutputCache(str(tmp_path / "cache"))
+    generate([0] + list(range(2, 41)), tmp_path / "b.pdf", cache)
+    assert (cache.pages_reused, cache.pages_rendered) == (0, 2)
@@ -0,0 +1,14 @@
+"""Command-line behaviour that scripts rely on."""
+
+import json
+
+import generate_aruco_laser as gal
+
+
+def test_metrics_json_to_stdout_is_only_json(tmp_path, capsys):
+    status = gal.main(["-r", "0", "29", "-o", str(tmp_path / "out.pdf"), "--metrics-json", "-"])
+    out, err = capsys.readouterr()
+    assert status == 0
+    metrics = json.loads(out)
+    assert metrics["markers"] == 30
+    assert "Generated 30 markers" in err
@@ -0,0 +1,28 @@
+"""The vendored dictionary tables (aruco_dict_data.py) against OpenCV."""
+
+import numpy as np
+import pytest
+
+import generate_aruco_laser as gal
+
+cv2 = pytest.importorskip("cv2")
+
+
+@pytest.mark.parametrize("name", list(gal.ARUCO_DICTS))
+def test_vendored_bits_match_opencv(name):
+    vendored = gal.load_dictionary_bits(name, source="vendored")
+    reference = gal.load_dictionary_bits(name, use_cache=False, source="opencv")
+    assert vendored.shape == reference.shape
+    assert np.array_equal(vendored, reference)
+
+
+@pytest.mark.parametrize("name", list(gal.ARUCO_DICTS))
+def test_marker_images_match_generate_image_marker(name):
+    dict_id, count = gal.ARUCO_DICTS[name]
+    aruco_dict = cv2.aruco.getPredefinedDictionary(dict_id)
+    images = gal.load_marker_images(name)
+    grid_size = images.shape[1]
+    assert len(images) == count
+    for marker_id in range(count):
+        assert np.array_equal(images[marker_id],
+                              cv2.aruco.generateImageMarker(aruco_dict, marker_id, grid_size)), marker_id
@@ -0,0 +1,53 @@
+"""Engrave geometry modes: merged rectangles and traced polygons cover exactly the black cells."""
+
+import numpy as np
+import pytest
+
+import generate_aruco_laser as gal
+
+
+def cover(rects, shape):
+    count = np.zeros(shape, dtype=int)
+    for col, row, width, height in np.asarray(rects).reshape(-1, 4):
+        count[row:row + height, col:col + width] += 1
+    return count
+
+
+def even_odd(loops, shape):
+    # Cell (i, j) is inside when a ray to its right crosses an odd number of vertical edges
+    inside = np.zeros(shape, dtype=bool)
+    rows, cols = np.mgrid[:shape[0], :shape[1]] + 0.5
+    for loop in loops:
+        for (c0, r0), (c1, r1) in zip(loop, np.roll(loop, -1, axis=0)):
+            if c0 == c1 and r0 != r1:
+                inside ^= (cols < c0) & (rows > min(r0, r1)) & (rows < max(r0, r1))
+    return inside
+
+
+@pytest.mark.parametrize("aruco_dict", ["4X4_50", "7X7_50"])
+def test_merged_rects_and_polygons_cover_the_black_cells(aruco_dict):
+    for image in gal.load_marker_images(aruco_dict)[:20]:
+        black = image == 0
+        assert np.array_equal(cover(gal.merge_cells_to_rects(black), black.shape), black)
+        assert np.array_equal(even_odd(gal.trace_cell_polygons(black), black.shape), black)
+
+
+def test_bulk_rects_match_each_grid():
+    black = gal.load_marker_images("5X5_100")[:30] == 0
+    rects = gal.merge_cells_to_rects_bulk(black)
+    for k, grid in enumerate(black):
+        assert np.array_equal(cover(rects[rects[:, 0] == k, 1:], grid.shape), grid)
+    # Never more rectangles than cells, and far fewer in practice
+    assert len(rects) < black.sum()
+
+
+@pytest.mark.parametrize("engrave_mode", ["rects", "polygons"])
+def test_engrave_modes_rasterize_like_cells(engrave_mode):
+    layout = gal.compute_layout(list(range(30)), marker_size_mm=8, spacing_mm=4)
+    pages = {}
+    for mode in ("cells", engrave_mode):
+        renderer = gal.EngraveRasterRenderer(gal.A4, 200)
+        gal.render_layout(renderer, layout, "6X6_50", 8, 0.5, engrave_mode=mode)
+        pages[mode] = renderer.pages[0]
+    assert (pages["cells"] == 0).any()
+    assert np.array_equal(pages["cells"], pages[engrave_mode])
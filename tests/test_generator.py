@@ -0,0 +1,87 @@
+"""MarkerSheetGenerator renders what generate_aruco_laser_pdf() writes, from any thread or process."""
+
+import io
+import pickle
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+import generate_aruco_laser as gal
+
+SETTINGS = dict(marker_size_mm=8, border_mm=1, spacing_mm=4)
+
+
+def written(tmp_path, ids, name="out.pdf", **options):
+    options = dict(SETTINGS, **options)
+    gal.generate_aruco_laser_pdf(list(ids), "5X5_250", str(tmp_path / name), verbose=False, **options)
+    return (tmp_path / name).read_bytes()
+
+
+@pytest.mark.parametrize("options", [
+    {},
+    {"engrave_mode": "polygons", "cut_mode": "merged", "label_mode": "paths"},
+    {"markers_per_page": 12, "page_size": gal.letter, "show_labels": False},
+    {"optimize_travel": True},
+    {"output_format": "svg"},
+    {"output_format": "dxf", "engrave_mode": "rects"},
+    {"output_format": "png", "dpi": 100},
+])
+def test_render_matches_generate_aruco_laser_pdf(tmp_path, options):
+    ids = range(30, 45) if options.get("output_format", "pdf") != "pdf" else range(30, 100)
+    name = "out." + options.get("output_format", "pdf")
+    generator = gal.MarkerSheetGenerator("5X5_250", **SETTINGS)
+    assert generator.render(ids, **options) == written(tmp_path, ids, name, **options)
+
+
+def test_settings_given_once_or_per_call_agree(tmp_path):
+    expected = written(tmp_path, range(50), cut_mode="merged")
+    assert gal.MarkerSheetGenerator("5X5_250", cut_mode="merged", **SETTINGS).render(range(50)) == expected
+    generator = gal.MarkerSheetGenerator("5X5_250", **SETTINGS)
+    assert generator.render(range(50), cut_mode="merged") == expected
+    assert generator.options["cut_mode"] == "outlines"
+    target = io.BytesIO()
+    assert generator.render(range(50), target, cut_mode="merged") is None
+    assert target.getvalue() == expected
+
+
+def test_threads_share_one_generator(tmp_path):
+    generator = gal.MarkerSheetGenerator("5X5_250", **SETTINGS)
+    jobs = [range(k, k + 10 * (k % 5 + 1)) for k in range(40)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        rendered = list(pool.map(generator.render, jobs))
+    for k in (0, 7, 19, 39):
+        assert rendered[k] == written(tmp_path, jobs[k], f"{k}.pdf")
+
+
+def test_pickled_generator_renders_the_same(tmp_path):
+    generator = gal.MarkerSheetGenerator("5X5_250", label_mode="paths", **SETTINGS)
+    generator.render(range(10))
+    copy = pickle.loads(pickle.dumps(generator))
+    assert repr(copy) == repr(generator)
+    assert copy.render(range(60)) == generator.render(range(60)) == written(tmp_path, range(60),
+                                                                              label_mode="paths")
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        assert list(pool.map(generator.render, [range(60), range(5)])) == [copy.render(range(60)),
+                                                                           copy.render(range(5))]
+
+
+def test_render_pages_gives_one_document_per_page(tmp_path):
+    generator = gal.MarkerSheetGenerator("5X5_250", output_format="svg", **SETTINGS)
+    pages = generator.render_pages(range(45))
+    gal.generate_aruco_laser_pdf(list(range(45)), "5X5_250", str(tmp_path / "out.svg"), output_format="svg",
+                                 verbose=False, **SETTINGS)
+    assert pages == [(tmp_path / f"out_p{k:03d}.svg").read_bytes() for k in (1, 2, 3)]
+    with pytest.raises(ValueError, match="render_pages"):
+        generator.render(range(45))
+
+
+def test_bad_settings_and_ids_are_rejected():
+    with pytest.raises(ValueError):
+        gal.MarkerSheetGenerator("9X9_50")
+    with pytest.raises(ValueError, match="Unknown options"):
+        gal.MarkerSheetGenerator("4X4_50", colour="red")
+    generator = gal.MarkerSheetGenerator("4X4_50")
+    with pytest.raises(ValueError):
+        generator.render(range(5), engrave_mode="dots")
+    with pytest.raises(ValueError, match="between 0 and 49"):
+        generator.render([3, 50])
@@ -0,0 +1,34 @@
+"""--jobs N renders page chunks in worker processes without changing the output."""
+
+import pytest
+
+import generate_aruco_laser as gal
+
+
+def generate(path, jobs, **options):
+    gal.generate_aruco_laser_pdf(list(range(0, 250, 2)), "5X5_250", str(path), marker_size_mm=8,
+                                 spacing_mm=4, jobs=jobs, verbose=False, **options)
+
+
+@pytest.mark.parametrize("options", [
+    {},
+    {"engrave_mode": "polygons", "cut_mode": "merged"},
+    {"optimize_travel": True, "label_mode": "paths"},
+])
+def test_parallel_pdf_is_byte_identical(tmp_path, options):
+    generate(tmp_path / "serial.pdf", 1, **options)
+    generate(tmp_path / "parallel.pdf", 3, **options)
+    assert (tmp_path / "parallel.pdf").read_bytes() == (tmp_path / "serial.pdf").read_bytes()
+
+
+@pytest.mark.parametrize("output_format", ["svg", "dxf"])
+def test_parallel_page_files_are_byte_identical(tmp_path, output_format):
+    (tmp_path / "serial").mkdir()
+    (tmp_path / "parallel").mkdir()
+    generate(tmp_path / "serial" / f"out.{output_format}", 1, output_format=output_format)
+    generate(tmp_path / "parallel" / f"out.{output_format}", 2, output_format=output_format)
+    serial = sorted(path.name for path in (tmp_path / "serial").iterdir())
+    assert len(serial) == 7
+    assert sorted(path.name for path in (tmp_path / "parallel").iterdir()) == serial
+    for name in serial:
+        assert (tmp_path / "parallel" / name).read_bytes() == (tmp_path / "serial" / name).read_bytes()
@@ -0,0 +1,49 @@
+"""The layout stage: one placement table row per marker."""
+
+import numpy as np
+import pytest
+
+import generate_aruco_laser as gal
+
+
+@pytest.mark.parametrize("markers_per_page, nrows, ncols, expected", [
+    (20, None, None, (5, 4)),
+    (12, 3, None, (3, 4)),
+    (12, None, 2, (6, 2)),
+    (99, 2, 3, (2, 3)),
+    (1, None, None, (1, 1)),
+])
+def test_resolve_grid(markers_per_page, nrows, ncols, expected):
+    assert gal.resolve_grid(markers_per_page, nrows, ncols) == expected
+
+
+def test_markers_fill_pages_row_by_row_on_a_centred_grid():
+    layout = gal.compute_layout(list(range(100, 145)), page_size=gal.A4, marker_size_mm=10, border_mm=1,
+                                spacing_mm=5, nrows=4, ncols=5)
+    assert layout.dtype == np.dtype(gal.LAYOUT_DTYPE)
+    assert list(layout["id"]) == list(range(100, 145))
+    assert list(np.bincount(layout["page"])) == [20, 20, 5]
+
+    first = layout[layout["page"] == 0]
+    pitch = 17 * gal.mm
+    assert np.allclose(np.diff(first["x"][:5]), pitch)
+    assert np.allclose(first["y"][::5], first["y"][0] - np.arange(4) * pitch)
+    # Every page uses the same grid, centred on the page
+    assert np.array_equal(layout["x"][20:40], first["x"]) and np.array_equal(layout["y"][20:40], first["y"])
+    width = 5 * 12 * gal.mm + 4 * 5 * gal.mm
+    height = 4 * 12 * gal.mm + 3 * 5 * gal.mm
+    assert np.isclose(first["x"][0], (gal.A4[0] - width) / 2)
+    assert np.isclose(gal.A4[1] - first["y"][0], (gal.A4[1] - height) / 2)
+
+
+def test_iter_layout_pages_matches_compute_layout():
+    ids = range(0, 130, 3)
+    pages = list(gal.iter_layout_pages(iter(ids), marker_size_mm=8, markers_per_page=12))
+    assert [page["page"][0] for page in pages] == list(range(len(pages)))
+    assert np.array_equal(np.concatenate(pages), gal.compute_layout(list(ids), marker_size_mm=8,
+                                                                     markers_per_page=12))
+
+
+def test_empty_layout():
+    assert len(gal.compute_layout([])) == 0
+    assert list(gal.iter_layout_pages([])) == []
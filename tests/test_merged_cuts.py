@@ -0,0 +1,71 @@
+"""Merged cuts (--cut-mode merged): one line per grid line, covering every outline."""
+
+import zlib
+
+import numpy as np
+import pytest
+
+import generate_aruco_laser as gal
+
+
+def grid(rows, cols, size=10.0, spacing=0.0):
+    y, x = np.mgrid[:rows, :cols] * (size + spacing)
+    return np.column_stack([x.ravel(), y.ravel(), np.full(x.size, size), np.full(x.size, size)])
+
+
+def covers(lines, rects, tol=1e-6):
+    # Every rectangle edge lies within one line on the same grid line
+    starts, ends = np.minimum(lines[:, 0], lines[:, 1]), np.maximum(lines[:, 0], lines[:, 1])
+    horizontal = lines[:, 0, 1] == lines[:, 1, 1]
+    for x, y, w, h in rects:
+        for fixed, lo, hi, axis in ((y, x, x + w, 1), (y + h, x, x + w, 1), (x, y, y + h, 0), (x + w, y, y + h, 0)):
+            along = 1 - axis
+            on_line = (horizontal == (axis == 1)) & np.isclose(starts[:, axis], fixed)
+            assert (on_line & (starts[:, along] <= lo + tol) & (ends[:, along] >= hi - tol)).any()
+
+
+@pytest.mark.parametrize("rows, cols", [(1, 1), (3, 4), (20, 20)])
+def test_zero_spacing_grid_gives_one_line_per_grid_line(rows, cols):
+    rects = grid(rows, cols)
+    lines = gal.merge_cut_outlines(rects)
+    assert lines.shape == ((rows + 1) + (cols + 1), 2, 2)
+    horizontal = lines[lines[:, 0, 1] == lines[:, 1, 1]]
+    vertical = lines[lines[:, 0, 0] == lines[:, 1, 0]]
+    assert len(horizontal) == rows + 1 and len(vertical) == cols + 1
+    assert np.allclose(horizontal[:, :, 0], [0, cols * 10]) and np.allclose(vertical[:, :, 1], [0, rows * 10])
+    covers(lines, rects)
+
+
+def test_spaced_markers_keep_their_own_edges():
+    rects = grid(3, 4, spacing=2)
+    lines = gal.merge_cut_outlines(rects)
+    assert len(lines) == 3 * 2 * 4 + 4 * 2 * 3
+    covers(lines, rects)
+
+
+def test_touching_edges_within_tolerance_join():
+    rects = np.array([[0, 0, 10, 10], [10.0004, 0, 10, 10], [25, 0, 10, 10]])
+    lines = gal.merge_cut_outlines(rects)
+    # Bottom and top: one line across the touching pair, one for the third square
+    assert len(lines[lines[:, 0, 1] == lines[:, 1, 1]]) == 4
+    assert len(gal.merge_cut_outlines(np.empty((0, 4)))) == 0
+
+
+def test_partial_last_row_is_covered():
+    rects = grid(5, 5)[:23]
+    lines = gal.merge_cut_outlines(rects)
+    covers(lines, rects)
+    assert len(lines) == 6 + 6
+
+
+def test_merged_page_strokes_one_segment_per_grid_line():
+    layout = gal.compute_layout(list(range(12)), marker_size_mm=10, spacing_mm=0, nrows=3, ncols=4)
+    renderer = gal.NativePDFRenderer(None)
+    gal.render_layout(renderer, layout, "4X4_50", 10, 0.5, show_labels=False, cut_mode="merged")
+    renderer.close()
+    (_, stream), = renderer.finished_pages
+    ops = zlib.decompress(stream).decode("latin-1")
+    cut = ops[ops.index("1 0 0 RG"):]
+    assert cut.count(" m\n") == (3 + 1) + (4 + 1)
+    assert cut.count(" l\n") == (3 + 1) + (4 + 1)
+    assert " re\n" not in cut
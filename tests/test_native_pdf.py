@@ -0,0 +1,98 @@
+"""The renderer interface and the native PDF writer."""
+
+import re
+import zlib
+
+import numpy as np
+import pytest
+
+import generate_aruco_laser as gal
+
+
+def generate(path, **options):
+    gal.generate_aruco_laser_pdf(list(range(45)), "4X4_50", str(path), marker_size_mm=10, spacing_mm=5,
+                                 verbose=False, **options)
+    return path.read_bytes()
+
+
+def check_xref(data):
+    # Every cross-reference entry points at the start of its object
+    xref = int(re.search(rb"startxref\n(\d+)\n%%EOF\n$", data).group(1))
+    count = int(re.match(rb"xref\n0 (\d+)\n", data[xref:]).group(1))
+    entries = data[xref:].split(b"\n")[3:2 + count]
+    for number, entry in enumerate(entries, start=1):
+        assert data[int(entry[:10]):].startswith(b"%d 0 obj\n" % number)
+    return count
+
+
+def page_streams(data):
+    streams = re.findall(rb"/FlateDecode >>\nstream\n(.*?)\nendstream", data, re.S)
+    return [zlib.decompress(stream) for stream in streams]
+
+
+def test_incomplete_renderer_cannot_be_created():
+    class Partial(gal.MarkerRenderer):
+        def begin_page(self, page_size=None):
+            pass
+
+    with pytest.raises(TypeError, match="abstract"):
+        Partial(gal.A4)
+
+
+def test_native_pdf_structure(tmp_path):
+    data = generate(tmp_path / "out.pdf")
+    assert data.startswith(b"%PDF-1.4\n")
+    assert check_xref(data) == 4 + 2 * 3
+    assert b"/Count 3" in data
+    streams = page_streams(data)
+    assert len(streams) == 3
+    # Engrave rectangles are blue, cuts red, and all rectangles of a call share one operator
+    assert b"0 0 1 RG 0 0 1 rg" in streams[0] and b"1 0 0 RG" in streams[0]
+    assert streams[0].count(b"B\n") < streams[0].count(b" re\n") / 10
+
+
+def test_native_pdf_is_deterministic(tmp_path):
+    assert generate(tmp_path / "a.pdf") == generate(tmp_path / "b.pdf")
+
+
+def test_streamed_pages_have_the_same_content(tmp_path):
+    layout = gal.compute_layout(list(range(45)), marker_size_mm=10, spacing_mm=5)
+    contents = []
+    for threshold in (None, 500):
+        path = tmp_path / f"{threshold}.pdf"
+        with gal.NativePDFRenderer(str(path), stream_threshold=threshold) as renderer:
+            gal.render_layout(renderer, layout, "4X4_50", 10, 0.5)
+        data = path.read_bytes()
+        check_xref(data)
+        contents.append(page_streams(data))
+    assert contents[0] == contents[1]
+
+
+def test_collected_pages_match_the_written_file(tmp_path):
+    layout = gal.compute_layout(list(range(45)), marker_size_mm=10, spacing_mm=5)
+    renderer = gal.NativePDFRenderer(None)
+    gal.render_layout(renderer, layout, "4X4_50", 10, 0.5)
+    renderer.close()
+    generate(tmp_path / "out.pdf")
+    assert [zlib.decompress(stream) for _, stream in renderer.finished_pages] == \
+        page_streams((tmp_path / "out.pdf").read_bytes())
+
+
+def test_native_and_reportlab_pdfs_render_alike(tmp_path):
+    pymupdf = pytest.importorskip("pymupdf")
+    images = []
+    # Without anti-aliasing, so coordinate rounding in the last digit cannot show
+    aa_level = pymupdf.TOOLS.show_aa_level()["graphics"]
+    pymupdf.TOOLS.set_aa_level(0)
+    try:
+        for writer in ("native", "reportlab"):
+            path = tmp_path / f"{writer}.pdf"
+            generate(path, pdf_writer=writer, show_labels=False)
+            with pymupdf.open(str(path)) as doc:
+                assert doc.page_count == 3
+                pix = doc[0].get_pixmap(dpi=100)
+                images.append(np.frombuffer(pix.samples, dtype=np.uint8))
+    finally:
+        pymupdf.TOOLS.set_aa_level(aa_level)
+    assert (images[0] < 128).any()
+    assert np.array_equal(images[0], images[1])
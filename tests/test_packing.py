@@ -0,0 +1,73 @@
+"""Sheet packing (--pack): placements never overlap and stay on the sheet."""
+
+import numpy as np
+import pytest
+
+import generate_aruco_laser as gal
+
+
+def assert_disjoint(bins, x0, y0, x1, y1, tol=1e-6):
+    for b in np.unique(bins):
+        on = bins == b
+        a0, b0, a1, b1 = x0[on], y0[on], x1[on], y1[on]
+        overlap = ((a0[:, None] < a1[None, :] - tol) & (a0[None, :] < a1[:, None] - tol)
+                   & (b0[:, None] < b1[None, :] - tol) & (b0[None, :] < b1[:, None] - tol))
+        np.fill_diagonal(overlap, False)
+        assert not overlap.any()
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_packed_rectangles_are_disjoint_and_inside(seed):
+    rng = np.random.default_rng(seed)
+    widths = rng.uniform(1, 40, 300)
+    heights = rng.uniform(1, 40, 300)
+    bins, x, y = gal.pack_rectangles(widths, heights, 100, 80)
+    assert (x >= 0).all() and (y >= 0).all()
+    assert (x + widths <= 100 + 1e-9).all() and (y + heights <= 80 + 1e-9).all()
+    assert_disjoint(bins, x, y, x + widths, y + heights)
+    # Sheets are filled in order and none is wasted
+    assert set(bins.tolist()) == set(range(bins.max() + 1))
+    assert bins.max() + 1 <= 2 * np.ceil((widths * heights).sum() / (100 * 80))
+
+
+def test_equal_squares_fill_a_sheet_exactly():
+    bins, x, y = gal.pack_rectangles(np.full(24, 10.0), np.full(24, 10.0), 60, 40)
+    assert (bins == 0).all()
+    assert sorted(zip(x.tolist(), y.tolist())) == [(i * 10.0, j * 10.0) for i in range(6) for j in range(4)]
+
+
+def test_oversized_rectangle_is_rejected():
+    with pytest.raises(ValueError, match="does not fit"):
+        gal.pack_rectangles([10, 61], [10, 10], 60, 40)
+
+
+@pytest.mark.parametrize("show_labels", [True, False])
+def test_packed_layout_keeps_spacing_and_margins(show_labels):
+    rng = np.random.default_rng(1)
+    ids = np.arange(200)
+    sizes = rng.choice([3, 5, 10, 25, 50], len(ids))
+    borders = rng.choice([0.5, 1, 2], len(ids))
+    sheet, margin, spacing = (600 * gal.mm, 400 * gal.mm), 5, 2
+    layout = gal.pack_layout(ids, sheet, sizes, borders, spacing, margin, show_labels)
+
+    assert sorted(layout["id"].tolist()) == ids.tolist()
+    by_id = np.argsort(layout["id"])
+    assert np.allclose(layout["size"][by_id], sizes * gal.mm)
+    assert np.allclose(layout["border"][by_id], borders * gal.mm)
+
+    total = layout["size"] + 2 * layout["border"]
+    x0, y1 = layout["x"], layout["y"]
+    x1, y0 = x0 + total, y1 - total - (gal.LABEL_SPACE if show_labels else 0)
+    edge = margin * gal.mm - 1e-6
+    assert (x0 >= edge).all() and (x1 <= sheet[0] - edge).all()
+    assert (y0 >= edge).all() and (y1 <= sheet[1] - edge).all()
+    # Grown by half the spacing on every side, markers still never touch
+    half = spacing * gal.mm / 2
+    assert_disjoint(layout["page"], x0 - half, y0 - half, x1 + half, y1 + half)
+
+
+def test_packed_sheets_render(tmp_path):
+    status = gal.main(["--dict", "4X4_1000", "-r", "0", "299", "--pack", "--sheet", "300x200",
+                       "--spacing", "2", "-o", str(tmp_path / "out.pdf")])
+    assert status == 0
+    assert (tmp_path / "out.pdf").read_bytes().startswith(b"%PDF")
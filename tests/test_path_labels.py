@@ -0,0 +1,83 @@
+"""Path labels (--label-mode paths): engraved outlines from a cached glyph table, no font text."""
+
+import base64
+import re
+import zlib
+
+import numpy as np
+import pytest
+
+import generate_aruco_laser as gal
+
+IDS = [0, 7, 42, 123, 999]
+
+
+def page_ops(tmp_path, label_mode, **options):
+    path = tmp_path / f"{label_mode}.pdf"
+    gal.generate_aruco_laser_pdf(IDS, "4X4_1000", str(path), marker_size_mm=10, label_mode=label_mode,
+                                 verbose=False, **options)
+    ops = []
+    # Native pages are Flate streams; ReportLab also wraps them in ASCII85
+    for filters, stream in re.findall(rb"/Filter (\[ /ASCII85Decode /FlateDecode \]|/FlateDecode)"
+                                      rb"[^>]*>>\s*stream\r?\n(.*?)\r?\n?endstream", path.read_bytes(), re.S):
+        if filters.startswith(b"["):
+            stream = base64.a85decode(stream, adobe=True)
+        ops.append(zlib.decompress(stream).decode("latin-1"))
+    return "".join(ops)
+
+
+@pytest.mark.parametrize("options", [{}, {"pdf_writer": "reportlab"}, {"jobs": 2, "markers_per_page": 2}])
+def test_path_labels_add_no_text_operators(tmp_path, options):
+    text = page_ops(tmp_path, "text", **options)
+    assert len(re.findall(r"\bTj\b", text)) == len(IDS)
+    paths = page_ops(tmp_path, "paths", **options)
+    # No string is shown (ReportLab opens every page with an empty BT ... ET block)
+    assert not re.search(r"\b(Tj|TJ)\b", paths)
+    assert len(re.findall(r"\bf\*|\bB\*", paths)) > len(re.findall(r"\bf\*|\bB\*", text))
+
+
+@pytest.mark.parametrize("output_format, text_marker", [("svg", "<text"), ("dxf", "\nTEXT\n")])
+def test_page_formats_have_no_text_elements(tmp_path, output_format, text_marker):
+    path = tmp_path / f"out.{output_format}"
+    for label_mode, count in (("text", len(IDS)), ("paths", 0)):
+        gal.generate_aruco_laser_pdf(IDS, "4X4_1000", str(path), marker_size_mm=10, label_mode=label_mode,
+                                     output_format=output_format, verbose=False)
+        assert path.read_text().count(text_marker) == count
+
+
+def test_glyphs_are_traced_once():
+    gal.glyph_outline.cache_clear()
+    gal.label_outline.cache_clear()
+    layout = gal.compute_layout(list(range(1000)), marker_size_mm=5, spacing_mm=2, markers_per_page=1000)
+    gal.layout_label_loops(layout, 5, 0.5)
+    glyphs = gal.glyph_outline.cache_info()
+    assert glyphs.misses == glyphs.currsize == 10
+    assert glyphs.hits > 2000
+    gal.layout_label_loops(layout, 5, 0.5)
+    assert gal.glyph_outline.cache_info().misses == 10
+    assert gal.label_outline.cache_info().hits >= 1000
+
+
+def test_outlines_fill_the_glyph_cells():
+    layout = gal.compute_layout(list(range(0, 1000, 37)), marker_size_mm=10, spacing_mm=5, markers_per_page=30)
+    images = []
+    for draw in ("polygon", "rects"):
+        renderer = gal.EngraveRasterRenderer(gal.A4, 600)
+        renderer.begin_page()
+        renderer.set_layer("engrave")
+        if draw == "polygon":
+            renderer.polygon(gal.layout_label_loops(layout, 10, 0.5))
+        else:
+            renderer.rects(gal.layout_label_rects(layout, 10, 0.5))
+        renderer.end_page()
+        images.append(renderer.pages[0])
+    assert (images[0] == 0).any()
+    assert np.array_equal(images[0], images[1])
+
+
+def test_path_labels_are_as_wide_as_text_labels():
+    layout = gal.compute_layout(IDS, marker_size_mm=10)
+    texts, x, _ = gal._label_origins(layout, 10, 0.5, 6)
+    widths = np.array([gal.helvetica_width(text, 6) for text in texts.tolist()])
+    total = (10 + 2 * 0.5) * gal.mm
+    assert np.allclose(x, layout["x"] + (total - widths) / 2)
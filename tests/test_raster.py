@@ -0,0 +1,66 @@
+"""PNG and TIFF output: pixels are the marker bit grids, read back by an independent decoder."""
+
+import numpy as np
+import pytest
+
+import generate_aruco_laser as gal
+
+Image = pytest.importorskip("PIL.Image")
+
+DPI = 254  # 10 pixels per millimetre
+
+
+def read(path):
+    with Image.open(path) as image:
+        assert image.mode == "1"
+        return np.asarray(image.convert("L")) == 0, image.info.get("dpi")
+
+
+def sample_cells(black, layout, marker_size_mm, border_mm, grid_size):
+    # Pixel at the centre of every cell of every marker
+    scale = DPI / gal.inch
+    cell = marker_size_mm * gal.mm / grid_size
+    centres = (np.arange(grid_size) + 0.5) * cell
+    cols = np.rint((layout["x"][:, None] + border_mm * gal.mm + centres) * scale - 0.5).astype(int)
+    rows = np.rint((gal.A4[1] - layout["y"][:, None] + border_mm * gal.mm + centres) * scale - 0.5).astype(int)
+    return black[rows[:, :, None], cols[:, None, :]]
+
+
+@pytest.mark.parametrize("output_format", gal.RASTER_FORMATS)
+@pytest.mark.parametrize("aruco_dict", ["4X4_50", "6X6_250"])
+def test_pixels_match_the_bit_grids(tmp_path, output_format, aruco_dict):
+    path = tmp_path / f"out.{output_format}"
+    ids = list(range(3, 23))
+    gal.generate_aruco_laser_pdf(ids, aruco_dict, str(path), marker_size_mm=12, border_mm=1, spacing_mm=6,
+                                 output_format=output_format, dpi=DPI, verbose=False)
+    black, dpi = read(path)
+    assert black.shape == (2970, 2100)
+    assert np.allclose(dpi, (DPI, DPI), atol=0.1)
+
+    layout = gal.compute_layout(ids, marker_size_mm=12, border_mm=1, spacing_mm=6)
+    images = gal.load_marker_images(aruco_dict)
+    assert np.array_equal(sample_cells(black, layout, 12, 1, images.shape[1]), images[ids] == 0)
+    # Nothing but the marker cells is engraved
+    assert black.sum() == pytest.approx((images[ids] == 0).sum() * (12 / images.shape[1] * 10) ** 2, rel=0.05)
+
+
+@pytest.mark.parametrize("output_format", gal.RASTER_FORMATS)
+def test_strip_size_does_not_change_the_image(tmp_path, output_format):
+    layout = gal.compute_layout(list(range(20)), marker_size_mm=10)
+    images = []
+    for strip_rows in (None, 7):
+        path = tmp_path / f"{strip_rows}.{output_format}"
+        gal.render_layout_raster(layout, str(path), "4X4_50", 10, 0.5, dpi=100,
+                                 output_format=output_format, strip_rows=strip_rows)
+        images.append(read(path)[0])
+    assert images[0].any()
+    assert np.array_equal(images[0], images[1])
+    expected = np.vstack(list(gal.iter_raster_strips(layout, "4X4_50", 10, 0.5, gal.A4, 100)))
+    assert np.array_equal(images[0], expected)
+
+
+def test_multi_page_rasters_write_a_file_per_page(tmp_path):
+    gal.generate_aruco_laser_pdf(list(range(45)), "4X4_50", str(tmp_path / "out.png"), marker_size_mm=10,
+                                 output_format="png", dpi=50, verbose=False)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["out_p001.png", "out_p002.png", "out_p003.png"]
+    assert read(tmp_path / "out_p003.png")[0].any()
@@ -0,0 +1,83 @@
+"""Streamed generation from iterables, split into files by pages or bytes."""
+
+import os
+import re
+import zlib
+
+import pytest
+
+import generate_aruco_laser as gal
+
+
+def page_count(path):
+    return int(re.search(rb"/Type /Pages /Kids \[[^\]]*\] /Count (\d+)", open(path, "rb").read()).group(1))
+
+
+def page_streams(paths):
+    streams = []
+    for path in paths:
+        data = open(path, "rb").read()
+        streams += [zlib.decompress(s) for s in re.findall(rb"/FlateDecode >>\nstream\n(.*?)\nendstream", data, re.S)]
+    return streams
+
+
+def stream(tmp_path, ids, name="out.pdf", **options):
+    return gal.generate_aruco_laser_stream((i for i in ids), "4X4_1000", str(tmp_path / name), marker_size_mm=8,
+                                           spacing_mm=4, verbose=False, **options)
+
+
+@pytest.mark.parametrize("max_pages, pages_per_file", [(1, [1] * 7), (3, [3, 3, 1]), (7, [7]), (100, [7])])
+def test_split_by_pages(tmp_path, max_pages, pages_per_file):
+    files = stream(tmp_path, range(125), max_pages=max_pages)
+    assert files == [str(tmp_path / f"out_{k:03d}.pdf") for k in range(1, len(pages_per_file) + 1)]
+    assert [page_count(path) for path in files] == pages_per_file
+    assert sorted(os.listdir(tmp_path)) == [os.path.basename(path) for path in files]
+
+
+def test_unsplit_stream_matches_generate_aruco_laser_pdf(tmp_path):
+    assert stream(tmp_path, range(125), "a.pdf") == [str(tmp_path / "a.pdf")]
+    gal.generate_aruco_laser_pdf(list(range(125)), "4X4_1000", str(tmp_path / "b.pdf"), marker_size_mm=8,
+                                 spacing_mm=4, verbose=False)
+    assert (tmp_path / "a.pdf").read_bytes() == (tmp_path / "b.pdf").read_bytes()
+
+
+@pytest.mark.parametrize("pages_per_file", [1, 2.5, 4])
+def test_split_by_bytes(tmp_path, pages_per_file):
+    whole = stream(tmp_path, range(400), "whole.pdf")[0]
+    page_bytes = os.path.getsize(whole) / page_count(whole)
+    max_bytes = int(page_bytes * pages_per_file) + 400
+    files = stream(tmp_path, range(400), max_bytes=max_bytes)
+    # Only a single page larger than the limit may go over it, alone in its file
+    assert all(os.path.getsize(path) <= max_bytes or page_count(path) == 1 for path in files)
+    assert sum(page_count(path) for path in files) == 20
+    assert len(files) >= -(-os.path.getsize(whole) // max_bytes)
+    # Nothing is lost or reordered by splitting
+    assert page_streams(files) == page_streams([whole])
+
+
+def test_split_with_jobs_matches_serial(tmp_path):
+    (tmp_path / "serial").mkdir()
+    (tmp_path / "parallel").mkdir()
+    for jobs, folder in ((1, "serial"), (2, "parallel")):
+        gal.generate_aruco_laser_pdf(list(range(125)), "4X4_1000", str(tmp_path / folder / "out.pdf"),
+                                     marker_size_mm=8, spacing_mm=4, max_pages=2, jobs=jobs, verbose=False)
+    names = sorted(os.listdir(tmp_path / "serial"))
+    assert len(names) == 4
+    for name in names:
+        assert (tmp_path / "parallel" / name).read_bytes() == (tmp_path / "serial" / name).read_bytes()
+
+
+def test_page_formats_write_one_file_per_page(tmp_path):
+    files = stream(tmp_path, range(45), "out.svg", output_format="svg")
+    assert files == [str(tmp_path / f"out_p{k:03d}.svg") for k in (1, 2, 3)]
+    assert all(os.path.exists(path) for path in files)
+
+
+def test_empty_stream_writes_one_blank_page(tmp_path):
+    files = stream(tmp_path, [], max_pages=5)
+    assert [page_count(path) for path in files] == [1]
+
+
+def test_ids_outside_the_dictionary_stop_the_stream(tmp_path):
+    with pytest.raises(ValueError, match="between 0 and 999"):
+        stream(tmp_path, [1, 2, 1000])
@@ -0,0 +1,34 @@
+"""Distinct marker selection (--select): distances and the chosen subsets."""
+
+import numpy as np
+import pytest
+
+import generate_aruco_laser as gal
+
+
+@pytest.mark.parametrize("name", ["4X4_50", "7X7_50"])
+def test_distance_matrix_matches_brute_force(name):
+    bits = np.asarray(gal.load_dictionary_bits(name))[:12].astype(int)
+    distances = gal.marker_distance_matrix(name)
+    for i in range(len(bits)):
+        own = min(int((bits[i] != np.rot90(bits[i], k)).sum()) for k in (1, 2, 3))
+        assert distances[i, i] == own
+        for j in range(len(bits)):
+            if i != j:
+                expected = min(int((bits[i] != np.rot90(bits[j], k)).sum()) for k in range(4))
+                assert distances[i, j] == expected
+
+
+@pytest.mark.parametrize("name, count", [("4X4_50", 10), ("4X4_1000", 5), ("4X4_1000", 10)])
+def test_selection_is_more_distinct_than_the_first_ids(name, count):
+    selected = gal.select_distinct_markers(name, count)
+    assert selected == sorted(set(selected)) and len(selected) == count
+    assert gal.min_marker_distance(name, selected) > gal.min_marker_distance(name, range(count))
+
+
+@pytest.mark.parametrize("name, count", [("4X4_1000", 20), ("5X5_100", 30), ("6X6_250", 40)])
+def test_refinement_never_loses_distance(name, count):
+    greedy = gal.select_distinct_markers(name, count, refine=False)
+    refined = gal.select_distinct_markers(name, count)
+    assert gal.min_marker_distance(name, refined) >= gal.min_marker_distance(name, greedy)
+    assert gal.min_marker_distance(name, refined) >= gal.min_marker_distance(name, range(count))
@@ -0,0 +1,45 @@
+"""The local render service: request handling and counters."""
+
+import asyncio
+import json
+
+import generate_aruco_laser as gal
+
+
+async def request(port, head, body=b""):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+    status_line = await reader.readline()
+    headers = await reader.readuntil(b"\r\n\r\n")
+    length = int([line.split(b":")[1] for line in headers.split(b"\r\n")
+                  if line.lower().startswith(b"content-length")][0])
+    data = await reader.readexactly(length)
+    writer.close()
+    return int(status_line.split()[1]), data
+
+
+def post(port, job):
+    body = json.dumps(job).encode("utf-8")
+    return request(port, f"POST /render HTTP/1.1\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n",
+                   body)
+
+
+def test_render_service():
+    async def run():
+        server = await gal.RenderServer(port=0, workers=1).start()
+        try:
+            status, data = await request(server.port, "POST /render HTTP/1.1\r\nContent-Length: ten\r\n\r\n")
+            assert status == 400 and b"Content-Length" in data
+
+            status, data = await post(server.port, {"dict": "4X4_50", "range": [0, 99]})
+            assert status == 400 and b"between 0 and 49" in data
+            assert (server.stats["rendered"], server.stats["errors"]) == (0, 1)
+
+            status, data = await post(server.port, {"dict": "4X4_50", "select": 4})
+            assert status == 200 and data.startswith(b"%PDF")
+            assert server.stats["rendered"] == 1
+        finally:
+            await server.close()
+
+    asyncio.run(run())
@@ -0,0 +1,36 @@
+"""NumPy, OpenCV and ReportLab stay unimported until rendering starts."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+HEAVY_MODULES = ("numpy", "cv2", "reportlab")
+
+
+def loaded_after(code):
+    # Fresh interpreter, so modules loaded by other tests do not count; --help
+    # and bad choices leave through argparse's SystemExit
+    script = (f"import sys, generate_aruco_laser as gal\ntry:\n    {code}\nexcept SystemExit:\n    pass\n"
+              f"print('loaded:', *(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True)
+    assert result.stdout.splitlines()[-1].startswith("loaded:"), result.stderr
+    return result.stdout.splitlines()[-1].split()[1:]
+
+
+@pytest.mark.parametrize("code", [
+    "pass",
+    "gal.resolve_job(gal.build_parser().parse_args(['-r', '0', '9']))",
+    "assert gal.main(['--dict', '4X4_50', '-r', '0', '99']) == 1",
+    "gal.main(['--dict', 'NOPE', '-r', '0', '9'])",
+    "gal.main(['--help'])",
+])
+def test_no_heavy_imports_before_rendering(code):
+    assert loaded_after(code) == []
+
+
+def test_rendering_imports_numpy_on_demand(tmp_path):
+    output = os.path.join(str(tmp_path), "out.pdf")
+    assert loaded_after(f"assert gal.main(['-r', '0', '9', '-o', {output!r}]) == 0") == ["numpy"]
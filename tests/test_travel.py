@@ -0,0 +1,54 @@
+"""Travel ordering (--optimize-travel) never makes head travel longer."""
+
+import numpy as np
+import pytest
+
+import generate_aruco_laser as gal
+
+
+@pytest.mark.parametrize("options", [
+    dict(marker_ids=range(1000), aruco_dict_name="4X4_1000"),
+    dict(marker_ids=range(50)),
+    dict(marker_ids=range(50), show_labels=False, engrave_mode="polygons"),
+    dict(marker_ids=range(400), aruco_dict_name="4X4_1000", marker_size_mm=3, spacing_mm=0,
+         markers_per_page=400, show_labels=False, cut_mode="merged"),
+])
+def test_optimized_travel_is_never_longer(tmp_path, options):
+    travel = gal.generate_aruco_laser_pdf(output_file=str(tmp_path / "out.pdf"), optimize_travel=True,
+                                          verbose=False, **options)
+    assert travel["travel_after_mm"] <= travel["travel_before_mm"] + 1e-6
+
+
+def test_merged_cuts_are_reordered(tmp_path):
+    # Merged cut lines come all horizontal, then all vertical: ordering them must help
+    travel = gal.generate_aruco_laser_pdf(range(400), "4X4_1000", str(tmp_path / "out.pdf"), 3, 0.5, 0,
+                                          markers_per_page=400, show_labels=False, cut_mode="merged",
+                                          optimize_travel=True, verbose=False)
+    assert travel["travel_after_mm"] < 0.75 * travel["travel_before_mm"]
+
+
+def test_reordered_page_draws_the_same_geometry():
+    layout = gal.compute_layout(list(range(20)), marker_size_mm=10)
+    plain = gal.NativePDFRenderer(None)
+    gal.render_layout(plain, layout, engrave_mode="rects")
+    plain.close()
+    ordered = gal.NativePDFRenderer(None)
+    gal.render_layout(ordered, layout, engrave_mode="rects", optimize_travel=True)
+    ordered.close()
+    
+    def operations(renderer):
+        import zlib
+        (_, stream), = renderer.finished_pages
+        lines = zlib.decompress(stream).decode("latin-1").splitlines()
+        return sorted(line for line in lines if line.endswith((" re", " Tj ET")))
+    
+    assert operations(plain) == operations(ordered)
+
+
+def test_order_paths_shortens_a_shuffled_grid():
+    rng = np.random.default_rng(0)
+    points = np.stack(np.meshgrid(np.arange(30), np.arange(30)), axis=-1).reshape(-1, 2).astype(float)
+    points = points[rng.permutation(len(points))]
+    order = gal.order_paths(points)
+    assert sorted(order.tolist()) == list(range(len(points)))
+    assert gal.travel_length(points[order], points[order]) < 0.1 * gal.travel_length(points, points)
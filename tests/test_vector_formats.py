@@ -0,0 +1,69 @@
+"""SVG and DXF output parse, and carry the engrave, cut and label layers."""
+
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pytest
+
+import generate_aruco_laser as gal
+
+SVG = "{http://www.w3.org/2000/svg}"
+IDS = list(range(10, 25))
+
+
+def generate(path, output_format, ids=IDS, **options):
+    gal.generate_aruco_laser_pdf(ids, "4X4_50", str(path), marker_size_mm=10, spacing_mm=5,
+                                 output_format=output_format, verbose=False, **options)
+
+
+def dxf_pairs(text):
+    lines = text.split("\n")
+    assert lines[-1] == "" and len(lines) % 2 == 1
+    return [(int(code), value) for code, value in zip(lines[:-1:2], lines[1::2])]
+
+
+def test_svg_parses_into_named_layers(tmp_path):
+    generate(tmp_path / "out.svg", "svg")
+    root = ET.parse(tmp_path / "out.svg").getroot()
+    assert root.get("width") == "210.0000mm" and root.get("height") == "297.0000mm"
+    layers = {group.get("id"): group for group in root.findall(f"{SVG}g")}
+    assert list(layers) == ["engrave", "cut", "label"]
+    assert layers["engrave"].get("fill") == "#0000ff" and layers["cut"].get("stroke") == "#ff0000"
+    assert [text.text for text in layers["label"].iter(f"{SVG}text")] == [str(i) for i in IDS]
+    # One closed subpath per cut outline, all on the page
+    cuts = "".join(path.get("d") for path in layers["cut"].iter(f"{SVG}path"))
+    assert cuts.count("z") == len(IDS)
+    x, y = np.array([float(v) for v in cuts.replace("M", " ").split("h")[0].split()])
+    assert 0 < x < 210 and 0 < y < 297
+
+
+def test_multi_page_svg_writes_a_file_per_page(tmp_path):
+    generate(tmp_path / "out.svg", "svg", ids=range(45))
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["out_p001.svg", "out_p002.svg", "out_p003.svg"]
+    for path in tmp_path.iterdir():
+        ET.parse(path)
+
+
+@pytest.mark.parametrize("engrave_mode", gal.ENGRAVE_MODES)
+def test_dxf_parses_into_sections_and_layers(tmp_path, engrave_mode):
+    generate(tmp_path / "out.dxf", "dxf", engrave_mode=engrave_mode)
+    pairs = dxf_pairs((tmp_path / "out.dxf").read_text())
+    sections = [value for (code, value), (_, kind) in zip(pairs[1:], pairs) if code == 2 and kind == "SECTION"]
+    assert sections == ["HEADER", "TABLES", "ENTITIES"]
+    assert pairs[-1] == (0, "EOF")
+
+    entities = []
+    for code, value in pairs[pairs.index((2, "ENTITIES")) + 1:]:
+        if code == 0:
+            entities.append([value, None])
+        elif code == 8:
+            entities[-1][1] = value
+    polylines = [layer for kind, layer in entities if kind == "POLYLINE"]
+    assert polylines.count("CUT") == len(IDS)
+    assert polylines.count("ENGRAVE") >= len(IDS)
+    assert [kind for kind, layer in entities if layer == "LABELS"] == ["TEXT"] * len(IDS)
+    assert entities.count(["POLYLINE", "CUT"]) == entities.count(["SEQEND", "CUT"])
+
+    xs = [float(value) for code, value in pairs if code == 10]
+    ys = [float(value) for code, value in pairs if code == 20]
+    assert 0 <= min(xs) and max(xs) <= 210 and 0 <= min(ys) and max(ys) <= 297
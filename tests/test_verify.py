@@ -0,0 +1,45 @@
+"""--verify checks what was written, or what the drawing code drew."""
+
+import numpy as np
+import pytest
+
+import generate_aruco_laser as gal
+
+pytest.importorskip("cv2")
+
+
+def run(*argv):
+    return gal.main(list(argv) + ["--verify", "150"])
+
+
+@pytest.mark.parametrize("engrave_mode", gal.ENGRAVE_MODES)
+def test_drawn_engrave_layer_matches_the_marker_raster(engrave_mode):
+    layout = gal.compute_layout(list(range(20)), marker_size_mm=10)
+    renderer = gal.EngraveRasterRenderer(gal.A4, 150)
+    gal.render_layout(renderer, layout, "4X4_50", 10, 0.5, engrave_mode=engrave_mode, optimize_travel=True)
+    expected = np.vstack(list(gal.iter_raster_strips(layout, "4X4_50", 10, 0.5, gal.A4, 150)))
+    assert np.array_equal(renderer.pages[0] == 0, expected)
+
+
+@pytest.mark.parametrize("output", ["out.pdf", "out.svg", "out.png"])
+def test_outputs_verify(tmp_path, output):
+    assert run("-r", "0", "29", "-s", "10", "--dpi", "150", "-o", str(tmp_path / output)) == 0
+
+
+def test_damaged_output_fails(tmp_path, monkeypatch, capsys):
+    # Blank the written page before it is read back
+    write_png = gal.write_png
+
+    def blank(path, width, height, strips, dpi):
+        write_png(path, width, height, (np.zeros_like(strip) for strip in strips), dpi)
+
+    monkeypatch.setattr(gal, "write_png", blank)
+    assert run("-r", "0", "9", "-s", "10", "--dpi", "150", "-o", str(tmp_path / "out.png")) == 1
+    assert "ID 0: not detected" in capsys.readouterr().out
+
+
+def test_report_counts_pages(tmp_path, capsys):
+    assert run("-r", "0", "9", "-s", "10", "--dpi", "150", "-o", str(tmp_path / "out.png")) == 0
+    assert "markers on 1 page of the written output" in capsys.readouterr().out
+    assert run("-r", "0", "29", "-s", "10", "--per-page", "20", "-o", str(tmp_path / "out.pdf")) == 0
+    assert "markers on 2 pages of the written output" in capsys.readouterr().out